@@ -2,9 +2,11 @@ from __future__ import annotations
 import sublime
 import sublime_plugin
 
-from itertools import dropwhile, takewhile
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
 
-from .lint import persist, util
+from .lint import error_index, util
 from .lint.util import flash
 
 from typing_extensions import Literal
@@ -25,42 +27,50 @@ class sublime_linter_goto_error(sublime_plugin.TextCommand):
 
 
 def goto(view: sublime.View, direction: Direction, count: int, wrap: bool) -> None:
-    filename = util.canonical_filename(view)
-    errors = persist.file_errors.get(filename)
-    if not errors:
+    index = error_index.for_file(util.canonical_filename(view))
+    if not index:
         flash(view, 'No problems')
         return
 
     cursor = view.sel()[0].begin()
 
     # Filter regions under the cursor, bc we don't want to jump to them.
-    # Also filter duplicate start positions.
-    all_jump_positions = sorted({
+    # (A start position is only filtered if *all* its regions are under
+    # the cursor.)
+    under_cursor = Counter(
         error['region'].begin()
-        for error in errors
-        if not error['region'].contains(cursor)})
+        for error in index.containing(cursor)
+    )
+    skip = {
+        pos
+        for pos, n in under_cursor.items()
+        if n == index.count_starting_at(pos)
+    }
+    all_jump_positions = index.positions
 
     # Edge case: Since we filtered, it is possible we get here with nothing
     # left. That is the case if we sit on the last remaining error, where we
     # don't have anything to jump to and even `wrap` becomes a no-op.
-    if len(all_jump_positions) == 0:
+    if len(all_jump_positions) == len(skip):
         flash(view, 'No more problems')
         return
 
-    def before_current_pos(pos):
-        return pos < cursor
-
-    next_positions = dropwhile(before_current_pos, all_jump_positions)
-    previous_positions = takewhile(before_current_pos, all_jump_positions)
-
     reverse = direction == 'previous'
-    jump_positions = list(previous_positions if reverse else next_positions)
-    if reverse:
-        jump_positions = list(reversed(jump_positions))
+    start = bisect_left(all_jump_positions, cursor)
+    candidates = (
+        (all_jump_positions[i] for i in range(start - 1, -1, -1))
+        if reverse
+        else islice(all_jump_positions, start, None)
+    )
+    jump_positions = list(islice((pos for pos in candidates if pos not in skip), max(count, 1)))
 
     if not jump_positions:
         if wrap:
-            point = all_jump_positions[-1] if reverse else all_jump_positions[0]
+            point = next(
+                pos
+                for pos in (reversed(all_jump_positions) if reverse else all_jump_positions)
+                if pos not in skip
+            )
             flash(
                 view,
                 'Jumped to {} problem'.format('last' if reverse else 'first'))
@@ -69,12 +79,10 @@ def goto(view: sublime.View, direction: Direction, count: int, wrap: bool) -> No
                 view,
                 'No more problems {}'.format('above' if reverse else 'below'))
             return
-    elif len(jump_positions) <= count:
+    else:
         # If we cannot jump wide enough, do not wrap, but jump as wide as
         # possible to reduce disorientation.
         point = jump_positions[-1]
-    else:
-        point = jump_positions[count - 1]
 
     move_to(view, point)
 
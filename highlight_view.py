@@ -1,22 +1,25 @@
 from __future__ import annotations
-from collections import defaultdict, ChainMap
+from collections import defaultdict, deque, ChainMap
 from contextlib import contextmanager
+from dataclasses import dataclass
 import html
 from itertools import chain
 from functools import partial
+import hashlib
 import re
 import textwrap
+import threading
 import uuid
 
 import sublime
 import sublime_plugin
 
-from .lint import persist, events, style, util, queue, quick_fix
+from .lint import error_index, persist, events, profiler, style, util, queue, quick_fix
 from .lint.const import PROTECTED_REGIONS_KEY, ERROR, WARNING
 
 
 from typing import (
-    Callable, FrozenSet, Hashable, Iterable, List, Mapping,
+    Callable, FrozenSet, Hashable, Iterable, List, Mapping, NamedTuple,
     Optional, Tuple, TypedDict, TypeVar, Union
 )
 T = TypeVar('T')
@@ -59,6 +62,7 @@ MARK_STYLES = {
 UNDERLINE_STYLES = (
     'solid_underline', 'squiggly_underline', 'stippled_underline'
 )
+FANCY_UNDERLINES = sublime.DRAW_SQUIGGLY_UNDERLINE | sublime.DRAW_STIPPLED_UNDERLINE
 
 SOME_WS = re.compile(r'\s')
 FALLBACK_MARK_STYLE = 'outline'
@@ -89,6 +93,7 @@ def plugin_loaded():
 
 def plugin_unloaded():
     events.off(on_lint_result)
+    events.off(on_partial_lint_result)
     for window in sublime.windows():
         for view in window.views():
             undraw(view)
@@ -103,7 +108,15 @@ def on_lint_result(filename: str, linter_name: LinterName, **kwargs: object) ->
     if not views:
         return
 
-    highlight_linter_errors(views, filename, linter_name)
+    with profiler.measure('highlight', linter_name):
+        highlight_linter_errors(views, filename, linter_name)
+
+
+@events.on(events.LINT_PARTIAL_RESULT)
+def on_partial_lint_result(
+    filename: str, linter_name: LinterName, errors: list[LintError], **kwargs: object
+) -> None:
+    on_lint_result(filename=filename, linter_name=linter_name, errors=errors)
 
 
 class UpdateOnLoadController(sublime_plugin.EventListener):
@@ -134,6 +147,10 @@ def highlight_linter_errors(
     errors_for_the_gutter, _ = filter_errors(errors, by_line)
 
     gutter_regions = prepare_gutter_data(errors_for_the_gutter)
+    batch = len(errors) > persist.settings.get('highlights.batch_squiggles_above', 500)
+    lazy = len(errors) > persist.settings.get('highlights.lazy_render_above', 5000)
+    index = error_index.for_file(filename)
+    line_by_uid = {error['uid']: error['line'] for error in errors} if lazy else {}
 
     for view in views:
         vid = view.id()
@@ -151,32 +168,80 @@ def highlight_linter_errors(
 
             State['views'].add(vid)
 
-        highlight_regions = prepare_highlights_data(
-            errors_for_the_highlights,
-            demote_predicate=demote_predicate,
-            demote_scope=demote_scope,
-            quiet=vid in State['quiet_views'],
-            idle=vid in State['idle_views']
-        )
-        hidden_highlight_regions = prepare_highlights_data(
-            loosers,
-            demote_predicate=demote_predicate,
-            demote_scope=demote_scope,
-            quiet=True,
-            idle=vid in State['idle_views']
-        )
-        squiggle_regions: Squiggles = ChainMap(
-            {}, highlight_regions, hidden_highlight_regions  # type: ignore[arg-type]
-        )
+        if not lazy:
+            squiggle_regions = prepare_squiggles(
+                vid, errors_for_the_highlights, loosers, demote_predicate, demote_scope)
+            if batch:
+                squiggle_regions = batch_squiggles(squiggle_regions)
+            draw(view, linter_name, squiggle_regions, gutter_regions)
+            set_lazy_render(vid, None)
+            draw_phantoms(view, errors)
+            continue
 
-        draw(view, linter_name, squiggle_regions, gutter_regions)
-        draw_phantoms(view)
+        # Render the errors around the viewport fully, for all the others
+        # we only draw cheap marks.  `fill_in_viewport` renders more
+        # as the user scrolls.
+        window = render_window(view)
+        errors_near_viewport = index.intersecting(window)
+        near = {error['uid'] for error in errors_near_viewport}
+        squiggle_regions = prepare_squiggles(
+            vid,
+            [e for e in errors_for_the_highlights if e['uid'] in near],
+            [e for e in loosers if e['uid'] in near],
+            demote_predicate, demote_scope
+        )
+        if batch:
+            squiggle_regions = batch_squiggles(squiggle_regions)
+        marks = prepare_marks(prepare_squiggles(
+            vid,
+            [e for e in errors_for_the_highlights if e['uid'] not in near],
+            [e for e in loosers if e['uid'] not in near],
+            demote_predicate, demote_scope
+        ), line_by_uid)
+        draw(view, linter_name, ChainMap({}, squiggle_regions, marks), gutter_regions)  # type: ignore[arg-type]
+        set_lazy_render(vid, LazyRender(filename, window, near))
+        draw_phantoms(view, errors_near_viewport)
+
+    if lazy:
+        start_lazy_render_poller()
+
+
+def prepare_squiggles(
+    vid: sublime.ViewId,
+    errors: list[LintError],
+    loosers: list[LintError],
+    demote_predicate: DemotePredicate,
+    demote_scope: str,
+) -> Squiggles:
+    highlight_regions = prepare_highlights_data(
+        errors,
+        demote_predicate=demote_predicate,
+        demote_scope=demote_scope,
+        quiet=vid in State['quiet_views'],
+        idle=vid in State['idle_views']
+    )
+    hidden_highlight_regions = prepare_highlights_data(
+        loosers,
+        demote_predicate=demote_predicate,
+        demote_scope=demote_scope,
+        quiet=True,
+        idle=vid in State['idle_views']
+    )
+    return ChainMap(
+        {}, highlight_regions, hidden_highlight_regions  # type: ignore[arg-type]
+    )
 
 
-def draw_phantoms(view):
+def draw_phantoms(view: sublime.View, errors: Optional[list[LintError]] = None) -> None:
     vid = view.id()
-    filename = util.canonical_filename(view)
-    errors = persist.file_errors[filename]
+    if errors is None:
+        filename = util.canonical_filename(view)
+        lazy = LAZY_VIEWS.get(vid)
+        errors = (
+            error_index.for_file(filename).intersecting(lazy.window)
+            if lazy
+            else persist.file_errors[filename]
+        )
     phantoms = (
         prepare_phantoms(view, errors)
         if vid not in State['views_without_phantoms']
@@ -407,6 +472,107 @@ def prepare_highlights_data(
     return by_region_id
 
 
+MARKS = 'marks'
+# Marks are batched per range of lines, roughly a viewport, so filling in
+# the viewport only touches the few batches nearby.
+MARKS_LINES_PER_BATCH = 100
+
+
+def batch_squiggles(squiggles: Squiggles, kind: str = 'batch') -> Squiggles:
+    """Merge the squiggles which only differ by their error into one key each.
+
+    Drawing each error with its own region key means one API call per
+    error.  A batch draws all its regions at once, the uids of its errors
+    are kept on the key in the same order as its regions.
+    """
+    grouped: defaultdict[tuple, list[tuple[sublime.Region, str]]] = defaultdict(list)
+    for key, regions in squiggles.items():
+        grouped[(
+            key.linter_name, key.scope, key.flags, key.demotable, key.alt_scope, key.annotation
+        )].extend((region, key.uid) for region in regions)
+
+    rv = {}
+    for (linter_name, scope, flags, demotable, alt_scope, annotation), members in grouped.items():
+        # Sublime returns the regions of a key sorted by position.
+        members.sort(key=lambda member: (member[0].begin(), member[0].end()))
+        batch_id = '{}:{}'.format(kind, hashlib.sha1(
+            '{}|{}|{}'.format(demotable, alt_scope, annotation).encode('utf-8')
+        ).hexdigest()[:16])
+        key = Squiggle(
+            linter_name, batch_id, scope, flags, demotable, alt_scope, annotation,
+            uids=tuple(uid for _, uid in members)
+        )
+        rv[key] = [region for region, _ in members]
+    return rv
+
+
+def prepare_marks(squiggles: Squiggles, line_by_uid: dict[str, int]) -> Squiggles:
+    """Turn squiggles into cheap marks, for errors away from the viewport.
+
+    Marks are batches without annotations, and underlines are drawn
+    solid; they still show up in the minimap and keep track of the regions
+    of their errors.  Every `MARKS_LINES_PER_BATCH` lines get their own
+    batches.
+    """
+    chunks: defaultdict[int, dict[Squiggle, list[sublime.Region]]] = defaultdict(dict)
+    for key, regions in squiggles.items():
+        chunk = line_by_uid.get(key.uid, 0) // MARKS_LINES_PER_BATCH
+        chunks[chunk][key._replace(annotation='', flags=mark_flags(key.flags))] = regions
+
+    rv: dict[Squiggle, list[sublime.Region]] = {}
+    for chunk, members in chunks.items():
+        rv.update(batch_squiggles(members, kind='{}:{}'.format(MARKS, chunk)))
+    return rv
+
+
+def mark_flags(flags: int) -> int:
+    if flags == -1 or not flags & FANCY_UNDERLINES:
+        return flags
+    return flags & ~FANCY_UNDERLINES | sublime.DRAW_SOLID_UNDERLINE
+
+
+def batched_regions(view: sublime.View, key: Squiggle) -> list[tuple[str, sublime.Region]]:
+    """Return the uid and the current region of each error of a batch.
+
+    If the regions don't match the uids anymore, e.g. after an undo
+    restored an older state, we don't know where Sublime moved them and
+    fall back to the regions we have stored for these errors.
+    """
+    regions = view.get_regions(key)
+    if len(regions) == len(key.uids):
+        return list(zip(key.uids, regions))
+
+    errors_by_uid = {
+        error['uid']: error
+        for error in persist.file_errors.get(util.canonical_filename(view), [])
+    }
+    return [
+        (uid, errors_by_uid[uid]['region'])
+        for uid in key.uids
+        if uid in errors_by_uid
+    ]
+
+
+@util.assert_on_ui_thread
+def remove_from_batch(
+    view: sublime.View,
+    key: Squiggle,
+    uids: set[str],
+    pairs: Optional[list[tuple[str, sublime.Region]]] = None
+) -> None:
+    if pairs is None:
+        pairs = batched_regions(view, key)
+    remaining = [(uid, region) for uid, region in pairs if uid not in uids]
+    if remaining:
+        draw_view_region(
+            view,
+            key._replace(uids=tuple(uid for uid, _ in remaining)),
+            [region for _, region in remaining]
+        )
+    else:
+        erase_view_region(view, key)
+
+
 def _compute_flags(error: LintError) -> int:
     mark_style = style.get_value('mark_style', error, 'none')
     selected_text = error['offending_text']
@@ -449,24 +615,37 @@ def draw(
     Error, warning and gutter marks are drawn with separate regions,
     since each one potentially needs a different color.
 
-    """
-    current_region_keys = get_regions_keys(view)
-    next_region_keys = highlight_regions.keys() | gutter_regions.keys()
-
-    # remove unused regions
-    for key in current_region_keys - next_region_keys:
-        erase_view_region(view, key)
-
-    # overlaying all gutter regions with common invisible one,
-    # to create unified handle for GitGutter and other plugins
-    view.add_regions(PROTECTED_REGIONS_KEY, list(flatten(gutter_regions.values())))
-
-    # otherwise update (or create) regions
-    for squiggle, regions in highlight_regions.items():
-        draw_view_region(view, squiggle, regions)
+    Only the regions which actually changed are sent to Sublime.  The keys
+    of the squiggles contain the uids of their errors, so an unchanged
+    result usually means we don't call `add_regions` at all.
 
-    for icon, regions in gutter_regions.items():
-        draw_view_region(view, icon, regions)
+    """
+    with profiler.measure('redraw', linter_name):
+        current_region_keys = get_regions_keys(view)
+        next_region_keys = highlight_regions.keys() | gutter_regions.keys()
+
+        # remove unused regions
+        unused_keys = current_region_keys - next_region_keys
+        for key in unused_keys:
+            erase_view_region(view, key)
+
+        changed_icons = [
+            (icon, regions)
+            for icon, regions in gutter_regions.items()
+            if not is_drawn(view, icon, regions)
+        ]
+        if changed_icons or any(isinstance(key, GutterIcon) for key in unused_keys):
+            # overlaying all gutter regions with common invisible one,
+            # to create unified handle for GitGutter and other plugins
+            view.add_regions(PROTECTED_REGIONS_KEY, list(flatten(gutter_regions.values())))
+
+        # otherwise update (or create) regions
+        for squiggle, regions in highlight_regions.items():
+            if not is_drawn(view, squiggle, regions):
+                draw_view_region(view, squiggle, regions)
+
+        for icon, regions in changed_icons:
+            draw_view_region(view, icon, regions)
 
 
 class GutterIcon(str):
@@ -497,6 +676,8 @@ class Squiggle(str):
     demotable: bool
     alt_scope: str
     annotation: str
+    # The uids of the errors of a batch, see `batch_squiggles`
+    uids: tuple[str, ...] = ()
 
     def __new__(
         cls,
@@ -506,7 +687,8 @@ class Squiggle(str):
         flags: int,
         demotable: bool = False,
         alt_scope: str | None = None,
-        annotation: str = ""
+        annotation: str = "",
+        uids: tuple[str, ...] = ()
     ) -> Squiggle:
         key = (
             'SL.{}.Highlights.|{}|{}|{}'
@@ -523,13 +705,15 @@ class Squiggle(str):
         self.uid = uid
         self.demotable = demotable
         self.annotation = annotation
+        self.uids = uids
         return self
 
     def _replace(self, **overrides) -> Squiggle:
         base = {
             name: overrides.pop(name, getattr(self, name))
             for name in {
-                'linter_name', 'uid', 'scope', 'flags', 'demotable', 'alt_scope', 'annotation'
+                'linter_name', 'uid', 'scope', 'flags', 'demotable', 'alt_scope',
+                'annotation', 'uids'
             }
         }
         return Squiggle(**base)
@@ -619,7 +803,7 @@ def draw_view_region(view: sublime.View, key: RegionKey, regions: list[sublime.R
     if isinstance(key, Squiggle):
         if key.annotation and key.visible():
             annotations = {
-                "annotations": [key.annotation],
+                "annotations": [key.annotation] * len(regions),
                 "annotation_color":
                     view.style_for_scope(key.scope).get("foreground", "#f00")
             }
@@ -636,14 +820,56 @@ def draw_view_region(view: sublime.View, key: RegionKey, regions: list[sublime.R
     else:
         view.add_regions(key, regions, key.scope, key.icon, key.flags)
     vid = view.id()
-    CURRENTSTORE[vid].add(key)
-    EVERSTORE[vid].add(key)
+    # Replace an equal key, a batch might hold different uids now.
+    for store in (CURRENTSTORE[vid], EVERSTORE[vid]):
+        store.discard(key)
+        store.add(key)
+    DRAWN[vid][key] = DrawnRegions(
+        key_attributes(key), list(regions), view.change_count())
 
 
 @util.assert_on_ui_thread
 def erase_view_region(view: sublime.View, key: RegionKey) -> None:
     view.erase_regions(key)
     CURRENTSTORE[view.id()].discard(key)
+    DRAWN[view.id()].pop(key, None)
+
+
+# What we last sent to Sublime per view and key.  `change_count` is the
+# change count of the view at that time; Sublime moves the regions along
+# with later edits, and so must we before we compare.
+class DrawnRegions(NamedTuple):
+    attributes: tuple
+    regions: list[sublime.Region]
+    change_count: int
+
+
+DRAWN: defaultdict[sublime.ViewId, dict[RegionKey, DrawnRegions]] = defaultdict(dict)
+
+
+def key_attributes(key: RegionKey) -> tuple:
+    """Return what, besides the key string, changes how a key is drawn."""
+    if isinstance(key, Squiggle):
+        return (key.annotation, key.demotable, key.alt_scope, key.uids)
+    return ()
+
+
+def is_drawn(view: sublime.View, key: RegionKey, regions: list[sublime.Region]) -> bool:
+    """Return True if Sublime already shows exactly these `regions` for `key`."""
+    drawn = DRAWN[view.id()].get(key)
+    if drawn is None or drawn.attributes != key_attributes(key):
+        return False
+
+    change_count = view.change_count()
+    if drawn.change_count == change_count:
+        return drawn.regions == regions
+    if len(drawn.regions) != len(regions):
+        return False
+
+    edits = recorded_edits_since(view.buffer_id(), drawn.change_count, change_count)
+    if edits is None:
+        return False
+    return [shift_region(r, edits) for r in drawn.regions] == regions
 
 
 def get_regions_keys(view: sublime.View) -> FrozenSet[RegionKey]:
@@ -654,6 +880,8 @@ def get_regions_keys(view: sublime.View) -> FrozenSet[RegionKey]:
 def restore_from_everstore(view: sublime.View) -> None:
     vid = view.id()
     CURRENTSTORE[vid] = EVERSTORE[vid].copy()
+    # Undo brings back regions we can't follow, draw everything afresh.
+    DRAWN.pop(vid, None)
 
 
 class ZombieController(sublime_plugin.EventListener):
@@ -671,10 +899,13 @@ class ZombieController(sublime_plugin.EventListener):
 class ViewListCleanupController(sublime_plugin.EventListener):
     def on_pre_close(self, view):
         vid = view.id()
+        STORE_CHANGE_COUNTS.pop(util.canonical_filename(view), None)
         State['idle_views'].discard(vid)
         State['quiet_views'].discard(vid)
         State['views_without_phantoms'].discard(vid)
         State['views'].discard(vid)
+        LAZY_VIEWS.pop(vid, None)
+        DRAWN.pop(vid, None)
 
 
 class RevisitErrorRegions(sublime_plugin.EventListener):
@@ -708,7 +939,27 @@ def revalidate_regions(view: sublime.View) -> None:
     region_keys = get_regions_keys(view)
     eof = view.size()
     for key in region_keys:
-        if isinstance(key, Squiggle):
+        if isinstance(key, Squiggle) and key.uids:
+            pairs = batched_regions(view, key)
+            under_cursor = {
+                uid
+                for uid, r in pairs
+                if any(r.contains(s) for s in selections)
+            }
+            if not under_cursor:
+                continue
+
+            # Move these errors out of the batch, see below.
+            remove_from_batch(view, key, under_cursor, pairs)
+            for uid, r in pairs:
+                if uid in under_cursor:
+                    draw_squiggle_invisible(view, key._replace(uid=uid, uids=()), [r])
+                    try:
+                        errors_by_uid[uid]['revalidate'] = True  # type: ignore[typeddict-unknown-key]
+                    except LookupError:
+                        pass
+
+        elif isinstance(key, Squiggle):
             # We can have keys without any region drawn for example
             # if we loaded the `EVERSTORE`.
             region = head(view.get_regions(key))
@@ -754,35 +1005,144 @@ def revalidate_regions(view: sublime.View) -> None:
                 draw_view_region(view, key, filtered_regions)
 
 
+# An edit as reported by Sublime: the region `a..b` has been replaced by
+# `text`, with `a_row` and `b_row` being the rows of `a` and `b` *before*
+# the edit.
+class TextEdit(NamedTuple):
+    a: int
+    b: int
+    a_row: int
+    b_row: int
+    text: str
+
+
+# Per buffer: `(previous change count, change count, edits)`
+ChangeLogEntry = Tuple[Optional[int], int, List[TextEdit]]
+MAX_RECORDED_CHANGES = 256
+TEXT_CHANGES: defaultdict[sublime.BufferId, deque[ChangeLogEntry]] = \
+    defaultdict(lambda: deque(maxlen=MAX_RECORDED_CHANGES))
+TEXT_CHANGES_LOCK = threading.Lock()
+# Per filename: the change count the positions in `persist.file_errors`
+# refer to.
+STORE_CHANGE_COUNTS: dict[str, int] = {}
+
+
+class RecordTextChanges(sublime_plugin.TextChangeListener):
+    @classmethod
+    def is_applicable(cls, buffer: sublime.Buffer) -> bool:
+        return True
+
+    def on_text_changed(self, changes: list[sublime.TextChange]) -> None:
+        view = self.buffer.primary_view()
+        if not view:
+            return
+
+        change_count = view.change_count()
+        edits = [
+            TextEdit(change.a.pt, change.b.pt, change.a.row, change.b.row, change.str)
+            for change in changes
+        ]
+        with TEXT_CHANGES_LOCK:
+            log = TEXT_CHANGES[self.buffer.id()]
+            previous = log[-1][1] if log else None
+            log.append((previous, change_count, edits))
+
+    def on_revert(self) -> None:
+        # We don't get the changes of a revert or reload. Forget the
+        # history to break the chain of recorded changes.
+        with TEXT_CHANGES_LOCK:
+            TEXT_CHANGES.pop(self.buffer.id(), None)
+
+    on_reload = on_revert
+
+
+def recorded_edits_since(
+    bid: sublime.BufferId,
+    since: Optional[int],
+    until: int
+) -> Optional[list[TextEdit]]:
+    """Return all edits between two change counts, or `None` if unknown."""
+    if since is None:
+        return None
+    if since == until:
+        return []
+
+    with TEXT_CHANGES_LOCK:
+        entries = [
+            entry for entry in TEXT_CHANGES.get(bid, [])
+            if since < entry[1] <= until
+        ]
+
+    expected_previous = since
+    for previous, change_count, _ in entries:
+        if previous != expected_previous:
+            return None
+        expected_previous = change_count
+    if expected_previous != until:
+        return None
+    return list(chain.from_iterable(edits for _, _, edits in entries))
+
+
 def maybe_update_error_store(view: sublime.View) -> None:
     filename = util.canonical_filename(view)
+    change_count = view.change_count()
+    previous_change_count = STORE_CHANGE_COUNTS.get(filename)
+    STORE_CHANGE_COUNTS[filename] = change_count
+
     errors = persist.file_errors.get(filename)
     if not errors:
         return
 
+    edits = recorded_edits_since(view.buffer_id(), previous_change_count, change_count)
+    if edits == []:
+        return
+
     tab_size = view.settings().get("tab_size", 4)
     region_keys = get_regions_keys(view)
     uid_key_map = {
-        key.uid: key
+        uid: key
         for key in region_keys
         if isinstance(key, Squiggle)
+        for uid in (key.uids or (key.uid,))
     }
+    regions_per_batch: dict[Squiggle, dict[str, sublime.Region]] = {}
 
-    changed = False
+    changed_regions = []
     new_errors = []
-    regions_to_erase = []
+    squiggles_to_erase: list[tuple[Squiggle, str]] = []
     for error in errors:
+        if edits is not None:
+            position = shift_by_edits(error, edits)
+            if position is not None:
+                new_region, line = position
+                if new_region != error['region']:
+                    error = error.copy()
+                    error.update({'region': new_region, 'line': line})
+                    changed_regions.append(new_region)
+                new_errors.append(error)
+                continue
+
+        # Either we have no recorded edits, or the error intersects one.
+        # Ask Sublime where the region moved.
         uid = error['uid']
         key = uid_key_map.get(uid, None)
         if key is None:
+            new_errors.append(error)
             continue
 
-        region = head(view.get_regions(key))
+        if key.uids:
+            try:
+                regions = regions_per_batch[key]
+            except KeyError:
+                regions = regions_per_batch[key] = dict(batched_regions(view, key))
+            region = regions.get(uid)
+        else:
+            region = head(view.get_regions(key))
         if region is None or region == error['region']:
             new_errors.append(error)
             continue
 
-        changed = True
+        changed_regions.append(region)
 
         if region.empty() and not key.intentional_empty():
             # Either the user edited away our region (and the error)
@@ -790,7 +1150,7 @@ def maybe_update_error_store(view: sublime.View) -> None:
             # zero length (and moved to a different line at col 0).
             # It is useless now so we remove the error by not
             # copying it.
-            regions_to_erase.append(key)
+            squiggles_to_erase.append((key, uid))
             continue
 
         line, start = view.rowcol(region.begin())
@@ -804,16 +1164,74 @@ def maybe_update_error_store(view: sublime.View) -> None:
         })
         new_errors.append(error)
 
-    if changed:
-        _erase_view_regions(view, regions_to_erase)
+    if changed_regions:
+        _erase_squiggles(view, squiggles_to_erase)
         persist.file_errors[filename] = new_errors
-        events.broadcast('error_positions_changed', {'filename': filename})
+        events.broadcast('error_positions_changed', {
+            'filename': filename,
+            'region': sublime.Region(
+                min(region.begin() for region in changed_regions),
+                max(region.end() for region in changed_regions)
+            )
+        })
+
+
+def shift_by_edits(
+    error: LintError,
+    edits: list[TextEdit]
+) -> Optional[tuple[sublime.Region, int]]:
+    """Compute the new region and line of an error after the given edits.
+
+    Return `None` if an edit touches the error, or if it is on the same line
+    as an edit, t.i. if its column might have changed.
+    """
+    region, line = error['region'], error['line']
+    a, b = region.a, region.b
+    for edit in edits:
+        if max(a, b) < edit.a:
+            continue
+        if min(a, b) <= edit.b or line <= edit.b_row:
+            return None
+
+        delta = len(edit.text) - (edit.b - edit.a)
+        a, b = a + delta, b + delta
+        line += edit.text.count('\n') - (edit.b_row - edit.a_row)
+
+    if (a, b) == (region.a, region.b):
+        return region, line
+    return sublime.Region(a, b), line
+
+
+def shift_region(
+    region: sublime.Region,
+    edits: list[TextEdit]
+) -> Optional[sublime.Region]:
+    """Move `region` like Sublime does, or return `None` if an edit touches it."""
+    a, b = region.a, region.b
+    for edit in edits:
+        if max(a, b) < edit.a:
+            continue
+        if min(a, b) <= edit.b:
+            return None
+
+        delta = len(edit.text) - (edit.b - edit.a)
+        a, b = a + delta, b + delta
+
+    if (a, b) == (region.a, region.b):
+        return region
+    return sublime.Region(a, b)
 
 
 @util.ensure_on_ui_thread
-def _erase_view_regions(view, keys):
-    for key in keys:
-        erase_view_region(view, key)
+def _erase_squiggles(view: sublime.View, squiggles: list[tuple[Squiggle, str]]) -> None:
+    uids_per_batch: defaultdict[Squiggle, set[str]] = defaultdict(set)
+    for key, uid in squiggles:
+        if key.uids:
+            uids_per_batch[key].add(uid)
+        else:
+            erase_view_region(view, key)
+    for key, uids in uids_per_batch.items():
+        remove_from_batch(view, key, uids)
 
 
 class IdleViewController(sublime_plugin.EventListener):
@@ -961,6 +1379,98 @@ def redraw_squiggle(
     return new_key
 
 
+# --------------- LAZY RENDERING ------------------- #
+
+# For files with a lot of errors we render the errors around the viewport
+# fully, t.i. with annotations and phantoms, and draw cheap marks for all
+# the others.  While the user scrolls, a poller fills in the newly
+# visible errors.
+
+@dataclass
+class LazyRender:
+    filename: str
+    # The region we rendered fully
+    window: sublime.Region
+    # The uids of the errors we rendered fully
+    rendered: set[str]
+
+
+LAZY_VIEWS: dict[sublime.ViewId, LazyRender] = {}
+LAZY_RENDER_INTERVAL = 16  # [ms]
+_LAZY_POLLER_RUNNING = False
+
+
+def render_window(view: sublime.View) -> sublime.Region:
+    """Return the visible region plus a margin of its size above and below."""
+    visible = view.visible_region()
+    margin = max(visible.size(), 1000)
+    return sublime.Region(
+        max(0, visible.begin() - margin), min(view.size(), visible.end() + margin)
+    )
+
+
+@util.ensure_on_ui_thread
+def set_lazy_render(vid: sublime.ViewId, lazy: Optional[LazyRender]) -> None:
+    # On the UI thread, and thus after the `draw` that belongs to it.
+    if lazy is None:
+        LAZY_VIEWS.pop(vid, None)
+    else:
+        LAZY_VIEWS[vid] = lazy
+
+
+def start_lazy_render_poller() -> None:
+    global _LAZY_POLLER_RUNNING
+    if _LAZY_POLLER_RUNNING:
+        return
+
+    _LAZY_POLLER_RUNNING = True
+    sublime.set_timeout(poll_lazy_views, LAZY_RENDER_INTERVAL)
+
+
+def poll_lazy_views() -> None:
+    global _LAZY_POLLER_RUNNING
+    if not LAZY_VIEWS:
+        _LAZY_POLLER_RUNNING = False
+        return
+
+    view = State['active_view']
+    if view and view.id() in LAZY_VIEWS:
+        fill_in_viewport(view)
+    sublime.set_timeout(poll_lazy_views, LAZY_RENDER_INTERVAL)
+
+
+@util.assert_on_ui_thread
+def fill_in_viewport(view: sublime.View) -> None:
+    """Fully render the errors which came into view."""
+    vid = view.id()
+    lazy = LAZY_VIEWS.get(vid)
+    if lazy is None or lazy.window.contains(view.visible_region()):
+        return
+
+    lazy.window = window = render_window(view)
+    errors = error_index.for_file(lazy.filename).intersecting(window)
+    new_errors = [e for e in errors if e['uid'] not in lazy.rendered]
+    if new_errors:
+        new = {e['uid'] for e in new_errors}
+        lazy.rendered |= new
+        # Errors at the same position always come into view together.
+        highlights, loosers = filter_errors(new_errors, by_position)
+        squiggles = prepare_squiggles(
+            vid, highlights, loosers, get_demote_predicate(), get_demote_scope())
+
+        for key in get_regions_keys(view):
+            if (
+                isinstance(key, Squiggle)
+                and key.uid.startswith(MARKS)
+                and not new.isdisjoint(key.uids)
+            ):
+                remove_from_batch(view, key, new)
+        for key, regions in squiggles.items():
+            draw_view_region(view, key, regions)
+
+    draw_phantoms(view, errors)
+
+
 # --------------- UTIL FUNCTIONS ------------------- #
 
 
@@ -1052,13 +1562,6 @@ TOOLTIP_TEMPLATE = '''
 QUICK_FIX_HELP = " | Click <span class='icon'>⌦</span> to trigger a quick action"
 
 
-def get_errors_where(filename: str, fn: Callable[[sublime.Region], bool]) -> list[LintError]:
-    return [
-        error for error in persist.file_errors[filename]
-        if fn(error['region'])
-    ]
-
-
 def open_tooltip(view: sublime.View, point: int, line_report: bool = False) -> None:
     """Show a tooltip containing all linting errors on a given line."""
     # Leave any existing popup open without replacing it
@@ -1066,14 +1569,11 @@ def open_tooltip(view: sublime.View, point: int, line_report: bool = False) -> N
     if view.is_popup_visible():
         return
 
-    filename = util.canonical_filename(view)
+    index = error_index.for_file(util.canonical_filename(view))
     if line_report:
-        line = view.full_line(point)
-        errors = get_errors_where(
-            filename, lambda region: region.intersects(line))
+        errors = index.intersecting(view.full_line(point))
     else:
-        errors = get_errors_where(
-            filename, lambda region: region.contains(point))
+        errors = index.containing(point)
 
     if not errors:
         return
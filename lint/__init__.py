@@ -4,6 +4,7 @@
 VERSION = 4
 
 from . import (
+    daemon,
     linter,
     persist,
     util,
@@ -13,6 +14,7 @@ from .const import WARNING, ERROR
 from .util import STREAM_STDOUT, STREAM_STDERR, STREAM_BOTH
 
 from .linter import Linter, LintMatch, TransientError, PermanentError
+from .daemon import DaemonCodec, JsonLinesCodec
 from .base_linter.python_linter import PythonLinter
 from .base_linter.ruby_linter import RubyLinter
 from .base_linter.node_linter import NodeLinter
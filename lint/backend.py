@@ -1,13 +1,15 @@
 from __future__ import annotations
 import sublime
 
-from collections import deque
+from collections import Counter, deque, OrderedDict
 from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
 from contextlib import contextmanager
 from dataclasses import dataclass
 from itertools import chain, count
 from functools import lru_cache, partial
 import hashlib
+import heapq
+import json
 import logging
 import multiprocessing
 import os
@@ -15,9 +17,12 @@ import time
 import threading
 import traceback
 
-from . import events, linter as linter_module, persist, style, util
+from . import (
+    config_watcher, error_record, events, linter as linter_module, persist, profiler, style, util
+)
+from .cancellation import CancellationToken
 
-from typing import Callable, Iterator, TypeVar
+from typing import Callable, Hashable, Iterator, Optional, TypeVar
 from typing_extensions import TypeAlias
 from .persist import LintError
 from .elect import LinterInfo
@@ -32,6 +37,7 @@ Task = Callable[[], T]
 ViewChangedFn = Callable[[], bool]
 FileName = str
 LinterName = str
+Sink = Callable[[LinterName, LintResult], None]
 ViewContext = linter_module.ViewContext
 
 
@@ -40,12 +46,129 @@ class LintJob:
     linter_name: LinterName
     ctx: ViewContext
     tasks: list[Task[LintResult]]
+    key: Hashable
+    view_has_changed: ViewChangedFn
+    priority: int
+    max_concurrency: Optional[int]
+    token: Optional[CancellationToken] = None
 
 
 logger = logging.getLogger(__name__)
 
+# Lower numbers run first
+PRIORITY_ACTIVE_VIEW = 0
+PRIORITY_VISIBLE_VIEW = 1
+PRIORITY_BACKGROUND = 2
+
+
+class Scheduler:
+    """Run lint jobs on a fixed number of threads, most urgent first.
+
+    Jobs are ordered by their priority and then by submission order.
+    A queued job is dropped if its view changed in the meantime, if it
+    has been cancelled, or if a newer job for the same view and linter has
+    been submitted.  A linter
+    can limit how many of its jobs run at the same time via the setting
+    "max_concurrent_jobs"; its jobs then wait in the queue while others
+    may overtake them.
+    """
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._queue: list[tuple[int, int, LintJob, Callable[[], None]]] = []
+        self._latest: dict[Hashable, int] = {}
+        self._running: Counter[LinterName] = Counter()
+        self._condition = threading.Condition()
+        self._counter = count()
+        self._threads: list[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, job: LintJob, fn: Callable[[], None]) -> None:
+        with self._condition:
+            if self._shutdown:
+                return
+            seq = next(self._counter)
+            self._latest[job.key] = seq
+            heapq.heappush(self._queue, (job.priority, seq, job, fn))
+            self._ensure_threads()
+            self._condition.notify()
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._shutdown = True
+            self._queue.clear()
+            self._latest.clear()
+            self._condition.notify_all()
+
+    def _ensure_threads(self) -> None:
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._work,
+                name='SublimeLinterScheduler-{}'.format(len(self._threads)),
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            entry = self._next_job()
+            if entry is None:
+                return
+
+            _, _, job, fn = entry
+            try:
+                if job.view_has_changed() or (job.token and job.token.cancelled):
+                    logger.info(
+                        "Drop outdated job: {} for '{}'"
+                        .format(job.linter_name, job.ctx["short_canonical_filename"])
+                    )
+                else:
+                    fn()
+            finally:
+                with self._condition:
+                    self._running[job.linter_name] -= 1
+                    self._condition.notify_all()
+
+    def _next_job(self) -> Optional[tuple[int, int, LintJob, Callable[[], None]]]:
+        with self._condition:
+            while not self._shutdown:
+                entry = self._pop_runnable_job()
+                if entry:
+                    return entry
+                self._condition.wait()
+            return None
+
+    def _pop_runnable_job(self) -> Optional[tuple[int, int, LintJob, Callable[[], None]]]:
+        postponed = []
+        try:
+            while self._queue:
+                entry = heapq.heappop(self._queue)
+                _, seq, job, _ = entry
+                if self._latest.get(job.key) != seq:
+                    logger.info(
+                        "Drop superseded job: {} for '{}'"
+                        .format(job.linter_name, job.ctx["short_canonical_filename"])
+                    )
+                    continue
+
+                if (
+                    job.max_concurrency
+                    and self._running[job.linter_name] >= job.max_concurrency
+                ):
+                    postponed.append(entry)
+                    continue
+
+                del self._latest[job.key]
+                self._running[job.linter_name] += 1
+                return entry
+            return None
+        finally:
+            for entry in postponed:
+                heapq.heappush(self._queue, entry)
+
+
 MAX_CONCURRENT_TASKS = multiprocessing.cpu_count() or 1
-orchestrator = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TASKS)
+scheduler = Scheduler(max_workers=MAX_CONCURRENT_TASKS)
 executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TASKS)
 
 
@@ -57,35 +180,92 @@ def lint_view(
     linters: list[LinterInfo],
     view: sublime.View,
     view_has_changed: ViewChangedFn,
-    sink: Callable[[LinterName, LintResult], None]
+    sink: Sink,
+    priority: Optional[int] = None,
+    partial_sink: Optional[Sink] = None,
+    token: Optional[CancellationToken] = None
 ) -> None:
     """Lint the given view.
 
     This is the top level lint dispatcher. It falls through.
+
+    If given, `partial_sink` receives the errors found so far while a
+    linter is still running; `sink` always gets the complete result.
+    Cancelling `token` drops queued jobs and terminates running linters.
     """
+    if priority is None:
+        priority = compute_priority(view, linters)
+    bid = view.buffer_id()
     lint_jobs = [
-        LintJob(linter.name, linter.context, tasks)
+        LintJob(
+            linter.name,
+            linter.context,
+            tasks,
+            key=(bid, linter.name),
+            view_has_changed=view_has_changed,
+            priority=priority,
+            max_concurrency=get_max_concurrency(linter),
+            token=token,
+        )
         for linter in linters
-        if (tasks := list(tasks_per_linter(view, view_has_changed, linter)))
+        if (tasks := list(tasks_per_linter(view, view_has_changed, linter, partial_sink, token)))
     ]
     warn_excessive_tasks(lint_jobs)
 
     for job in lint_jobs:
         # Explicitly catch all unhandled errors because we fire-and-forget!
-        orchestrator.submit(print_all_exceptions(run_job), job, sink)
+        scheduler.submit(job, partial(print_all_exceptions(run_job), job, sink))
+
+
+def compute_priority(view: sublime.View, linters: list[LinterInfo]) -> int:
+    if any(linter.context.get('reason') == 'on_user_request' for linter in linters):
+        return PRIORITY_ACTIVE_VIEW
+
+    window = view.window()
+    if not window:
+        return PRIORITY_BACKGROUND
+    if window == sublime.active_window() and window.active_view() == view:
+        return PRIORITY_ACTIVE_VIEW
+    if any(
+        window.active_view_in_group(group) == view
+        for group in range(window.num_groups())
+    ):
+        return PRIORITY_VISIBLE_VIEW
+    return PRIORITY_BACKGROUND
+
+
+def get_max_concurrency(linter: LinterInfo) -> Optional[int]:
+    value = linter.settings.get('max_concurrent_jobs')
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return value
+    return None
+
+
+def shutdown() -> None:
+    scheduler.shutdown()
+    executor.shutdown(wait=False)
 
 
 def tasks_per_linter(
     view: sublime.View,
     view_has_changed: ViewChangedFn,
-    linter_info: LinterInfo
+    linter_info: LinterInfo,
+    partial_sink: Optional[Sink] = None,
+    token: Optional[CancellationToken] = None
 ) -> Iterator[Task[LintResult]]:
+    # Partial results replace the errors of a linter; with multiple
+    # regions they would replace each other.
+    stream = partial_sink is not None and len(linter_info.regions) == 1
     for region in linter_info.regions:
         linter = linter_info.klass(view, linter_info.settings)
         code = view.substr(region)
         offsets = view.rowcol(region.begin()) + (region.begin(),)
+        if stream:
+            assert partial_sink
+            linter.on_partial_result = partial(
+                publish_partial_result, linter, offsets, view_has_changed, partial_sink)
 
-        task = partial(execute_lint_task, linter, code, offsets, view_has_changed)
+        task = partial(execute_lint_task, linter, code, offsets, view_has_changed, token)
         executor = partial(modify_thread_name, linter_info, task)
         yield executor
 
@@ -116,11 +296,19 @@ def execute_lint_task(
     linter: Linter,
     code: str,
     offsets: tuple,
-    view_has_changed: ViewChangedFn
+    view_has_changed: ViewChangedFn,
+    token: Optional[CancellationToken] = None
 ) -> LintResult:
+    if token:
+        if token.cancelled:
+            # The slot is free right away for the other tasks.
+            raise linter_module.TransientError('cancelled')
+        linter.cancellation_token = token
+
     try:
-        errors = linter.lint(code, view_has_changed)
-        finalize_errors(linter, errors, offsets)
+        errors = lint_or_reuse_result(linter, code, view_has_changed)
+        with profiler.measure('finalize', linter.name):
+            finalize_errors(linter, errors, offsets)
         return errors
     except linter_module.TransientError:
         # For `TransientError`s we want to omit calling the `sink` at all.
@@ -135,6 +323,171 @@ def execute_lint_task(
         return []  # Empty list here to clear old errors
 
 
+def publish_partial_result(
+    linter: Linter,
+    offsets: tuple,
+    view_has_changed: ViewChangedFn,
+    sink: Sink,
+    errors: list[LintError]
+) -> None:
+    if view_has_changed():
+        return
+    errors = [copy_error(error) for error in errors]
+    finalize_errors(linter, errors, offsets)
+    # Same thread as the final result in `run_job`, which thus always
+    # comes after all partial results.
+    sublime.set_timeout_async(lambda: sink(linter.name, errors))
+
+
+# For these reasons we always run the linter (and then refresh the cache).
+# Saving is the canonical "please really look at it" signal, and linters
+# often read config or sibling files from disk which we don't track.
+UNCACHEABLE_REASONS = {'on_save', 'on_user_request', 'on_config_change'}
+RESULT_CACHE_MAX_ENTRIES = 1000
+RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ReusedResult(list):
+    """Errors served from the `result_cache`, t.i. no linter did run."""
+
+
+class LintResultCache:
+    """Content-addressed LRU store for *unfinalized* lint results.
+
+    Bounded by the number of entries and by an estimate of the memory the
+    stored errors occupy; the least recently used entries are evicted first.
+    """
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[type, list[LintError], int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, klass: type) -> Optional[list[LintError]]:
+        with self._lock:
+            try:
+                klass_, errors, _ = self._entries[key]
+            except KeyError:
+                klass_ = None
+            if klass_ is not klass:
+                # Note: a reloaded plugin brings a new class, possibly
+                # with a different regex et.al.
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ReusedResult(copy_error(error) for error in errors)
+
+    def put(self, key: str, klass: type, errors: list[LintError]) -> None:
+        cost = estimate_size(errors)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (klass, [copy_error(error) for error in errors], cost)
+            self.size += cost
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.size > self.max_bytes
+            ):
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: str) -> None:
+        try:
+            _, _, cost = self._entries.pop(key)
+        except KeyError:
+            pass
+        else:
+            self.size -= cost
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        return "{} hits, {} misses ({:.0%}), {} entries, {:.1f} KiB".format(
+            self.hits, self.misses, self.hits / total if total else 0,
+            len(self._entries), self.size / 1024
+        )
+
+
+result_cache = LintResultCache(RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES)
+
+
+def copy_error(error: LintError) -> LintError:
+    rv = error.copy()
+    region = rv.get('region')
+    if region is not None:
+        rv['region'] = sublime.Region(region.a, region.b)
+    return rv
+
+
+def estimate_size(errors: list[LintError]) -> int:
+    return sum(
+        100 + sum(len(value) for value in error.values() if isinstance(value, str))
+        for error in errors
+    )
+
+
+def make_result_cache_key(linter: Linter, code: str) -> str:
+    cmd = linter.resolve_cmd() if linter.cmd is not None else None
+    ingredients = [
+        linter.name,
+        cmd,
+        util.canonical_filename(linter.view),
+        linter.context.get('folder'),
+        linter.context.get('project_root'),
+        sorted(linter.env.items()),
+        linter_module.settings_fingerprint(linter.settings),
+    ]
+    h = hashlib.sha256(json.dumps(ingredients, default=repr).encode('utf-8'))
+    h.update(b'\0')
+    h.update(code.encode('utf-8'))
+    return h.hexdigest()
+
+
+def lint_or_reuse_result(
+    linter: Linter,
+    code: str,
+    view_has_changed: ViewChangedFn
+) -> list[LintError]:
+    reason = linter.context.get('reason')
+    if not reason:  # direct API usage, e.g. tests
+        return linter.lint(code, view_has_changed)
+
+    key = make_result_cache_key(linter, code)
+    # The key resolved the command, and with it the project root.
+    config_watcher.watch(linter)
+    if reason not in UNCACHEABLE_REASONS:
+        cached = result_cache.get(key, type(linter))
+        if cached is not None:
+            logger.info(
+                "{}: reusing cached result for '{}'.  {}"
+                .format(linter.name, util.short_canonical_filename(linter.view), result_cache.stats())
+            )
+            return cached
+
+    errors = linter.lint(code, view_has_changed)
+    remember_result(linter, key, errors)
+    return errors
+
+
+def remember_result(linter: Linter, key: str, errors: list[LintError]) -> None:
+    # Results which mention other files depend on more than the code we
+    # pass in, t.i. we can't key them by the buffer content alone.
+    filename = os.path.normcase(util.canonical_filename(linter.view))
+    if all(os.path.normcase(error['filename']) == filename for error in errors):
+        result_cache.put(key, type(linter), errors)
+
+
 def finalize_errors(
     linter: Linter,
     errors: list[LintError],
@@ -145,8 +498,10 @@ def finalize_errors(
     eof = view.size()
     view_filename = util.canonical_filename(view)
     line_offset, col_offset, pt_offset = offsets
+    text: Optional[str] = None
 
-    for error in errors:
+    for i, error in enumerate(errors):
+        error = errors[i] = error_record.compact(error)
         belongs_to_main_file = (
             os.path.normcase(error['filename']) == os.path.normcase(view_filename)
         )
@@ -174,27 +529,72 @@ def finalize_errors(
             'offending_text': offending_text,
         })
 
+        if belongs_to_main_file:
+            if text is None:
+                text = view.substr(sublime.Region(0, eof))
+            anchor: Optional[str] = '{}\0{}'.format(
+                line_text_at(text, region.a).strip(), offending_text)
+        else:
+            anchor = None
         error.update({
-            'uid': make_error_uid(error),
+            'uid': make_error_uid(error, anchor),
             'priority': style.get_value('priority', error, 0),
         })
+    make_uids_unique(errors)
+
+
+def make_uids_unique(errors: list[LintError]) -> None:
+    """Suffix the uids of identical errors on identical lines.
+
+    E.g. in repetitive code, or in two cells of a file (which are linted
+    by separate tasks).
+    """
+    seen: set[str] = set()
+    duplicates: list[LintError] = []
+    for error in errors:
+        if error['uid'] in seen:
+            duplicates.append(error)
+        else:
+            seen.add(error['uid'])
+
+    for error in duplicates:
+        uid, n = error['uid'], 1
+        while '{}:{}'.format(uid, n) in seen:
+            n += 1
+        error['uid'] = '{}:{}'.format(uid, n)
+        seen.add(error['uid'])
 
 
 PROPERTIES_FOR_UID = (
-    'filename', 'linter', 'line', 'start', 'error_type', 'code', 'msg',
+    'filename', 'linter', 'error_type', 'code', 'msg',
 )
 
 
-def make_error_uid(error: LintError) -> str:
+def make_error_uid(error: LintError, anchor: Optional[str] = None) -> str:
+    """Return an identity for `error` which survives edits elsewhere.
+
+    Instead of the position we hash the `anchor`, usually the text of the
+    line and the offending text.  An error which only moved, because the
+    user typed above it, thus keeps its uid and we don't redraw it.
+    Without an anchor, e.g. for errors in other files, we fall back to
+    the position.
+    """
+    if anchor is None:
+        anchor = '{}:{}'.format(error['line'], error['start'])
     return hashlib.sha256(
-        ''.join(
-            str(error[k])  # type: ignore
-            for k in PROPERTIES_FOR_UID
+        '\0'.join(
+            [str(error[k]) for k in PROPERTIES_FOR_UID] + [anchor]  # type: ignore[literal-required]
         )
         .encode('utf-8')
     ).hexdigest()
 
 
+def line_text_at(text: str, pt: int) -> str:
+    start = text.rfind('\n', 0, pt) + 1
+    end = text.find('\n', pt)
+    return text[start:] if end == -1 else text[start:end]
+
+
 def warn_excessive_tasks(jobs: list[LintJob]) -> None:
     total_tasks = sum(len(job.tasks) for job in jobs)
     if total_tasks > 4:
@@ -229,8 +629,9 @@ def print_all_exceptions(fn: Callable[P, T]) -> Callable[P, T]:
     return inner
 
 
-def run_job(job: LintJob, sink: Callable[[LinterName, LintResult], None]) -> None:
-    with broadcast_lint_runtime(job), remember_runtime(job):
+def run_job(job: LintJob, sink: Sink) -> None:
+    with broadcast_lint_runtime(job):
+        start_time = time.perf_counter()
         try:
             results = run_concurrently(job.tasks, executor=executor)
         except linter_module.TransientError:
@@ -238,13 +639,21 @@ def run_job(job: LintJob, sink: Callable[[LinterName, LintResult], None]) -> Non
         except Exception:
             traceback.print_exc()
             return  # ABORT
+        # Only finished runs count, cancelled ones and cache hits would
+        # look fast.
+        if not all(isinstance(result, ReusedResult) for result in results):
+            remember_runtime(job, time.perf_counter() - start_time)
 
-    errors = list(chain.from_iterable(results))  # flatten and consume
+        errors = list(chain.from_iterable(results))  # flatten and consume
+        if len(results) > 1:
+            make_uids_unique(errors)
 
-    # We don't want to guarantee that our consumers/views are thread aware.
-    # So we merge here into Sublime's shared worker thread. Sublime guarantees
-    # here to execute all scheduled tasks ordered and sequentially.
-    sublime.set_timeout_async(lambda: sink(job.linter_name, errors))
+        # We don't want to guarantee that our consumers/views are thread aware.
+        # So we merge here into Sublime's shared worker thread. Sublime guarantees
+        # here to execute all scheduled tasks ordered and sequentially.
+        # Note that we schedule before `lint_end` is broadcast; its listeners
+        # can rely on that.
+        sublime.set_timeout_async(lambda: sink(job.linter_name, errors))
 
 
 def run_concurrently(tasks: list[Task[T]], executor: ThreadPoolExecutor) -> list[T]:
@@ -258,29 +667,65 @@ def run_concurrently(tasks: list[Task[T]], executor: ThreadPoolExecutor) -> list
 
 
 global_lock = threading.RLock()
-elapsed_runtimes = deque([0.6] * 3, maxlen=10)
 MIN_DEBOUNCE_DELAY = 0.0005
 MAX_AUTOMATIC_DELAY = 2.0
+INITIAL_RUNTIME_GUESS = 0.6
+EWMA_WEIGHT = 0.3
+Project = str
+
+
+class RuntimeStats:
+    """Recent runtimes of one linter in one project."""
+    def __init__(self, initial: float = INITIAL_RUNTIME_GUESS, maxlen: int = 20) -> None:
+        self.ewma = initial
+        self.samples: deque[float] = deque([initial] * 3, maxlen=maxlen)
+
+    def add(self, runtime: float) -> None:
+        self.ewma = EWMA_WEIGHT * runtime + (1 - EWMA_WEIGHT) * self.ewma
+        self.samples.append(runtime)
+
+    def percentile(self, p: float) -> float:
+        runtimes = sorted(self.samples)
+        return runtimes[min(len(runtimes) - 1, int(p * len(runtimes)))]
+
+    def estimate(self) -> float:
+        # The EWMA follows trends quickly, the percentile caps the
+        # influence of single outliers.
+        return min(self.ewma, self.percentile(0.9))
+
+
+runtime_stats: dict[tuple[LinterName, Project], RuntimeStats] = {}
 
 
 def get_delay() -> float:
-    """Return the delay between a lint request and when it will be processed."""
-    runtimes = sorted(elapsed_runtimes)
-    middle = runtimes[len(runtimes) // 2]
-    return max(
-        max(MIN_DEBOUNCE_DELAY, float(persist.settings.get('delay'))),
-        min(MAX_AUTOMATIC_DELAY, middle / 2)
-    )
+    """Return the minimal delay between a lint request and when it will be processed."""
+    return max(MIN_DEBOUNCE_DELAY, float(persist.settings.get('delay')))
 
 
-@contextmanager
-def remember_runtime(job: LintJob) -> Iterator[None]:
-    start_time = time.perf_counter()
-    yield
-    end_time = time.perf_counter()
-    runtime = end_time - start_time
+def get_delay_for(linter_name: LinterName, project: Project) -> float:
+    """Return the delay for a linter, based on its runtimes in the project.
+
+    Fast linters get the minimal delay, slow linters wait for a longer
+    pause in typing.
+    """
+    with global_lock:
+        stats = runtime_stats.get((linter_name, project))
+        estimate = stats.estimate() if stats else INITIAL_RUNTIME_GUESS
+    return max(get_delay(), min(MAX_AUTOMATIC_DELAY, estimate / 2))
+
+
+def project_of(ctx: ViewContext) -> Project:
+    return ctx.get('folder') or ''
+
+
+def remember_runtime(job: LintJob, runtime: float) -> None:
+    key = (job.linter_name, project_of(job.ctx))
     with global_lock:
-        elapsed_runtimes.append(runtime)
+        try:
+            stats = runtime_stats[key]
+        except KeyError:
+            stats = runtime_stats[key] = RuntimeStats()
+        stats.add(runtime)
 
     logger.info(
         "Linting '{}' with {} took {:.2f}s"
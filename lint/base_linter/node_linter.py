@@ -49,6 +49,8 @@ class NodeLinter(linter.Linter):
     """
     __abstract__ = True
 
+    executable_markers = ('package.json', 'node_modules/.bin')
+
     def context_sensitive_executable_path(self, cmd: list[str]) -> tuple[bool, str | list[str] | None]:
         """
         Attempt to locate the npm module specified in cmd.
@@ -25,6 +25,8 @@ class PhpLinter(linter.Linter):
     """
     __abstract__ = True
 
+    executable_markers = ('composer.json', 'vendor/bin')
+
     def context_sensitive_executable_path(self, cmd) -> tuple[bool, str | list[str] | None]:
         """
         Attempt to locate the composer package specified in cmd.
@@ -1,7 +1,6 @@
 """This module exports the PythonLinter subclass of Linter."""
 from __future__ import annotations
 
-from functools import lru_cache
 import os
 import re
 import shutil
@@ -10,7 +9,7 @@ import sublime
 
 from .. import linter, util
 
-from typing import Optional
+from typing import Callable, Optional
 
 
 POSIX = sublime.platform() in ('osx', 'linux')
@@ -50,6 +49,19 @@ class PythonLinter(linter.Linter):
     This is always in addition to what `ROOT_MARKERS` in SL core defines.
     """
 
+    executable_markers = tuple(
+        '{}/{}'.format(candidate, BIN) for candidate in VIRTUAL_ENV_MARKERS
+    )
+
+    @classmethod
+    def get_config_files(cls) -> tuple[str, ...]:
+        return (
+            super().get_config_files()
+            + ("setup.cfg", "pyproject.toml", "tox.ini")
+            + cls.config_file_names
+            + ('poetry.lock', 'Pipfile')
+        )
+
     def context_sensitive_executable_path(self, cmd: list[str]) -> tuple[bool, str | list[str] | None]:
         """Try to find an executable for a given cmd."""
         # The default implementation will look for a user defined `executable`
@@ -235,23 +247,46 @@ def ask_utility_for_venv(cwd: str, cmd: tuple[str, ...]) -> str | None:
         return None
 
 
-@lru_cache(maxsize=None)
+# The answers of the venv utilities per cwd, and the versions of the
+# pythons per path.  `forget_cached` drops entries if config files change.
+venv_cache: dict[tuple[str, tuple[str, ...]], str] = {}
+python_versions: dict[str, dict] = {}
+
+
 def _ask_utility_for_venv(cwd: str, cmd: tuple[str, ...]) -> str:
-    return util.check_output(cmd, cwd=cwd).strip().split('\n')[-1]
+    try:
+        return venv_cache[(cwd, cmd)]
+    except KeyError:
+        rv = venv_cache[(cwd, cmd)] = util.check_output(cmd, cwd=cwd).strip().split('\n')[-1]
+        return rv
+
+
+def forget_cached(affected: Callable[[str], bool]) -> None:
+    for key in list(venv_cache):
+        if affected(key[0]):
+            venv_cache.pop(key, None)
+    for path in list(python_versions):
+        if affected(path):
+            python_versions.pop(path, None)
 
 
 VERSION_RE = re.compile(r'(?P<major>\d+)(?:\.(?P<minor>\d+))?')
 
 
-@lru_cache(maxsize=None)
 def get_python_version(path):
     """Return a dict with the major/minor version of the python at path."""
+    try:
+        return python_versions[path]
+    except KeyError:
+        pass
+
     try:
         output = util.check_output([path, '-V'])
     except Exception:
         output = ''
 
-    return extract_major_minor_version(output.split(' ')[-1])
+    rv = python_versions[path] = extract_major_minor_version(output.split(' ')[-1])
+    return rv
 
 
 def extract_major_minor_version(version):
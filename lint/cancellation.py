@@ -0,0 +1,79 @@
+"""Cancel lints whose results are no longer wanted.
+
+All lints of the same buffer content share one `CancellationToken`.  The
+token gets cancelled as soon as the buffer changes or closes; queued work
+is then dropped and running linter processes get terminated.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+import threading
+import traceback
+
+
+from typing import Callable, Iterator, TYPE_CHECKING
+if TYPE_CHECKING:
+    import sublime
+    Bid = sublime.BufferId
+
+
+class CancellationToken:
+    def __init__(self) -> None:
+        self.cancelled = False
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return '<CancellationToken cancelled={}>'.format(self.cancelled)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                traceback.print_exc()
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """Call `callback` if the token gets cancelled within this context."""
+        with self._lock:
+            cancelled = self.cancelled
+            if not cancelled:
+                self._callbacks.append(callback)
+        if cancelled:
+            callback()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                try:
+                    self._callbacks.remove(callback)
+                except ValueError:
+                    pass
+
+
+tokens: dict[Bid, CancellationToken] = {}
+tokens_lock = threading.Lock()
+
+
+def token_for(bid: Bid) -> CancellationToken:
+    """Return the token for the current content of the buffer."""
+    with tokens_lock:
+        token = tokens.get(bid)
+        if token is None or token.cancelled:
+            token = tokens[bid] = CancellationToken()
+        return token
+
+
+def cancel(bid: Bid) -> None:
+    """Cancel all lints of the current content of the buffer."""
+    with tokens_lock:
+        token = tokens.pop(bid, None)
+    if token:
+        token.cancel()
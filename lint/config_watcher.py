@@ -0,0 +1,176 @@
+"""Relint views when the config files of their linters change.
+
+Editing `.eslintrc`, `setup.cfg`, `package.json` and the like changes what
+a linter reports (or which executable we use) but does not touch the
+linted buffers, so nothing would happen until the user types or saves.
+
+After a linter has run we remember the config files it may read, t.i.
+the `Linter.get_config_files()` in each directory from the linted file up
+to the root the linter resolved, usually its project root.  We poll their
+modification times, which is cheap and works on every platform and file
+system.  On a change we drop the cached executables and virtual
+environments below the changed directories and broadcast
+`config_files_changed` with the affected buffers.
+"""
+from __future__ import annotations
+import logging
+import os
+import threading
+
+import sublime
+
+from . import events, executable_cache, persist, util
+
+
+from typing import Iterable, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .linter import Linter
+    Bid = sublime.BufferId
+    LinterName = str
+
+
+logger = logging.getLogger(__name__)
+
+watched: dict[tuple[Bid, LinterName], frozenset[str]] = {}
+mtimes: dict[str, Optional[float]] = {}
+lock = threading.Lock()
+polling = False
+
+
+def watch(linter: Linter) -> None:
+    """Watch the config files `linter` may have read."""
+    key = (linter.view.buffer_id(), linter.name)
+    paths = watched_paths(linter)
+    with lock:
+        if watched.get(key) == paths:
+            return
+        if paths:
+            watched[key] = paths
+            for path in paths:
+                if path not in mtimes:
+                    mtimes[path] = mtime(path)
+        else:
+            watched.pop(key, None)
+        _forget_unwatched_paths()
+    if paths:
+        ensure_polling()
+
+
+def unwatch(bid: Bid, keep: Iterable[LinterName] = ()) -> None:
+    """Stop watching for buffer `bid`, except for the linters in `keep`."""
+    keep = set(keep)
+    with lock:
+        keys = [key for key in watched if key[0] == bid and key[1] not in keep]
+        for key in keys:
+            del watched[key]
+        if keys:
+            _forget_unwatched_paths()
+
+
+def _forget_unwatched_paths() -> None:
+    still_watched = set().union(*watched.values())
+    for path in mtimes.keys() - still_watched:
+        del mtimes[path]
+
+
+def watched_paths(linter: Linter) -> frozenset[str]:
+    start_dir = linter.context.get('file_path')
+    if not start_dir:
+        return frozenset()
+    root = linter.get_working_dir() or start_dir
+    names = linter.get_config_files()
+    return frozenset(
+        os.path.join(directory, name)
+        for directory in directories_between(start_dir, root)
+        for name in names
+    )
+
+
+def directories_between(start_dir: str, root: str) -> list[str]:
+    """Return the directories from `start_dir` up to `root`, inclusive.
+
+    If `root` is not above `start_dir`, e.g. for a "working_dir" set
+    elsewhere, return just these two.
+    """
+    directories = []
+    for directory in util.paths_upwards(start_dir):
+        directories.append(directory)
+        if directory == root:
+            return directories
+    return [start_dir] if root == start_dir else [start_dir, root]
+
+
+def is_below(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(os.path.join(directory, ''))
+
+
+def mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def get_interval() -> float:
+    return persist.settings.get('config_watch_interval', 2.0)
+
+
+def ensure_polling() -> None:
+    global polling
+    if polling or get_interval() <= 0:
+        return
+    polling = True
+    sublime.set_timeout_async(poll, int(get_interval() * 1000))
+
+
+def poll() -> None:
+    global polling
+    if persist.kill_switch or not watched or get_interval() <= 0:
+        polling = False
+        return
+
+    check()
+    sublime.set_timeout_async(poll, int(get_interval() * 1000))
+
+
+def check() -> None:
+    """Stat all watched files and report the ones that changed."""
+    with lock:
+        paths = list(mtimes)
+    changed = set()
+    for path in paths:
+        current = mtime(path)
+        with lock:
+            if path in mtimes and mtimes[path] != current:
+                mtimes[path] = current
+                changed.add(path)
+    if not changed:
+        return
+
+    with lock:
+        bids = {bid for (bid, _), paths_ in watched.items() if paths_ & changed}
+    logger.info("Config files changed: {}".format(", ".join(sorted(changed))))
+    invalidate_caches({os.path.dirname(path) for path in changed})
+    events.broadcast(events.CONFIG_FILES_CHANGED, {
+        'filenames': changed,
+        'buffer_ids': bids,
+    })
+
+
+def invalidate_caches(directories: set[str]) -> None:
+    """Forget what we derived from config files in or below `directories`."""
+    from .base_linter import python_linter
+
+    def affected(path: Optional[str]) -> bool:
+        return bool(path) and any(is_below(path, d) for d in directories)  # type: ignore[arg-type]
+
+    python_linter.forget_cached(affected)
+    executable_cache.forget(affected)
+
+
+def stop() -> None:
+    global polling
+    with lock:
+        watched.clear()
+        mtimes.clear()
+    polling = False
@@ -0,0 +1,270 @@
+"""Long-lived linter processes.
+
+Some linters come with a server mode (think `eslint_d` or `dmypy`) which
+avoids paying the startup cost of the interpreter on every lint.  A linter
+opts in by setting `daemon_codec`.  Its `cmd` then *starts* the daemon, and
+every lint is sent as one request over the stdin/stdout pipes of that
+process.  The codec translates between a lint and the wire protocol of the
+daemon.
+
+We keep one daemon per linter and project root.  A daemon is restarted if
+it dies, stopped after some idle time, and killed when the plugin unloads.
+"""
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import json
+import logging
+import subprocess
+import threading
+import time
+
+from . import queue, util
+
+
+from typing import Hashable, IO, Optional, Tuple, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .linter import Linter
+Key = Tuple[str, str]
+
+
+logger = logging.getLogger(__name__)
+
+STOP_TIMEOUT = 1.0
+
+daemons: dict[Key, Daemon] = {}
+daemons_lock = threading.Lock()
+
+
+class DaemonError(Exception):
+    """The daemon died or did not answer in time."""
+
+
+class DaemonStopped(DaemonError):
+    """The daemon has been stopped while we were waiting for it."""
+
+
+class DaemonCodec(ABC):
+    """Translate between a lint and the protocol of a daemon.
+
+    `encode_request` returns the bytes we write to the stdin of the daemon.
+    `read_response` must consume exactly *one* answer from its stdout and
+    return the output the linter can parse, t.i. the same output the linter
+    would print when run as an ordinary command.
+    """
+    @abstractmethod
+    def encode_request(self, linter: Linter, code: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def read_response(self, stdout: IO[bytes]) -> str:
+        ...
+
+
+class JsonLinesCodec(DaemonCodec):
+    """Exchange one json object per line.
+
+    Requests look like `{"filename": ..., "cwd": ..., "code": ...}`, the
+    daemon answers with `{"output": ...}`.
+    """
+    def encode_request(self, linter: Linter, code: str) -> bytes:
+        request = {
+            'filename': linter.filename,
+            'cwd': linter.get_working_dir(),
+            'code': code,
+        }
+        return (json.dumps(request) + '\n').encode('utf-8')
+
+    def read_response(self, stdout: IO[bytes]) -> str:
+        line = stdout.readline()
+        if not line:
+            raise EOFError('daemon closed its stdout')
+        return json.loads(line.decode('utf-8'))['output']
+
+
+class Daemon:
+    def __init__(
+        self,
+        key: Key,
+        cmd: list[str],
+        cwd: Optional[str],
+        env: ChainMap,
+        codec: DaemonCodec,
+        version: Hashable = None
+    ) -> None:
+        self.key = key
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = dict(env)
+        self.env_delta = env_delta(env)
+        self.codec = codec
+        self.version = version
+        self.proc: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.stopped = False
+        self.last_used = time.monotonic()
+        self._reader = ThreadPoolExecutor(max_workers=1)
+
+    def __repr__(self) -> str:
+        pid = self.proc.pid if self.proc else None
+        return '<Daemon {} pid={}>'.format(self.key, pid)
+
+    def matches(
+        self, cmd: list[str], cwd: Optional[str], env: ChainMap, version: Hashable = None
+    ) -> bool:
+        return (
+            (self.cmd, self.cwd, self.env_delta, self.version)
+            == (cmd, cwd, env_delta(env), version)
+        )
+
+    def is_alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self) -> None:
+        self.proc = proc = subprocess.Popen(
+            self.cmd, env=self.env, cwd=self.cwd,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            startupinfo=util.create_startupinfo(),
+            creationflags=util.get_creationflags()
+        )
+        logger.info("{}: started daemon <pid {}>: {}".format(self.key[0], proc.pid, self.cmd))
+        threading.Thread(
+            target=drain_stderr, args=(self.key[0], proc), daemon=True
+        ).start()
+
+    def request(self, linter: Linter, code: str, timeout: float) -> str:
+        payload = self.codec.encode_request(linter, code)
+        with self.lock:
+            if self.stopped:
+                raise DaemonStopped("{}: daemon has been stopped".format(self.key[0]))
+            for attempt in (1, 2):
+                if not self.is_alive():
+                    if self.proc is not None:
+                        logger.warning(
+                            "{}: daemon exited with code {}, restarting."
+                            .format(self.key[0], self.proc.returncode))
+                    self.start()
+
+                try:
+                    return self._roundtrip(payload, timeout)
+                except TimeoutError:
+                    self._kill()
+                    raise DaemonError(
+                        "{}: daemon did not answer within {}s"
+                        .format(self.key[0], timeout))
+                except (OSError, EOFError, ValueError, KeyError) as err:
+                    # The stream is probably out of sync now, start over.
+                    self._kill()
+                    if attempt == 2:
+                        raise DaemonError("{}: daemon failed: {}".format(self.key[0], err))
+                    logger.warning("{}: daemon failed: {}, retrying.".format(self.key[0], err))
+        raise AssertionError('unreachable')
+
+    def _roundtrip(self, payload: bytes, timeout: float) -> str:
+        proc = self.proc
+        assert proc and proc.stdin and proc.stdout
+        proc.stdin.write(payload)
+        proc.stdin.flush()
+        # Read on another thread so that a hanging daemon cannot block us
+        # forever.  Killing the process unblocks the reader.
+        return self._reader.submit(self.codec.read_response, proc.stdout).result(timeout)
+
+    def _kill(self) -> None:
+        proc, self.proc = self.proc, None
+        if proc and proc.poll() is None:
+            logger.info("{}: stopping daemon <pid {}>".format(self.key[0], proc.pid))
+            proc.kill()
+            proc.wait()
+
+    def stop(self) -> None:
+        with self.lock:
+            self.stopped = True
+            proc = self.proc
+            if proc and proc.poll() is None and proc.stdin:
+                # Closing stdin is the polite way to ask most daemons to
+                # exit; kill them if they don't.
+                try:
+                    proc.stdin.close()
+                    proc.wait(STOP_TIMEOUT)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+        self._reader.shutdown(wait=False)
+
+
+def env_delta(env: ChainMap) -> dict[str, str]:
+    # Only what we add on top of `os.environ`
+    return dict(ChainMap(*env.maps[0:-1]))
+
+
+def drain_stderr(linter_name: str, proc: subprocess.Popen) -> None:
+    assert proc.stderr
+    for line in proc.stderr:
+        logger.info("{} daemon: {}".format(linter_name, line.decode('utf-8', 'replace').rstrip()))
+
+
+def request(
+    linter: Linter,
+    key: Key,
+    cmd: list[str],
+    cwd: Optional[str],
+    env: ChainMap,
+    code: str,
+    codec: Optional[DaemonCodec] = None,
+    version: Hashable = None
+) -> str:
+    """Send `code` to the daemon for `key`, start it if necessary.
+
+    Uses the `daemon_codec` of the linter unless `codec` is given.  A
+    running daemon is replaced if its `cmd`, `cwd`, `env` or `version`
+    differ.
+    """
+    codec = codec or linter.daemon_codec
+    assert codec
+    retired = None
+    with daemons_lock:
+        daemon = daemons.get(key)
+        if daemon and not daemon.matches(cmd, cwd, env, version):
+            retired, daemon = daemon, None
+        if daemon is None:
+            daemon = daemons[key] = Daemon(key, cmd, cwd, env, codec, version)
+        daemon.pending += 1
+    if retired:
+        retired.stop()
+
+    try:
+        return daemon.request(linter, code, linter.daemon_request_timeout)
+    finally:
+        with daemons_lock:
+            daemon.pending -= 1
+            daemon.last_used = time.monotonic()
+        idle_timeout = linter.daemon_idle_timeout
+        queue.debounce(
+            lambda: stop_if_idle(key, idle_timeout),
+            delay=idle_timeout,
+            key=('SL.daemon', key)
+        )
+
+
+def stop_if_idle(key: Key, idle_timeout: float) -> None:
+    with daemons_lock:
+        daemon = daemons.get(key)
+        if (
+            daemon is None
+            or daemon.pending
+            or time.monotonic() - daemon.last_used < idle_timeout
+        ):
+            return
+        del daemons[key]
+    daemon.stop()
+
+
+def kill_all() -> None:
+    queue.cleanup_group('SL.daemon')
+    with daemons_lock:
+        running = list(daemons.values())
+        daemons.clear()
+    for daemon in running:
+        daemon.stop()
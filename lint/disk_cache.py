@@ -0,0 +1,222 @@
+"""Remember lint results across restarts of Sublime Text.
+
+We store the last results per file together with a hash of the buffer
+content and a "version" of each linter.  On startup, results are only
+trusted if both still match.  The store lives in a single json file under
+Sublime's cache path and is bounded in size; the least recently linted
+files are evicted first.
+"""
+from __future__ import annotations
+import sublime
+
+from collections import OrderedDict
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+
+from . import error_record, linter as linter_module, persist, queue, util
+
+
+from typing import Any, Callable, Iterator
+from .elect import LinterInfo
+FileName = str
+LinterName = str
+LintError = persist.LintError
+Sink = Callable[[LinterName, 'list[LintError]'], None]
+ViewChangedFn = Callable[[], bool]
+
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+MAX_FILES = 1000
+MAX_BYTES = 16 * 1024 * 1024
+WRITE_DELAY = 2.0
+WRITE_KEY = 'SL.disk_cache.write'
+# Keys we don't persist; `panel_line` for example is only meaningful for
+# the currently drawn panel.
+VOLATILE_KEYS = {'panel_line'}
+
+store: OrderedDict[FileName, dict[str, Any]] = OrderedDict()
+store_lock = threading.RLock()
+loaded = False
+
+
+def enabled() -> bool:
+    return bool(persist.settings.get('persistent_cache'))
+
+
+def store_path() -> str:
+    return os.path.join(sublime.cache_path(), 'SublimeLinter', 'results.json')
+
+
+def content_hash(view: sublime.View) -> str:
+    return hashlib.sha256(
+        view.substr(sublime.Region(0, view.size())).encode('utf-8')
+    ).hexdigest()
+
+
+def linter_version(linter: LinterInfo) -> str:
+    """Compute a "version" of a linter from its plugin source and settings."""
+    try:
+        plugin_mtime = os.stat(inspect.getfile(linter.klass)).st_mtime
+    except (OSError, TypeError):
+        plugin_mtime = 0
+    return hashlib.sha256(
+        '{}|{}|{}'.format(
+            linter.name,
+            plugin_mtime,
+            linter_module.settings_fingerprint(linter.settings)
+        ).encode('utf-8')
+    ).hexdigest()
+
+
+def recording_sink(
+    sink: Sink,
+    view: sublime.View,
+    filename: FileName,
+    view_has_changed: ViewChangedFn,
+    linters: list[LinterInfo]
+) -> Sink:
+    """Wrap `sink` so that results are also written to the disk store."""
+    hash_ = content_hash(view)
+    versions = {linter.name: linter_version(linter) for linter in linters}
+
+    def inner(linter_name: LinterName, errors: list[LintError]) -> None:
+        sink(linter_name, errors)
+        if not view_has_changed():
+            record(filename, hash_, linter_name, versions[linter_name], errors)
+
+    return inner
+
+
+def record(
+    filename: FileName,
+    hash_: str,
+    linter_name: LinterName,
+    version: str,
+    errors: list[LintError]
+) -> None:
+    normed_filename = os.path.normcase(filename)
+    payload = [
+        serialize_error(error)
+        for error in errors
+        if os.path.normcase(error['filename']) == normed_filename
+    ]
+    with store_lock:
+        ensure_loaded()
+        entry = store.pop(filename, None)
+        if not entry or entry['hash'] != hash_:
+            entry = {'hash': hash_, 'linters': {}}
+        entry['linters'][linter_name] = {'version': version, 'errors': payload}
+        store[filename] = entry
+        evict()
+    queue.debounce(write, delay=WRITE_DELAY, key=WRITE_KEY)
+
+
+def restore(
+    view: sublime.View,
+    linters: list[LinterInfo]
+) -> Iterator[tuple[LinterName, list[LintError]]]:
+    """Yield stored results for the given linters if they're still valid."""
+    filename = util.canonical_filename(view)
+    with store_lock:
+        ensure_loaded()
+        entry = store.get(filename)
+        if not entry:
+            return
+        if entry['hash'] != content_hash(view):
+            logger.info("Stored results for '{}' are outdated.".format(filename))
+            return
+        stored = dict(entry['linters'])
+
+    for linter in linters:
+        try:
+            item = stored[linter.name]
+        except KeyError:
+            continue
+        if item['version'] != linter_version(linter):
+            continue
+        try:
+            errors = [deserialize_error(error) for error in item['errors']]
+        except (KeyError, TypeError, ValueError):
+            continue
+        yield linter.name, errors
+
+
+def evict() -> None:
+    while len(store) > MAX_FILES:
+        store.popitem(last=False)
+
+
+def serialize_error(error: LintError) -> dict[str, Any]:
+    rv = {key: value for key, value in error.items() if key not in VOLATILE_KEYS}
+    region = error['region']
+    rv['region'] = [region.a, region.b]
+    return rv
+
+
+def deserialize_error(data: dict[str, Any]) -> LintError:
+    rv = error_record.ErrorRecord(data)
+    a, b = rv['region']
+    rv['region'] = sublime.Region(a, b)
+    return rv  # type: ignore[return-value]
+
+
+def ensure_loaded() -> None:
+    global loaded
+    with store_lock:
+        if loaded:
+            return
+        loaded = True
+        try:
+            with open(store_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read the stored lint results: {}".format(e))
+            return
+
+        if not isinstance(data, dict) or data.get('version') != STORE_VERSION:
+            return
+        store.clear()
+        store.update(data.get('files', []))
+
+
+def write() -> None:
+    path = store_path()
+    with store_lock:
+        content = dump()
+        while len(content) > MAX_BYTES and store:
+            for _ in range(len(store) // 4 or 1):
+                store.popitem(last=False)
+            content = dump()
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not store the lint results: {}".format(e))
+
+
+def dump() -> str:
+    return json.dumps(
+        {'version': STORE_VERSION, 'files': list(store.items())},
+        separators=(',', ':'),
+        default=repr
+    )
+
+
+def flush() -> None:
+    """Write pending changes right away."""
+    timer = queue.timers.get(WRITE_KEY)
+    if timer and timer.is_alive():
+        queue.cleanup(WRITE_KEY)
+        write()
@@ -1,16 +1,17 @@
 from __future__ import annotations
 import sublime
 
-from dataclasses import dataclass
+from collections import ChainMap, defaultdict
+from dataclasses import dataclass, field
 from functools import lru_cache
 import logging
 import os
 
-from . import linter as linter_module
-from . import persist
+from . import events, linter as linter_module
+from . import persist, profiler
 
 
-from typing import Iterable, Iterator
+from typing import Any, Hashable, Iterable, Iterator, Mapping
 
 Linter = linter_module.Linter
 LinterName = str
@@ -33,6 +34,166 @@ class LinterInfo:
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ViewSnapshot:
+    """The context of a view and the settings of its linters.
+
+    Valid as long as its `key` matches, see `get_snapshot`.  We only keep
+    the raw settings, which memoize the view settings they read.  Linters
+    write into their context, e.g. `temp_file` or `project_root`, so every
+    election gets its own child context.
+    """
+    key: Hashable
+    context: ViewContext
+    settings: dict[type[Linter], Mapping[str, Any]] = field(default_factory=dict)
+    # The linters with a "selector" or "enable_cells" in the view settings,
+    # usually from the project, and the registry we computed them for.
+    overrides: tuple[Hashable, frozenset[type[Linter]]] = (None, frozenset())
+
+    def linter_settings(self, klass: type[Linter], view: sublime.View) -> LinterSettings:
+        raw_settings = self.settings.get(klass)
+        if raw_settings is None:
+            raw_settings = linter_module.get_raw_linter_settings(klass, view, memoize=True)
+            self.settings[klass] = raw_settings
+        return linter_module.LinterSettings(
+            raw_settings,
+            ChainMap({}, self.context)  # type: ignore[arg-type]
+        )
+
+    def selection_overrides(self, view: sublime.View, registry: Hashable) -> frozenset[type[Linter]]:
+        registry_, overrides = self.overrides
+        if registry_ != registry:
+            overrides = frozenset(
+                klass
+                for name, klass in persist.linter_classes.items()
+                if overrides_selection(view, name)
+            )
+            self.overrides = (registry, overrides)
+        return overrides
+
+
+def overrides_selection(view: sublime.View, name: LinterName) -> bool:
+    settings = linter_module.ViewSettings(view, 'SublimeLinter.linters.{}.'.format(name))
+    return 'selector' in settings or 'enable_cells' in settings
+
+
+SNAPSHOTS: dict[tuple[sublime.ViewId, Reason], ViewSnapshot] = {}
+VIEW_SETTINGS_CHANGES: defaultdict[sublime.ViewId, int] = defaultdict(int)
+OBSERVED_VIEWS: dict[sublime.ViewId, sublime.Settings] = {}
+OBSERVER_KEY = 'SublimeLinter.elect'
+
+
+def get_snapshot(view: sublime.View, reason: Reason) -> ViewSnapshot:
+    vid = view.id()
+    observe_view_settings(view)
+    window = view.window()
+    key = (
+        VIEW_SETTINGS_CHANGES[vid],
+        persist.settings.change_count(),
+        (window.project_file_name(), tuple(window.folders())) if window else None,
+        view.file_name(),
+    )
+    snapshot = SNAPSHOTS.get((vid, reason))
+    if snapshot is None or snapshot.key != key:
+        context = linter_module.get_view_context(view, {'reason': reason})
+        snapshot = SNAPSHOTS[(vid, reason)] = ViewSnapshot(key, context)
+    return snapshot
+
+
+def observe_view_settings(view: sublime.View) -> None:
+    vid = view.id()
+    if vid in OBSERVED_VIEWS:
+        return
+
+    def on_change():
+        VIEW_SETTINGS_CHANGES[vid] += 1
+
+    OBSERVED_VIEWS[vid] = settings = view.settings()
+    settings.add_on_change(OBSERVER_KEY, on_change)
+
+
+def forget_view(vid: sublime.ViewId) -> None:
+    settings = OBSERVED_VIEWS.pop(vid, None)
+    if settings is not None:
+        settings.clear_on_change(OBSERVER_KEY)
+    VIEW_SETTINGS_CHANGES.pop(vid, None)
+    for key in [key for key in SNAPSHOTS if key[0] == vid]:
+        SNAPSHOTS.pop(key, None)
+
+
+# For each scope at the start of a view the linters whose selector could
+# match, t.i. we don't need to ask all linters for each view.  Valid for
+# the settings and linter classes in `INDEX_KEY`.
+INDEX: dict[str, tuple[tuple[LinterName, type[Linter]], ...]] = {}
+INDEX_KEY: Hashable = None
+
+
+def candidate_linters(
+    view: sublime.View,
+    snapshot: ViewSnapshot
+) -> Iterable[tuple[LinterName, type[Linter]]]:
+    """Return the linters which might lint the view, in registry order."""
+    global INDEX_KEY
+    registry = tuple(persist.linter_classes.items())
+    key = (persist.settings.change_count(), registry)
+    if key != INDEX_KEY:
+        INDEX.clear()
+        INDEX_KEY = key
+
+    scope = view.scope_name(0)
+    try:
+        candidates = INDEX[scope]
+    except KeyError:
+        candidates = INDEX[scope] = tuple(
+            (name, klass)
+            for name, klass in registry
+            if may_match_scope(name, klass, scope)
+        )
+
+    overrides = snapshot.selection_overrides(view, registry)
+    if not overrides:
+        return candidates
+
+    wanted = overrides | {klass for _, klass in candidates}
+    return [(name, klass) for name, klass in registry if klass in wanted]
+
+
+def may_match_scope(name: LinterName, klass: type[Linter], scope: str) -> bool:
+    """Decide by the global settings if the linter could match `scope`."""
+    if (
+        getattr(klass.match_selector, '__func__', None)
+        is not getattr(Linter.match_selector, '__func__', None)
+    ):
+        return True  # custom logic, we can't know
+
+    settings = ChainMap(
+        persist.settings.get('linters', {}).get(name, {}),
+        klass.defaults or {}
+    )
+    if settings.get('enable_cells'):
+        return True  # could match anywhere in the view
+    selector = settings.get('selector')
+    if selector is None:
+        return False
+    return sublime.score_selector(scope, selector) > 0
+
+
+@events.on(events.SETTINGS_CHANGED)
+def on_settings_changed(settings, **kwargs):
+    global INDEX_KEY
+    SNAPSHOTS.clear()
+    INDEX.clear()
+    INDEX_KEY = None
+
+
+def unload() -> None:
+    for vid in list(OBSERVED_VIEWS):
+        forget_view(vid)
+    SNAPSHOTS.clear()
+    INDEX.clear()
+    events.off(on_settings_changed)
+
+
 def assignable_linters_for_view(view: sublime.View, reason: Reason) -> Iterator[LinterInfo]:
     """Check and eventually instantiate linters for a view."""
     bid = view.buffer_id()
@@ -47,20 +208,24 @@ def assignable_linters_for_view(view: sublime.View, reason: Reason) -> Iterator[
         )
         return
 
-    ctx = linter_module.get_view_context(view, {'reason': reason})
-    for name, klass in persist.linter_classes.items():
-        settings = linter_module.get_linter_settings(klass, view, ctx)
-        if (
-            klass.can_lint_view(view, settings)
-            and (regions := klass.match_selector(view, settings))
-        ):
+    snapshot = get_snapshot(view, reason)
+    for name, klass in candidate_linters(view, snapshot):
+        with profiler.measure('settings', name):
+            settings = snapshot.linter_settings(klass, view)
+            regions = (
+                klass.match_selector(view, settings)
+                if klass.can_lint_view(view, settings)
+                else False
+            )
+            runnable = bool(regions) and can_run_now(view, reason, klass, settings)
+        if regions:
             yield LinterInfo(
                 name=name,
                 klass=klass,
                 settings=settings,
-                context=ctx,
+                context=snapshot.context,
                 regions=regions,
-                runnable=can_run_now(view, reason, klass, settings),
+                runnable=runnable,
             )
 
 
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import sublime
+
+from bisect import bisect_left, bisect_right
+import threading
+
+from . import persist
+
+
+from typing import Iterable, Iterator
+FileName = str
+LintError = persist.LintError
+
+
+class ErrorIndex:
+    """Sorted index over the errors of one file.
+
+    The errors are ordered by the begin of their regions.  For the overlap
+    queries we additionally bucket the regions by their length in powers
+    of two.  Within a bucket a region that reaches `begin` must start at
+    most the bucket's maximal length before it, so we only ever scan a
+    bounded window per bucket, even if a few regions span the whole file.
+    That makes positional queries O(log n * log L + k), where L is the
+    length of the longest region.
+
+    Queries only pre-select candidates; the final check is always the exact
+    `sublime.Region` predicate.  Results are returned in store order.
+    """
+    def __init__(self, errors: list[LintError]) -> None:
+        self.errors = errors
+        regions = [error['region'] for error in errors]
+        self._order = sorted(range(len(errors)), key=lambda i: regions[i].begin())
+        self._begins = [regions[i].begin() for i in self._order]
+        buckets: dict[int, tuple[list[int], list[int], list[int]]] = {}
+        for i in self._order:
+            region = regions[i]
+            bucket = buckets.setdefault(len(region).bit_length(), ([], [], []))
+            bucket[0].append(region.begin())
+            bucket[1].append(region.end())
+            bucket[2].append(i)
+        # Per bucket: the maximal length of its regions, then their begins,
+        # ends, and store indices, ordered by begin
+        self._buckets = [
+            ((1 << bits) - 1, *bucket) for bits, bucket in sorted(buckets.items())
+        ]
+        # All distinct begins of the regions, sorted
+        self.positions = sorted(set(self._begins))
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+    def count_starting_at(self, point: int) -> int:
+        return bisect_right(self._begins, point) - bisect_left(self._begins, point)
+
+    def _overlapping(self, begin: int, end: int) -> Iterator[int]:
+        # Yield the store indices of all errors with `region.begin() <= end`
+        # and `region.end() >= begin`.
+        for max_length, begins, ends, order in self._buckets:
+            lo = bisect_left(begins, begin - max_length)
+            hi = bisect_right(begins, end)
+            for i in range(lo, hi):
+                if ends[i] >= begin:
+                    yield order[i]
+
+    def _select(self, indexes: Iterable[int]) -> list[LintError]:
+        return [self.errors[i] for i in sorted(indexes)]
+
+    def containing(self, point: int) -> list[LintError]:
+        """Return errors where `error['region'].contains(point)`."""
+        return self._select(
+            i for i in self._overlapping(point, point)
+            if self.errors[i]['region'].contains(point)
+        )
+
+    def intersecting(self, region: sublime.Region) -> list[LintError]:
+        """Return errors where `error['region'].intersects(region)`."""
+        return self._select(
+            i for i in self._overlapping(region.begin(), region.end())
+            if self.errors[i]['region'].intersects(region)
+        )
+
+    def within(self, region: sublime.Region) -> list[LintError]:
+        """Return errors where `region.contains(error['region'])`."""
+        lo = bisect_left(self._begins, region.begin())
+        hi = bisect_right(self._begins, region.end())
+        return self._select(
+            self._order[i] for i in range(lo, hi)
+            if region.contains(self.errors[self._order[i]]['region'])
+        )
+
+
+indexes: dict[FileName, ErrorIndex] = {}
+indexes_lock = threading.Lock()
+
+
+def for_file(filename: FileName) -> ErrorIndex:
+    """Return the index for the current errors of `filename`.
+
+    The index is cached for as long as the store holds the same list of
+    errors for that file.  (Note that the store is copy-on-write, t.i. the
+    list gets replaced on every change.)
+    """
+    errors = persist.file_errors.get(filename)
+    with indexes_lock:
+        if errors is None:
+            indexes.pop(filename, None)
+            return ErrorIndex([])
+
+        index = indexes.get(filename)
+        if index is None or index.errors is not errors:
+            index = indexes[filename] = ErrorIndex(errors)
+        return index
+
+
+def forget(filename: FileName) -> None:
+    with indexes_lock:
+        indexes.pop(filename, None)
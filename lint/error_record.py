@@ -0,0 +1,114 @@
+"""Compact storage for lint errors.
+
+We keep every error of every open file in `persist.file_errors`, easily
+hundreds of thousands of them.  As plain dicts each one weighs in at
+well over half a KiB, and every error repeats the same few strings for
+its linter, file name, type and code.
+
+`ErrorRecord` stores the known keys of a `LintError` in slots and only
+allocates a dict for other, unusual keys.  The strings that repeat
+across errors are interned, t.i. shared.  It implements the mutable
+mapping protocol, so `error['msg']`, `error.get('code')`, `dict(error)`
+and `"{msg}".format(**error)` keep working for plugins.
+"""
+from __future__ import annotations
+from collections.abc import MutableMapping
+from sys import intern
+
+
+from typing import Any, Iterator, Mapping, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .persist import LintError
+
+
+FIELDS = (
+    'filename', 'linter', 'line', 'start', 'region', 'error_type', 'code',
+    'msg', 'offending_text', 'uid', 'priority', 'panel_line',
+)
+_FIELDS = frozenset(FIELDS)
+INTERNED_FIELDS = frozenset(('filename', 'linter', 'error_type', 'code', 'msg'))
+MISSING = object()
+
+
+class ErrorRecord(MutableMapping):
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, error: Mapping[str, Any] = {}) -> None:
+        self._extra: Optional[dict[str, Any]] = None
+        for key, value in error.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _FIELDS:
+            if key in INTERNED_FIELDS and type(value) is str:
+                value = intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in _FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None:
+            raise KeyError(key)
+        del self._extra[key]
+        if not self._extra:
+            self._extra = None
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if getattr(self, key, MISSING) is not MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        if key in _FIELDS:
+            return getattr(self, key, MISSING) is not MISSING  # type: ignore[arg-type]
+        return self._extra is not None and key in self._extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELDS:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def copy(self) -> ErrorRecord:
+        rv = ErrorRecord()
+        for key in FIELDS:
+            value = getattr(self, key, MISSING)
+            if value is not MISSING:
+                setattr(rv, key, value)
+        if self._extra:
+            rv._extra = self._extra.copy()
+        return rv
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, dict(self))
+
+
+def compact(error: LintError) -> LintError:
+    """Return `error` as an `ErrorRecord`."""
+    if isinstance(error, ErrorRecord):
+        return error
+    return ErrorRecord(error)  # type: ignore[return-value]
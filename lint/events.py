@@ -7,11 +7,13 @@ from typing import Callable, TypeVar
 # Note the fancy types in `events.pyi`!
 LINT_START = 'lint_start'
 LINT_RESULT = 'lint_result'
+LINT_PARTIAL_RESULT = 'lint_partial_result'
 LINT_END = 'lint_end'
 FILE_RENAMED = 'file_renamed'
 PLUGIN_LOADED = 'plugin_loaded'
 ERROR_POSITIONS_CHANGED = 'error_positions_changed'
 SETTINGS_CHANGED = 'settings_changed'
+CONFIG_FILES_CHANGED = 'config_files_changed'
 
 
 Handler = Callable[..., None]
@@ -5,17 +5,20 @@ from typing import (
 from typing_extensions import TypedDict, Unpack
 
 if TYPE_CHECKING:
+    import sublime
     from .persist import LintError
     from .settings import Settings
 
 
 LINT_START: Literal['lint_start']
 LINT_RESULT: Literal['lint_result']
+LINT_PARTIAL_RESULT: Literal['lint_partial_result']
 LINT_END: Literal['lint_end']
 FILE_RENAMED: Literal['file_renamed']
 PLUGIN_LOADED: Literal['plugin_loaded']
 ERROR_POSITIONS_CHANGED: Literal['error_positions_changed']
 SETTINGS_CHANGED: Literal['settings_changed']
+CONFIG_FILES_CHANGED: Literal['config_files_changed']
 
 
 class LintStartPayload(TypedDict):
@@ -27,6 +30,11 @@ class LintResultPayload(TypedDict):
     linter_name: str
     errors: list[LintError]
 
+class LintPartialResultPayload(TypedDict):
+    filename: str
+    linter_name: str
+    errors: list[LintError]
+
 class LintEndPayload(TypedDict):
     filename: str
     linter_name: str
@@ -40,10 +48,15 @@ class PluginLoadedPayload(TypedDict, total=False):
 
 class ErrorPositionsChangedPayload(TypedDict):
     filename: str
+    region: sublime.Region
 
 class SettingsChangedPayload(TypedDict):
     settings: Settings
 
+class ConfigFilesChangedPayload(TypedDict):
+    filenames: set[str]
+    buffer_ids: set[sublime.BufferId]
+
 
 class LintStartHandler(Protocol):
     def __call__(self, **kwargs: Unpack[LintStartPayload]) -> None: ...
@@ -51,6 +64,9 @@ class LintStartHandler(Protocol):
 class LintResultHandler(Protocol):
     def __call__(self, **kwargs: Unpack[LintResultPayload]) -> None: ...
 
+class LintPartialResultHandler(Protocol):
+    def __call__(self, **kwargs: Unpack[LintPartialResultPayload]) -> None: ...
+
 class LintEndHandler(Protocol):
     def __call__(self, **kwargs: Unpack[LintEndPayload]) -> None: ...
 
@@ -66,11 +82,15 @@ class ErrorPositionsChangedHandler(Protocol):
 class SettingsChangedHandler(Protocol):
     def __call__(self, **kwargs: Unpack[SettingsChangedPayload]) -> None: ...
 
+class ConfigFilesChangedHandler(Protocol):
+    def __call__(self, **kwargs: Unpack[ConfigFilesChangedPayload]) -> None: ...
+
 
 Handler = Callable[..., None]
 AnyHandler = Union[
-    LintStartHandler, LintResultHandler, LintEndHandler, FileRenamedHandler,
-    PluginLoadedHandler, ErrorPositionsChangedHandler, SettingsChangedHandler
+    LintStartHandler, LintResultHandler, LintPartialResultHandler, LintEndHandler, FileRenamedHandler,
+    PluginLoadedHandler, ErrorPositionsChangedHandler, SettingsChangedHandler,
+    ConfigFilesChangedHandler
 ]
 
 @overload
@@ -78,6 +98,8 @@ def subscribe(topic: Literal['lint_start'], fn: LintStartHandler) -> None: ...
 @overload
 def subscribe(topic: Literal['lint_result'], fn: LintResultHandler) -> None: ...
 @overload
+def subscribe(topic: Literal['lint_partial_result'], fn: LintPartialResultHandler) -> None: ...
+@overload
 def subscribe(topic: Literal['lint_end'], fn: LintEndHandler) -> None: ...
 @overload
 def subscribe(topic: Literal['file_renamed'], fn: FileRenamedHandler) -> None: ...
@@ -88,6 +110,8 @@ def subscribe(topic: Literal['error_positions_changed'], fn: ErrorPositionsChang
 @overload
 def subscribe(topic: Literal['settings_changed'], fn: SettingsChangedHandler) -> None: ...
 @overload
+def subscribe(topic: Literal['config_files_changed'], fn: ConfigFilesChangedHandler) -> None: ...
+@overload
 def subscribe(topic: str, fn: Handler) -> None: ...
 
 @overload
@@ -95,6 +119,8 @@ def unsubscribe(topic: Literal['lint_start'], fn: LintStartHandler) -> None: ...
 @overload
 def unsubscribe(topic: Literal['lint_result'], fn: LintResultHandler) -> None: ...
 @overload
+def unsubscribe(topic: Literal['lint_partial_result'], fn: LintPartialResultHandler) -> None: ...
+@overload
 def unsubscribe(topic: Literal['lint_end'], fn: LintEndHandler) -> None: ...
 @overload
 def unsubscribe(topic: Literal['file_renamed'], fn: FileRenamedHandler) -> None: ...
@@ -105,6 +131,8 @@ def unsubscribe(topic: Literal['error_positions_changed'], fn: ErrorPositionsCha
 @overload
 def unsubscribe(topic: Literal['settings_changed'], fn: SettingsChangedHandler) -> None: ...
 @overload
+def unsubscribe(topic: Literal['config_files_changed'], fn: ConfigFilesChangedHandler) -> None: ...
+@overload
 def unsubscribe(topic: str, fn: Handler) -> None: ...
 @overload
 def unsubscribe(__fn: Handler) -> None: ...
@@ -114,6 +142,8 @@ def broadcast(topic: Literal['lint_start'], payload: LintStartPayload) -> None:
 @overload
 def broadcast(topic: Literal['lint_result'], payload: LintResultPayload) -> None: ...
 @overload
+def broadcast(topic: Literal['lint_partial_result'], payload: LintPartialResultPayload) -> None: ...
+@overload
 def broadcast(topic: Literal['lint_end'], payload: LintEndPayload) -> None: ...
 @overload
 def broadcast(topic: Literal['file_renamed'], payload: FileRenamedPayload) -> None: ...
@@ -124,6 +154,8 @@ def broadcast(topic: Literal['error_positions_changed'], payload: ErrorPositions
 @overload
 def broadcast(topic: Literal['settings_changed'], payload: SettingsChangedPayload) -> None: ...
 @overload
+def broadcast(topic: Literal['config_files_changed'], payload: ConfigFilesChangedPayload) -> None: ...
+@overload
 def broadcast(topic: str, payload: dict[str, Any]) -> None: ...
 
 @overload
@@ -131,6 +163,8 @@ def on(topic: Literal['lint_start']) -> Callable[[LintStartHandler], LintStartHa
 @overload
 def on(topic: Literal['lint_result']) -> Callable[[LintResultHandler], LintResultHandler]: ...
 @overload
+def on(topic: Literal['lint_partial_result']) -> Callable[[LintPartialResultHandler], LintPartialResultHandler]: ...
+@overload
 def on(topic: Literal['lint_end']) -> Callable[[LintEndHandler], LintEndHandler]: ...
 @overload
 def on(topic: Literal['file_renamed']) -> Callable[[FileRenamedHandler], FileRenamedHandler]: ...
@@ -141,6 +175,8 @@ def on(topic: Literal['error_positions_changed']) -> Callable[[ErrorPositionsCha
 @overload
 def on(topic: Literal['settings_changed']) -> Callable[[SettingsChangedHandler], SettingsChangedHandler]: ...
 @overload
+def on(topic: Literal['config_files_changed']) -> Callable[[ConfigFilesChangedHandler], ConfigFilesChangedHandler]: ...
+@overload
 def on(topic: str) -> Callable[[Handler], Handler]: ...
 
 off: Callable[[Handler], None]
@@ -0,0 +1,140 @@
+"""Remember resolved executables across lints and linters.
+
+Finding the executable of a linter walks up the directory tree from the
+linted file and probes each directory for virtual environments,
+`node_modules`, manifests and such.  On slow (e.g. network mounted) file
+systems that's a real cost paid on every lint.
+
+We cache the result of `Linter.context_sensitive_executable_path` keyed by
+the linter, the command, the directory we start from and the settings.
+Along with the result we store the modification times of the directories
+we walked through and of the `executable_markers` of the linter found in
+them.  A cached entry is only used if these didn't change, t.i. we stat
+a handful of paths instead of probing everything again.
+
+Resolving may also set `project_root` in the context or add to the
+environment of the linter, we replay these changes on a hit.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import logging
+import os
+import threading
+
+from . import util
+
+
+from typing import Callable, Hashable, NamedTuple, Optional, Tuple, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .linter import Linter
+Resolution = Tuple[bool, Union[None, str, list]]
+Snapshot = Tuple[Tuple[str, Optional[float]], ...]
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+
+
+class Entry(NamedTuple):
+    snapshot: Snapshot
+    result: Resolution
+    context: dict[str, str]
+    env: dict[str, str]
+
+
+cache: OrderedDict[Hashable, Entry] = OrderedDict()
+cache_lock = threading.Lock()
+
+
+def resolve(linter: Linter, cmd: list[str], settings_fingerprint: str) -> Resolution:
+    """Return `linter.context_sensitive_executable_path(cmd)`, cached."""
+    start_dir = linter.context.get('file_path') or linter.get_working_dir()
+    key = (
+        type(linter), tuple(cmd), start_dir, settings_fingerprint,
+        linter.context.get('project_root'), os.environ.get('PATH')
+    )
+    with cache_lock:
+        entry = cache.get(key)
+    if entry and entry.snapshot == take_snapshot(p for p, _ in entry.snapshot):
+        with cache_lock:
+            if key in cache:
+                cache.move_to_end(key)
+        logger.info("{}: using cached executable {!r}".format(linter.name, entry.result[1]))
+        linter.context.update(entry.context)
+        linter.env.update(entry.env)
+        return copy_result(entry.result)
+
+    context_before, env_before = dict(linter.context), dict(linter.env)
+    result = linter.context_sensitive_executable_path(cmd)
+    entry = Entry(
+        take_snapshot(watched_paths(linter, start_dir, result)),
+        copy_result(result),
+        {k: v for k, v in linter.context.items() if context_before.get(k) != v},
+        {k: v for k, v in linter.env.items() if env_before.get(k) != v},
+    )
+    with cache_lock:
+        cache[key] = entry
+        while len(cache) > MAX_ENTRIES:
+            cache.popitem(last=False)
+    return result
+
+
+def copy_result(result: Resolution) -> Resolution:
+    have_path, path = result
+    return have_path, path[:] if isinstance(path, list) else path
+
+
+def watched_paths(linter: Linter, start_dir: Optional[str], result: Resolution) -> list[str]:
+    """Return the paths whose changes may change how we resolve."""
+    paths: list[str] = []
+    if start_dir:
+        for directory in util.paths_upwards_until_home(start_dir):
+            paths.append(directory)
+            for marker in linter.executable_markers:
+                paths.append(deepest_existing_path(directory, marker))
+
+    _, path = result
+    if path:
+        executable = util.ensure_list(path)[0]
+        if os.path.isabs(executable):
+            paths.append(executable)
+    return list(OrderedDict.fromkeys(paths))
+
+
+def deepest_existing_path(directory: str, marker: str) -> str:
+    """Return `directory/marker` or its deepest existing parent.
+
+    If a marker does not exist, its creation will change the mtime of
+    that parent.
+    """
+    path = directory
+    for part in marker.split('/'):
+        next_path = os.path.join(path, part)
+        if not os.path.exists(next_path):
+            break
+        path = next_path
+    return path
+
+
+def take_snapshot(paths) -> Snapshot:
+    return tuple((path, mtime(path)) for path in paths)
+
+
+def mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def clear() -> None:
+    with cache_lock:
+        cache.clear()
+
+
+def forget(affected: Callable[[Optional[str]], bool]) -> None:
+    """Drop the entries whose start dir or project root is `affected`."""
+    with cache_lock:
+        for key in [key for key in cache if affected(key[2]) or affected(key[4])]:
+            del cache[key]
@@ -1,11 +1,12 @@
 from __future__ import annotations
 from bisect import bisect_right
-from collections import ChainMap, Mapping, Sequence
+from collections import ChainMap, Counter, Mapping, Sequence
 from contextlib import contextmanager
-from fnmatch import fnmatch
+from fnmatch import fnmatchcase, translate
 from functools import lru_cache
 import inspect
 from itertools import accumulate, chain
+import json
 import logging
 import os
 import re
@@ -13,15 +14,18 @@ import shlex
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 
 import sublime
-from . import persist, util
+from . import daemon, executable_cache, persist, profiler, util, warm_pool, worker
+from .cancellation import CancellationToken
 from .const import WARNING, ERROR
 
 
 from typing import (
     Any, Callable, List, Literal, IO, Iterable, Iterator, Match, MutableMapping,
-    Optional, Pattern, Tuple, Union, TYPE_CHECKING
+    NamedTuple, Optional, Pattern, Tuple, Union, TYPE_CHECKING
 )
 Reason = str
 ViewContext = MutableMapping[str, str]
@@ -43,6 +47,10 @@ UTF8_ENV_VARS = {
 }
 BASE_LINT_ENVIRONMENT = ChainMap(UTF8_ENV_VARS, os.environ)
 
+# Minimal seconds between two partial results of a streaming lint; also
+# the time before the first one, t.i. fast linters never publish partially.
+PARTIAL_RESULT_INTERVAL = 0.5
+
 # ACCEPTED_REASONS_PER_MODE defines a list of acceptable reasons
 # for each lint_mode. It aims to provide a better visibility to
 # how lint_mode is implemented. The map is supposed to be used in
@@ -226,23 +234,38 @@ class ViewSettings:
     # loose its identity.
     NOT_PRESENT = '__NOT_PRESENT_MARKER__'
 
-    def __init__(self, view, prefix):
+    def __init__(self, view, prefix, memoize=False):
         self.view = view
         self.prefix = prefix
+        # With `memoize` we ask Sublime only once per key.  The owner must
+        # throw us away when the view settings change.
+        self._memo = {} if memoize else None
 
     def _compute_final_key(self, key):
         return self.prefix + key
 
+    def _get(self, key):
+        if self._memo is None:
+            return self.view.settings().get(
+                self._compute_final_key(key), self.NOT_PRESENT)
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = self.view.settings().get(
+                self._compute_final_key(key), self.NOT_PRESENT)
+            return value
+
     def __getitem__(self, key):
-        value = self.view.settings().get(
-            self._compute_final_key(key), self.NOT_PRESENT)
+        value = self._get(key)
         if value == self.NOT_PRESENT:  # must use '==' (!) see above
             raise KeyError(key)
 
         return value
 
     def __contains__(self, key):
-        return self.view.settings().has(self._compute_final_key(key))
+        if self._memo is None:
+            return self.view.settings().has(self._compute_final_key(key))
+        return self._get(key) != self.NOT_PRESENT
 
     def __repr__(self):
         return "ViewSettings({}, {!r})".format(
@@ -313,6 +336,37 @@ class LinterSettings:
         )
 
 
+# Settings every linter understands.  Project settings live in the view's
+# settings object which we cannot enumerate, so we name them explicitly.
+CORE_LINTER_SETTINGS = (
+    "args", "disable", "disable_if_not_dependency", "enable_cells", "env",
+    "excludes", "executable", "filter_errors", "lint_mode", "python",
+    "selector", "styles", "working_dir",
+)
+
+
+def settings_fingerprint(settings: Mapping[str, Any] | LinterSettings) -> str:
+    """Return a stable string representing all *expanded* settings.
+
+    Two linter instances with the same fingerprint will build the same
+    command line and see the same configuration.
+    """
+    if isinstance(settings, LinterSettings):
+        keys = set(CORE_LINTER_SETTINGS) | set(settings._computed_settings)
+        maps = getattr(settings.raw_settings, 'maps', [settings.raw_settings])
+        for m in maps:
+            if isinstance(m, dict):
+                keys.update(m)
+    else:
+        keys = set(settings)
+
+    return json.dumps(
+        {key: settings.get(key) for key in sorted(keys) if key in settings},
+        sort_keys=True,
+        default=repr
+    )
+
+
 def substitute_variables(variables: Mapping, value: Any) -> Any:
     # Utilizes Sublime Text's `expand_variables` API, which uses the
     # `${varname}` syntax and supports placeholders (`${varname:placeholder}`).
@@ -348,12 +402,16 @@ def get_linter_settings(
     return LinterSettings(settings, context)
 
 
-def get_raw_linter_settings(linter: type[Linter], view: sublime.View) -> MutableMapping[str, Any]:
+def get_raw_linter_settings(
+    linter: type[Linter],
+    view: sublime.View,
+    memoize: bool = False
+) -> MutableMapping[str, Any]:
     """Return 'raw' linter settings without variables substituted."""
     defaults = linter.defaults or {}
     global_settings = persist.settings.get('linters', {}).get(linter.name, {})
     view_settings: Mapping[str, Any] = ViewSettings(
-        view, 'SublimeLinter.linters.{}.'.format(linter.name)
+        view, 'SublimeLinter.linters.{}.'.format(linter.name), memoize
     )  # type: ignore
 
     return ChainMap(
@@ -649,6 +707,111 @@ def register_linter(name: str, cls: type[Linter]) -> None:
         logger.info('{} linter reloaded'.format(name))
 
 
+class ErrorFilter(NamedTuple):
+    """The compiled patterns of a `filter_errors` setting."""
+    # Patterns without own groups, joined into one alternation with
+    # the named groups `f0`, `f1`, ... which index `combined_patterns`
+    combined: Optional[Pattern]
+    combined_patterns: list[str]
+    # Patterns with own groups, e.g. backreferences, or inline flags
+    # must run alone
+    separate: list[tuple[str, Pattern]]
+    invalid: list[tuple[str, str]]
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the pattern which filters `text`, if any."""
+        if self.combined:
+            match = self.combined.search(text)
+            if match:
+                return self.combined_patterns[int(match.lastgroup[1:])]  # type: ignore[index]
+        for pattern, regex in self.separate:
+            if regex.search(text):
+                return pattern
+        return None
+
+
+FILTER_ERRORS_FLAGS = re.compile('', re.I).flags
+GLOBAL_INLINE_FLAGS_RE = re.compile(r'\(\?[aiLmsux]+\)')
+
+
+@lru_cache(maxsize=32)
+def compile_error_filter(patterns: tuple[str, ...]) -> ErrorFilter:
+    """Compile the `filter_errors` patterns, cached by their values.
+
+    Raises `TypeError` if a pattern is not a string.
+    """
+    simple, separate, invalid = [], [], []
+    for pattern in patterns:
+        try:
+            regex = re.compile(pattern, re.I)
+        except re.error as err:
+            invalid.append((pattern, str(err)))
+            continue
+        if (
+            regex.groups
+            # Global inline flags, e.g. "(?x)", would apply to the whole
+            # joined regex.  Groups like "(?:" or "(?=" are fine.
+            or GLOBAL_INLINE_FLAGS_RE.match(pattern)
+            or regex.flags != FILTER_ERRORS_FLAGS
+        ):
+            separate.append((pattern, regex))
+        else:
+            simple.append(pattern)
+
+    combined = None
+    if simple:
+        try:
+            combined = re.compile('|'.join(
+                '(?P<f{}>{})'.format(i, pattern) for i, pattern in enumerate(simple)
+            ), re.I)
+        except re.error:
+            # Should not happen, but never lose a filter because we joined
+            separate = [(pattern, re.compile(pattern, re.I)) for pattern in simple] + separate
+            simple = []
+
+    return ErrorFilter(combined, simple, separate, invalid)
+
+
+@lru_cache(maxsize=128)
+def compile_excludes(patterns: tuple[str, ...]) -> Callable[[str], Optional[str]]:
+    """Return a function which returns the pattern excluding a filename.
+
+    A pattern excludes if it matches, a pattern starting with "!" if it
+    does *not* match.  The positive patterns are compiled into one regex.
+    """
+    positives = [pattern for pattern in patterns if not pattern.startswith('!')]
+    negatives = [
+        (pattern, re.compile(translate(os.path.normcase(pattern[1:]))).match)
+        for pattern in patterns
+        if pattern.startswith('!')
+    ]
+    try:
+        combined = re.compile('|'.join(
+            '(?P<p{}>{})'.format(i, translate(os.path.normcase(pattern)))
+            for i, pattern in enumerate(positives)
+        )).match if positives else None
+    except re.error:
+        # Newer `translate`s emit named groups which may clash when joined.
+        combined = None
+
+    def first_excluding_pattern(filename: str) -> Optional[str]:
+        filename = os.path.normcase(filename)
+        if combined:
+            match = combined(filename)
+            if match:
+                return positives[int(match.lastgroup[1:])]  # type: ignore[index]
+        else:
+            for pattern in positives:
+                if fnmatchcase(filename, os.path.normcase(pattern)):
+                    return pattern
+        for pattern, matches in negatives:
+            if not matches(filename):
+                return pattern
+        return None
+
+    return first_excluding_pattern
+
+
 @lru_cache(4)
 def deprecation_warning(msg):
     logger.warning(msg)
@@ -750,6 +913,33 @@ class Linter(metaclass=LinterMeta):
     # over all other user or project settings.
     disabled: None | bool = None
 
+    # If the linter comes with a server mode, set this to a `DaemonCodec`
+    # (see `lint/daemon.py`).  `cmd` then starts a long-lived process, one
+    # per project, and each lint is sent to that process as a request.
+    daemon_codec: None | daemon.DaemonCodec = None
+    # Seconds of inactivity after which we stop the daemon.
+    daemon_idle_timeout = 300.0
+    # Seconds we wait for an answer before we consider the daemon broken.
+    daemon_request_timeout = 30.0
+
+    # With `cmd = None`, run this function, `"module:function"`, in a separate
+    # python process instead of calling `run` (see `lint/worker.py`).
+    worker_function: None | str = None
+    # The context variables we send to the `worker_function`.
+    worker_context_keys: tuple[str, ...] = (
+        'file', 'file_path', 'file_name', 'canonical_filename', 'folder', 'project_root'
+    )
+
+    # Files or directories, relative to each directory we search upwards,
+    # whose changes may change what `context_sensitive_executable_path`
+    # returns.  We watch them to invalidate our cache of executables.
+    executable_markers: tuple[str, ...] = ()
+
+    # Config files the linter reads, relative to each directory from the
+    # linted file upwards.  We relint when they change (see
+    # `lint/config_watcher.py`).
+    config_files: tuple[str, ...] = ()
+
     def __init__(self, view: sublime.View, settings: LinterSettings) -> None:
         self.view = view
         self.settings = settings.copy()
@@ -757,6 +947,13 @@ class Linter(metaclass=LinterMeta):
         # real `LinterSettings`.
         self.context: MutableMapping[str, str] = getattr(settings, 'context', {})
         self.env: dict[str, str] = {}
+        self._resolved_cmd: Optional[Tuple[Optional[List[str]]]] = None
+        # If set, errors are published while the linter is still running;
+        # see `can_stream`.
+        self.on_partial_result: Optional[Callable[[list[LintError]], None]] = None
+        self._stream_view: Optional[VirtualView] = None
+        # Set by the backend; cancelled when the result is no longer wanted.
+        self.cancellation_token: Optional[CancellationToken] = None
 
         # Ensure instances have their own copy in case a plugin author
         # mangles it.
@@ -818,6 +1015,18 @@ class Linter(metaclass=LinterMeta):
         """
         return util.which(cmd)
 
+    def resolve_cmd(self) -> Optional[list[str]]:
+        """Return `get_cmd()`, but compute it at most once per instance.
+
+        Resolving the executable can touch the file system, and the backend
+        needs the final command before `lint` runs (to derive cache keys).
+        """
+        if self._resolved_cmd is None:
+            with profiler.measure('get_cmd', self.name):
+                self._resolved_cmd = (self.get_cmd(),)
+        cmd = self._resolved_cmd[0]
+        return cmd[:] if cmd else cmd
+
     def get_cmd(self) -> Optional[list[str]]:
         """
         Calculate and return a tuple/list of the command line to be executed.
@@ -852,7 +1061,8 @@ class Linter(metaclass=LinterMeta):
 
         """
         which = cmd[0]
-        have_path, path = self.context_sensitive_executable_path(cmd)
+        have_path, path = executable_cache.resolve(
+            self, cmd, settings_fingerprint(self.settings))
 
         if have_path:
             # happy path?
@@ -1041,6 +1251,11 @@ class Linter(metaclass=LinterMeta):
 
         return ChainMap({}, self.settings.get('env', {}), self.env, BASE_LINT_ENVIRONMENT)
 
+    @classmethod
+    def get_config_files(cls) -> tuple[str, ...]:
+        """Return the files whose changes should trigger a relint."""
+        return cls.config_files + cls.executable_markers
+
     @classmethod
     def can_lint_view(cls, view: sublime.View, settings: LinterSettings) -> bool:
         """Decide whether the linter is applicable to given view."""
@@ -1053,18 +1268,13 @@ class Linter(metaclass=LinterMeta):
         excludes: Union[str, list[str]] = settings.get('excludes', [])
         if excludes:
             filename = view.file_name() or '<untitled>'
-            for pattern in util.ensure_list(excludes):
-                if pattern.startswith('!'):
-                    matched = not fnmatch(filename, pattern[1:])
-                else:
-                    matched = fnmatch(filename, pattern)
-
-                if matched:
-                    cls.logger.info(
-                        "{} skipped '{}', excluded by '{}'"
-                        .format(cls.name, filename, pattern)
-                    )
-                    return False
+            pattern = compile_excludes(tuple(util.ensure_list(excludes)))(filename)
+            if pattern:
+                cls.logger.info(
+                    "{} skipped '{}', excluded by '{}'"
+                    .format(cls.name, filename, pattern)
+                )
+                return False
 
         return True
 
@@ -1138,10 +1348,16 @@ class Linter(metaclass=LinterMeta):
 
         # `cmd = None` is a special API signal, that the plugin author
         # implemented its own `run`
-        if self.cmd is None:
-            output: Union[str, util.popen_output] = self.run(None, code)
+        virtual_view = VirtualView(code)
+        if self.on_partial_result and self.can_stream():
+            self._stream_view = virtual_view
+
+        if self.cmd is None and self.worker_function:
+            output: Union[str, util.popen_output, list[LintMatch]] = self.run_in_worker(code)
+        elif self.cmd is None:
+            output = self.run(None, code)
         else:
-            cmd = self.get_cmd()
+            cmd = self.resolve_cmd()
             if not cmd:
                 self.notify_failure()
                 raise PermanentError("couldn't find an executable")
@@ -1151,38 +1367,74 @@ class Linter(metaclass=LinterMeta):
         if view_has_changed():
             raise TransientError('View not consistent.')
 
-        virtual_view = VirtualView(code)
-        return self.filter_errors(self.parse_output(output, virtual_view))
+        with profiler.measure('parse', self.name):
+            if isinstance(output, list):
+                return self.filter_errors(
+                    error
+                    for m in output
+                    if (error := self.process_match(m, virtual_view))
+                )
+            return self.filter_errors(self.parse_output(output, virtual_view))
+
+    def can_stream(self) -> bool:
+        """Return whether we can parse the output line by line while it arrives.
+
+        That's the case for single line regexes on stdout.  Linters with
+        their own parsing, e.g. for JSON, need the complete output.
+        """
+        cls = type(self)
+        return bool(
+            self.regex
+            and not self.multiline
+            and self.error_stream & util.STREAM_STDOUT
+            and cls.parse_output is Linter.parse_output
+            and cls.parse_output_via_regex is Linter.parse_output_via_regex
+            and cls.find_errors is Linter.find_errors
+        )
 
     def filter_errors(self, errors: Iterable[LintError]) -> list[LintError]:
         filter_patterns = self.settings.get('filter_errors') or []
         if isinstance(filter_patterns, str):
             filter_patterns = [filter_patterns]
 
-        filters = []
         try:
-            for pattern in filter_patterns:
-                try:
-                    filters.append(re.compile(pattern, re.I))
-                except re.error as err:
-                    self.logger.error(
-                        "'{}' in 'filter_errors' is not a valid "
-                        "regex pattern: '{}'.".format(pattern, err)
-                    )
-
+            error_filter = compile_error_filter(tuple(filter_patterns))
         except TypeError:
             self.logger.error(
                 "'filter_errors' must be set to a string or a list of strings.\n"
                 "Got '{}' instead".format(filter_patterns))
+            return list(errors)
 
-        return [
-            error
-            for error in errors
-            if not any(
-                pattern.search(': '.join([error['error_type'], error['code'], error['msg']]))
-                for pattern in filters
+        for pattern, err in error_filter.invalid:
+            self.logger.error(
+                "'{}' in 'filter_errors' is not a valid "
+                "regex pattern: '{}'.".format(pattern, err)
             )
-        ]
+
+        if not error_filter.combined and not error_filter.separate:
+            return list(errors)
+
+        removed: Counter[str] = Counter()
+        rv = []
+        for error in errors:
+            pattern = error_filter.match(
+                ': '.join([error['error_type'], error['code'], error['msg']]))
+            if pattern is None:
+                rv.append(error)
+            else:
+                removed[pattern] += 1
+
+        if removed:
+            self.logger.info(
+                "{}: 'filter_errors' removed {}".format(
+                    self.name,
+                    ", ".join(
+                        "{} by '{}'".format(count, pattern)
+                        for pattern, count in removed.most_common()
+                    )
+                )
+            )
+        return rv
 
     def parse_output(self, proc: Union[str, util.popen_output], virtual_view: VirtualView) -> Iterable[LintError]:
         # Note: We support type str for `proc`. E.g. the user might have
@@ -1541,6 +1793,9 @@ class Linter(metaclass=LinterMeta):
         """
         assert cmd is not None
 
+        if self.daemon_codec:
+            return self.communicate_with_daemon(cmd, code)
+
         if self.tempfile_suffix:
             if self.tempfile_suffix != '-':
                 return self.tmpfile(cmd, code)
@@ -1559,6 +1814,51 @@ class Linter(metaclass=LinterMeta):
             cmd, self.context, at_value=self.filename, auto_append=code is None)
         return self._communicate(cmd, code)
 
+    def communicate_with_daemon(self, cmd: list[str], code: str) -> str:
+        """Send code to the long-lived daemon of this linter and return its output."""
+        cmd = substitute_variables(self.context, cmd)
+        cwd = self.get_working_dir()
+        env = self.get_environment()
+        project_root = self.context.get('project_root') or cwd or ''
+
+        try:
+            with profiler.measure('run', self.name):
+                return daemon.request(self, (self.name, project_root), cmd, cwd, env, code)
+        except daemon.DaemonStopped:
+            raise TransientError('Daemon stopped')
+        except daemon.DaemonError as err:
+            self.logger.warning(str(err))
+            self.notify_failure()
+            raise PermanentError('daemon failed')
+        except OSError as err:
+            self.logger.error(make_nice_log_message(
+                '  Starting the daemon failed\n\n  {}'.format(str(err)),
+                cmd, True, cwd, self.view, daemon.env_delta(env)))
+            self.notify_failure()
+            raise PermanentError("popen constructor failed")
+
+    def run_in_worker(self, code: str) -> Union[str, list[LintMatch]]:
+        """Run `worker_function` in the worker process of this linter."""
+        try:
+            with profiler.measure('run', self.name):
+                result = worker.run(self, code)
+        except daemon.DaemonStopped:
+            raise TransientError('Worker stopped')
+        except worker.WorkerFailed as err:
+            self.logger.error(
+                "{}: '{}' raised:\n{}".format(self.name, self.worker_function, err))
+            self.notify_failure()
+            raise PermanentError('worker function failed')
+        except (daemon.DaemonError, OSError) as err:
+            self.logger.error("{}: worker failed: {}".format(self.name, err))
+            self.notify_failure()
+            raise PermanentError('worker failed')
+
+        if isinstance(result, str):
+            return result
+        matches = [LintMatch(m) for m in result]
+        return [m for m in matches if m.fulfills_minimal_requirements()]
+
     def tmpfile(self, cmd: list[str], code: str, suffix: Optional[str] = None) -> util.popen_output:
         """Create temporary file with code and lint it."""
         if suffix is None:
@@ -1664,12 +1964,18 @@ class Linter(metaclass=LinterMeta):
         stderr = subprocess.PIPE if output_stream & util.STREAM_STDERR else None
 
         try:
-            proc = subprocess.Popen(
-                cmd, env=env, cwd=cwd,
-                stdin=stdin, stdout=stdout, stderr=stderr,
-                startupinfo=util.create_startupinfo(),
-                creationflags=util.get_creationflags()
-            )
+            with profiler.measure('spawn', self.name):
+                # A warm interpreter pipes all streams, we drop the unwanted
+                # output below.
+                proc = warm_pool.take(
+                    self.name, self.settings.get('warm_processes', 0), cmd, cwd, env)
+                if proc is None:
+                    proc = subprocess.Popen(
+                        cmd, env=env, cwd=cwd,
+                        stdin=stdin, stdout=stdout, stderr=stderr,
+                        startupinfo=util.create_startupinfo(),
+                        creationflags=util.get_creationflags()
+                    )
         except Exception as err:
             augmented_env = dict(ChainMap(*env.maps[0:-1]))
             self.logger.error(make_nice_log_message(
@@ -1685,9 +1991,13 @@ class Linter(metaclass=LinterMeta):
                 'Running ...', cmd, uses_stdin, cwd, view, env=augmented_env))
 
         bid = view.buffer_id()
-        with store_proc_while_running(bid, proc):
+        with store_proc_while_running(bid, proc), self._terminate_on_cancel(proc):
             try:
-                out = proc.communicate(code_b)
+                with profiler.measure('run', self.name):
+                    if self._stream_view and proc.stdout:
+                        out = self._stream_output(proc, code_b, self._stream_view)
+                    else:
+                        out = proc.communicate(code_b)
 
             except BrokenPipeError as err:
                 friendly_terminated = getattr(proc, 'friendly_terminated', False)
@@ -1726,7 +2036,86 @@ class Linter(metaclass=LinterMeta):
                 if friendly_terminated:
                     raise TransientError('Friendly terminated')
 
-        return util.popen_output(proc, *out)
+        if stdout is None or stderr is None:
+            out = (out[0] if stdout else None, out[1] if stderr else None)
+        with profiler.measure('decode', self.name):
+            return util.popen_output(proc, *out)
+
+    @contextmanager
+    def _terminate_on_cancel(self, proc: subprocess.Popen) -> Iterator[None]:
+        token = self.cancellation_token
+        if token is None or not persist.settings.get('kill_old_processes'):
+            yield
+            return
+
+        def terminate() -> None:
+            self.logger.info(
+                '{}: lint cancelled, friendly terminate <pid {}>'.format(self.name, proc.pid))
+            friendly_terminate(proc)
+
+        with token.on_cancel(terminate):
+            yield
+
+    def _stream_output(
+        self,
+        proc: subprocess.Popen,
+        code_b: Optional[bytes],
+        virtual_view: VirtualView
+    ) -> tuple[Optional[bytes], Optional[bytes]]:
+        """Like `proc.communicate()` but parse stdout while it arrives.
+
+        The errors found so far are published via `on_partial_result`.  The
+        final result is still parsed from the complete output as usual.
+        """
+        assert proc.stdout and self.on_partial_result
+        stderr_chunks: list[bytes] = []
+
+        def write_stdin() -> None:
+            assert proc.stdin
+            try:
+                if code_b:
+                    proc.stdin.write(code_b)
+                proc.stdin.close()
+            except OSError:  # e.g. `BrokenPipeError`
+                pass
+
+        def read_stderr() -> None:
+            assert proc.stderr
+            stderr_chunks.append(proc.stderr.read())
+
+        threads = [
+            threading.Thread(target=target, daemon=True)
+            for target, stream in ((write_stdin, proc.stdin), (read_stderr, proc.stderr))
+            if stream
+        ]
+        for thread in threads:
+            thread.start()
+
+        lines: list[bytes] = []
+        errors: list[LintError] = []
+        visible: list[LintError] = []
+        filtered = 0
+        next_publish = time.monotonic() + PARTIAL_RESULT_INTERVAL
+        for line in proc.stdout:
+            lines.append(line)
+            for m in self.find_errors(util.process_popen_output(line)):
+                if error := self.process_match(m, virtual_view):
+                    errors.append(error)
+
+            if len(errors) > filtered and time.monotonic() >= next_publish:
+                # Filter each new batch only once, and never show, not even
+                # briefly, what the user has filtered out.
+                new_errors = self.filter_errors(errors[filtered:])
+                filtered = len(errors)
+                if new_errors:
+                    visible.extend(new_errors)
+                    self.on_partial_result(visible[:])
+                    next_publish = time.monotonic() + PARTIAL_RESULT_INTERVAL
+
+        for thread in threads:
+            thread.join()
+        proc.wait()
+        return b''.join(lines), b''.join(stderr_chunks) if proc.stderr else None
 
 
 # Old python versions do not protect (typically: ignore) against
@@ -1763,6 +2152,16 @@ def recover_broken_pipe(self):  # self refers `subprocess.Popen`
     return (stdout, stderr)
 
 
+def friendly_terminate(proc: subprocess.Popen) -> None:
+    # Mark the process so that `_communicate` knows the broken pipe or the
+    # missing output is intentional.
+    setattr(proc, 'friendly_terminated', True)
+    try:
+        proc.terminate()
+    except OSError:  # e.g. the process ended in the meantime
+        pass
+
+
 @contextmanager
 def make_temp_file(suffix: str, code: str) -> Iterator[IO]:
     file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
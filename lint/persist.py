@@ -17,6 +17,8 @@ FileName = str
 LinterName = str
 
 
+# The shape of an error.  At runtime, finalized errors are the more
+# compact `error_record.ErrorRecord`s which behave like these dicts.
 class LintError(TypedDict, total=False):
     linter: LinterName
 
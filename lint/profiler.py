@@ -0,0 +1,134 @@
+"""Record how long each stage of a lint takes.
+
+Timings are kept per linter and stage in small ring buffers, so the
+numbers always describe the recent past.  The stages, in the order they
+happen, are:
+
+- settings:  resolve the settings and selectors of a linter for a view
+- get_cmd:   build the command line and find the executable
+- spawn:     start the linter process
+- run:       wait for the linter process to finish
+- decode:    decode the raw output of the process
+- parse:     find the errors in the output (`find_errors`, `process_match`)
+- finalize:  compute offsets, uids etc. of the errors
+- highlight: prepare the highlights of a linter's errors for the views
+- redraw:    draw these highlights, on the UI thread
+
+Together they tell if the time is spent in the linter process ("spawn"
+and "run") or on our side.
+"""
+from __future__ import annotations
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import json
+import threading
+import time
+
+
+from typing import Iterable, Iterator
+LinterName = str
+Stage = str
+
+STAGES = (
+    'settings', 'get_cmd', 'spawn', 'run', 'decode', 'parse', 'finalize',
+    'highlight', 'redraw'
+)
+MAX_SAMPLES_PER_STAGE = 200
+MAX_RECORDS = 10000
+PERCENTILES = (0.5, 0.9, 0.99)
+
+samples: defaultdict[tuple[LinterName, Stage], deque[float]] = defaultdict(
+    lambda: deque(maxlen=MAX_SAMPLES_PER_STAGE))
+records: deque[dict] = deque(maxlen=MAX_RECORDS)
+lock = threading.Lock()
+
+
+@contextmanager
+def measure(stage: Stage, linter_name: LinterName) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, linter_name, time.perf_counter() - start)
+
+
+def record(stage: Stage, linter_name: LinterName, duration: float) -> None:
+    with lock:
+        samples[(linter_name, stage)].append(duration)
+        records.append({
+            'time': time.time(),
+            'linter': linter_name,
+            'stage': stage,
+            'duration': duration,
+        })
+
+
+def reset() -> None:
+    with lock:
+        samples.clear()
+        records.clear()
+
+
+def percentile(durations: list[float], p: float) -> float:
+    """Return the `p` percentile of the already sorted `durations`."""
+    return durations[min(len(durations) - 1, int(p * len(durations)))]
+
+
+def stats() -> dict[LinterName, dict[Stage, dict[str, float]]]:
+    """Return count, percentiles and max per linter and stage."""
+    with lock:
+        snapshot = {key: sorted(durations) for key, durations in samples.items()}
+
+    rv: dict[LinterName, dict[Stage, dict[str, float]]] = {}
+    for (linter_name, stage), durations in snapshot.items():
+        if not durations:
+            continue
+        row: dict[str, float] = {'count': len(durations)}
+        for p in PERCENTILES:
+            row['p{}'.format(int(p * 100))] = percentile(durations, p)
+        row['max'] = durations[-1]
+        rv.setdefault(linter_name, {})[stage] = row
+    return rv
+
+
+def ordered_stages(stages: Iterable[Stage]) -> list[Stage]:
+    return sorted(
+        stages,
+        key=lambda stage: (STAGES.index(stage) if stage in STAGES else len(STAGES), stage)
+    )
+
+
+def format_table() -> str:
+    """Render a percentile table per linter, durations in milliseconds."""
+    all_stats = stats()
+    if not all_stats:
+        return 'No lint timings recorded yet.\n'
+
+    columns = ['count'] + ['p{}'.format(int(p * 100)) for p in PERCENTILES] + ['max']
+    header = '{:<10}'.format('stage') + ''.join('{:>10}'.format(c) for c in columns)
+    chunks = []
+    for linter_name in sorted(all_stats):
+        per_stage = all_stats[linter_name]
+        lines = [linter_name, header, '-' * len(header)]
+        for stage in ordered_stages(per_stage):
+            row = per_stage[stage]
+            lines.append(
+                '{:<10}'.format(stage)
+                + '{:>10}'.format(int(row['count']))
+                + ''.join(
+                    '{:>10.1f}'.format(row[column] * 1000)
+                    for column in columns[1:]
+                )
+            )
+        chunks.append('\n'.join(lines))
+    return '\n\n'.join(chunks) + '\n'
+
+
+def export_jsonl(path: str) -> int:
+    """Write all recorded samples as JSON lines, return their number."""
+    with lock:
+        snapshot = list(records)
+    with open(path, 'w', encoding='utf-8') as f:
+        for r in snapshot:
+            f.write(json.dumps(r) + '\n')
+    return len(snapshot)
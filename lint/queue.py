@@ -29,6 +29,13 @@ def cleanup(key: Key) -> None:
         pass
 
 
+def cleanup_group(group: Key) -> None:
+    """Cancel all timers keyed `(group, ...)`."""
+    for key in list(timers):
+        if isinstance(key, tuple) and key and key[0] == group:
+            cleanup(key)
+
+
 def unload():
     while True:
         try:
@@ -0,0 +1,204 @@
+"""Spare interpreters for python based linters.
+
+Booting a python interpreter can easily take the better part of a lint.
+For linters with a "warm_processes" setting we start that many
+interpreters in advance.  A spare waits for a single header line on its
+stdin which tells it what to run; from then on it behaves exactly like
+the ordinary command: the code to lint follows on stdin, output and exit
+code are the ones of the linter.
+
+Only commands of the form `python -m module ...` or a python script (e.g.
+`venv/bin/flake8`) qualify.  Pools are only kept for linters which are
+assigned to an open view, see `trim`.
+"""
+from __future__ import annotations
+from collections import ChainMap, deque
+import json
+import logging
+import os
+import subprocess
+import threading
+
+from . import persist, util
+
+
+from typing import Optional, Tuple
+LinterName = str
+Key = Tuple[LinterName, str, Optional[str], Tuple[Tuple[str, str], ...]]
+Header = dict
+
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP = '\n'.join([
+    "import json, os, runpy, sys",
+    # Read the header unbuffered, byte by byte, so that everything after
+    # it stays in the pipe for the linter, even if that reads fd 0 itself.
+    "header = b''",
+    "while not header.endswith(b'\\n'):",
+    "    byte = os.read(0, 1)",
+    "    if not byte:",
+    "        sys.exit(1)",
+    "    header += byte",
+    "header = json.loads(header)",
+    "sys.argv = header['argv']",
+    "if 'module' in header:",
+    "    runpy.run_module(header['module'], run_name='__main__', alter_sys=True)",
+    "else:",
+    "    sys.path[0] = os.path.dirname(header['path'])",
+    "    runpy.run_path(header['path'], run_name='__main__')",
+])
+
+pools: dict[Key, deque[subprocess.Popen]] = {}
+pools_lock = threading.Lock()
+
+
+def take(
+    linter_name: LinterName,
+    size: int,
+    cmd: list[str],
+    cwd: Optional[str],
+    env: ChainMap
+) -> Optional[subprocess.Popen]:
+    """Return a warm interpreter already running `cmd`, or None.
+
+    The returned process has pipes for all three streams.  Taking a spare
+    also schedules starting its replacement.
+    """
+    if not isinstance(size, int) or size <= 0 or not is_assigned(linter_name):
+        return None
+    target = parse_cmd(cmd)
+    if target is None:
+        return None
+    interpreter, header = target
+
+    env_delta = tuple(sorted(ChainMap(*env.maps[0:-1]).items()))
+    key = (linter_name, interpreter, cwd, env_delta)
+    proc = None
+    with pools_lock:
+        spares = pools.setdefault(key, deque())
+        while spares:
+            candidate = spares.popleft()
+            if candidate.poll() is None:
+                proc = candidate
+                break
+        needs_fill = len(spares) < size
+    if needs_fill:
+        threading.Thread(
+            target=fill, args=(key, size, interpreter, cwd, dict(env)), daemon=True
+        ).start()
+
+    if proc is None:
+        return None
+    assert proc.stdin
+    try:
+        proc.stdin.write(json.dumps(header).encode('utf-8') + b'\n')
+        proc.stdin.flush()
+    except OSError:
+        kill(proc)
+        return None
+    return proc
+
+
+def fill(
+    key: Key,
+    size: int,
+    interpreter: str,
+    cwd: Optional[str],
+    env: dict[str, str]
+) -> None:
+    with pools_lock:
+        spares = pools.get(key)
+        if spares is None:
+            return
+        missing = size - len(spares)
+
+    for _ in range(missing):
+        try:
+            proc = spawn(interpreter, cwd, env)
+        except OSError as err:
+            logger.warning("{}: could not start '{}': {}".format(key[0], interpreter, err))
+            return
+
+        with pools_lock:
+            if pools.get(key) is spares and len(spares) < size:
+                spares.append(proc)
+                continue
+        kill(proc)
+        return
+
+
+def spawn(interpreter: str, cwd: Optional[str], env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [interpreter, '-c', BOOTSTRAP], env=env, cwd=cwd,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        startupinfo=util.create_startupinfo(),
+        creationflags=util.get_creationflags()
+    )
+
+
+def parse_cmd(cmd: list[str]) -> Optional[tuple[str, Header]]:
+    """Return the interpreter and the header to run `cmd` on a spare."""
+    if len(cmd) >= 3 and cmd[1] == '-m' and is_python(cmd[0]):
+        module = cmd[2]
+        return cmd[0], {'module': module, 'argv': [module] + cmd[3:]}
+
+    interpreter = read_shebang(cmd[0]) if cmd else None
+    if interpreter:
+        return interpreter, {'path': cmd[0], 'argv': cmd}
+    return None
+
+
+def is_python(executable: str) -> bool:
+    return os.path.basename(executable).lower().startswith('python')
+
+
+def read_shebang(script: str) -> Optional[str]:
+    """Return the python interpreter `script` is written for, if any."""
+    try:
+        with open(script, 'rb') as f:
+            first_line = f.readline(512)
+    except OSError:
+        return None
+    if not first_line.startswith(b'#!'):
+        return None
+    parts = first_line[2:].decode('utf-8', 'replace').split()
+    # `#!/usr/bin/env python` would need a lookup on PATH, we skip it.
+    if len(parts) == 1 and is_python(parts[0]) and os.path.isabs(parts[0]):
+        return parts[0]
+    return None
+
+
+def is_assigned(linter_name: LinterName) -> bool:
+    return any(
+        linter_name in linter_names
+        for linter_names in list(persist.assigned_linters.values())
+    )
+
+
+def trim() -> None:
+    """Drop the pools of linters not assigned to any open view."""
+    with pools_lock:
+        dropped = [
+            pools.pop(key)
+            for key in list(pools)
+            if not is_assigned(key[0])
+        ]
+    for spares in dropped:
+        for proc in spares:
+            kill(proc)
+
+
+def kill(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.kill()
+    proc.communicate()
+
+
+def kill_all() -> None:
+    with pools_lock:
+        dropped = list(pools.values())
+        pools.clear()
+    for spares in dropped:
+        for proc in spares:
+            kill(proc)
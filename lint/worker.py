@@ -0,0 +1,134 @@
+"""Run the code of in-process linters in a separate python process.
+
+Linters with `cmd = None` usually implement `run` and thus lint inside
+the plugin host, where they compete for the GIL with everything else
+Sublime does.  A linter can instead set `worker_function` to the name of
+a plain function, `"module:function"`.  That module lives next to the
+plugin and must not import `sublime`.
+
+The function gets picklable inputs only, t.i. `(code, settings, context)`
+as plain dicts, and returns either the output the linter's `regex` parses
+or a list of dicts with the keys of a `LintMatch`.  The context holds only
+the `worker_context_keys` of the linter.
+
+A worker is a long-lived python process and runs as a daemon with its own
+codec (see `daemon.py`), one per linter.  The worker imports the module
+once, so we restart it when the plugin or that module changes on disk.
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+
+from . import daemon, util
+
+
+from typing import IO, Optional, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .linter import Linter
+
+
+BOOTSTRAP = '\n'.join([
+    "import contextlib, importlib, json, sys, traceback",
+    "out = sys.stdout",
+    "for line in sys.stdin:",
+    "    request = json.loads(line)",
+    "    if request['path'] not in sys.path:",
+    "        sys.path.insert(0, request['path'])",
+    "    try:",
+    "        fn = getattr(importlib.import_module(request['module']), request['function'])",
+    "        with contextlib.redirect_stdout(sys.stderr):",
+    "            answer = {'result': fn(request['code'], request['settings'], request['context'])}",
+    "    except Exception:",
+    "        answer = {'error': traceback.format_exc()}",
+    "    out.write(json.dumps(answer) + '\\n')",
+    "    out.flush()",
+])
+
+
+class WorkerFailed(Exception):
+    """The worker function raised, the message is its traceback."""
+
+
+class WorkerCodec(daemon.DaemonCodec):
+    """Send the inputs of `worker_function`, read back its raw answer."""
+    def encode_request(self, linter: Linter, code: str) -> bytes:
+        from .linter import settings_fingerprint
+
+        assert linter.worker_function
+        module, _, function = linter.worker_function.partition(':')
+        request = {
+            'path': plugin_dir(linter),
+            'module': module,
+            'function': function,
+            'code': code,
+            'settings': json.loads(settings_fingerprint(linter.settings)),
+            'context': {
+                key: linter.context[key]
+                for key in linter.worker_context_keys
+                if key in linter.context
+            },
+        }
+        return (json.dumps(request, default=str) + '\n').encode('utf-8')
+
+    def read_response(self, stdout: IO[bytes]) -> str:
+        line = stdout.readline()
+        if not line:
+            raise EOFError('worker closed its stdout')
+        return line.decode('utf-8')
+
+
+CODEC = WorkerCodec()
+
+
+def plugin_dir(linter: Linter) -> str:
+    return os.path.dirname(sys.modules[type(linter).__module__].__file__ or '')
+
+
+def plugin_version(linter: Linter) -> tuple[Optional[float], ...]:
+    """Return the mtimes of the plugin and of its worker module."""
+    assert linter.worker_function
+    module = linter.worker_function.partition(':')[0]
+    base = os.path.join(plugin_dir(linter), *module.split('.'))
+    return tuple(
+        mtime(path)
+        for path in (
+            sys.modules[type(linter).__module__].__file__ or '',
+            base + '.py',
+            os.path.join(base, '__init__.py'),
+        )
+    )
+
+
+def mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def find_python(linter: Linter) -> str | None:
+    python = linter.settings.get('python')
+    if python and isinstance(python, str):
+        return python
+    return util.which('python3') or util.which('python')
+
+
+def run(linter: Linter, code: str) -> Union[str, list[dict]]:
+    """Call the `worker_function` of `linter` in its worker process.
+
+    Raises `WorkerFailed` if the function raised, and the exceptions of
+    `daemon.request` if the worker could not be started or died.
+    """
+    python = find_python(linter)
+    if not python:
+        raise OSError('no python interpreter found')
+
+    cmd = [python, '-u', '-c', BOOTSTRAP]
+    answer = json.loads(daemon.request(
+        linter, (linter.name, '<worker>'), cmd, None,
+        linter.get_environment(), code, codec=CODEC, version=plugin_version(linter)
+    ))
+    if 'error' in answer:
+        raise WorkerFailed(answer['error'])
+    return answer['result']
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from collections import defaultdict
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from functools import lru_cache, partial
 from itertools import chain
 import os
@@ -8,11 +10,11 @@ import sublime_plugin
 import textwrap
 import uuid
 
-from .lint import elect, events, persist, util
+from .lint import elect, error_index, events, persist, util
 
 from typing import (
-    Any, Callable, Collection, Dict, Iterable, List,
-    Optional, TypedDict, TypeVar
+    Any, Callable, Collection, Dict, Hashable, Iterable, List,
+    NamedTuple, Optional, Set, Tuple, TypedDict, TypeVar
 )
 
 
@@ -22,6 +24,7 @@ LintError = persist.LintError
 FileName = persist.FileName
 LinterName = persist.LinterName
 Reason = Optional[str]
+Page = Optional[Tuple[int, int]]
 Action = Callable[[], None]
 ErrorsByFile = Dict[FileName, List[LintError]]
 
@@ -33,9 +36,42 @@ class State_(TypedDict):
     panel_opened_automatically: set[sublime.WindowId]
 
 
+@dataclass(frozen=True)
+class PanelSection:
+    """The rendered block of one file in the panel.
+
+    `lines` includes the header and the trailing empty line, `panel_lines`
+    holds the line span of each error relative to the start of the block,
+    starting with the error at index `first_error`.  `actions` maps
+    relative lines to what `sublime_linter_panel_expand` does there.
+    """
+    filename: FileName
+    key: Hashable
+    lines: List[str]
+    panel_lines: List[Tuple[int, int]]
+    first_error: int = 0
+    actions: Dict[int, str] = field(default_factory=dict)
+
+
+class Splice(NamedTuple):
+    """Replace the lines `start` up to `stop` (exclusive) with `lines`."""
+    start: int
+    stop: int
+    lines: List[str]
+    expected_rows: int
+    sections: List[PanelSection]
+
+
+class VirtualState(TypedDict):
+    expanded: Set[FileName]
+    pages: Dict[FileName, int]
+    anchors: Dict[FileName, int]
+
+
 class DrawInfo(TypedDict, total=False):
     panel: sublime.View
     content: str
+    splice: Splice
     errors_from_active_view: list[LintError]
     nearby_lines: int | list[int]
 
@@ -43,12 +79,22 @@ class DrawInfo(TypedDict, total=False):
 PANEL_NAME = "SublimeLinter"
 OUTPUT_PANEL = "output." + PANEL_NAME
 NO_RESULTS_MESSAGE = "  No lint results."
+COLLAPSED_MESSAGE = "  + {} problems ({}), collapsed."
+MORE_ABOVE_MESSAGE = "  + {} more above."
+MORE_BELOW_MESSAGE = "  + {} more below."
+PAGE_SIZE = 200  # [errors]
 State: State_ = {
     'active_view': None,
     'active_filename': None,
     'cursor': -1,
     'panel_opened_automatically': set()
 }
+# The sections currently drawn in each panel, keyed by the panel's view id
+PANEL_MODELS: dict[sublime.ViewId, list[PanelSection]] = {}
+# Expanded files and the current pages of the virtual panel per window
+VIRTUAL_STATE: defaultdict[sublime.WindowId, VirtualState] = defaultdict(
+    lambda: {'expanded': set(), 'pages': {}, 'anchors': {}}
+)
 
 
 def plugin_loaded():
@@ -63,11 +109,14 @@ def plugin_loaded():
 
 def plugin_unloaded():
     events.off(on_lint_result)
+    events.off(on_partial_lint_result)
     events.off(on_updated_error_positions)
     events.off(on_renamed_file)
 
     for window in sublime.windows():
         window.destroy_output_panel(PANEL_NAME)
+    PANEL_MODELS.clear()
+    VIRTUAL_STATE.clear()
 
 
 LINT_RESULT_CACHE: defaultdict[str, list[tuple[FileName, Reason]]] = defaultdict(list)
@@ -101,6 +150,14 @@ def on_lint_result(filename: FileName, linter_name: LinterName, reason: Reason =
     )
 
 
+@events.on(events.LINT_PARTIAL_RESULT)
+def on_partial_lint_result(
+    filename: FileName, linter_name: LinterName, errors: list[LintError], **kwargs: Any
+) -> None:
+    # Without a reason, t.i. this never e.g. opens the panel on save.
+    on_lint_result(filename=filename, linter_name=linter_name, errors=errors)
+
+
 def run_immediately(token_cache: dict[T, str], key: T, action: Action) -> None:
     """Invalidate `key` and run `action` immediately."""
     token_cache[key] = uuid.uuid4().hex
@@ -209,6 +266,12 @@ class UpdateState(sublime_plugin.EventListener):
         if window and panel_is_active(window):
             sublime.set_timeout_async(lambda: fill_panel(window))
 
+    def on_pre_close_window(self, window):
+        panel = get_panel(window)
+        if panel:
+            PANEL_MODELS.pop(panel.id(), None)
+        VIRTUAL_STATE.pop(window.id(), None)
+
     @util.distinct_until_buffer_changed
     def on_post_save_async(self, view: sublime.View) -> None:
         # In background mode most of the time the errors are already up-to-date
@@ -334,8 +397,7 @@ def create_panel(window):
 
 
 def draw(draw_info: DrawInfo) -> None:
-    content = draw_info.get('content')
-    if content is None:
+    if draw_info.get('content') is None and draw_info.get('splice') is None:
         draw_(**draw_info)
     else:
         sublime.set_timeout(lambda: draw_(**draw_info))
@@ -344,11 +406,14 @@ def draw(draw_info: DrawInfo) -> None:
 def draw_(
     panel: sublime.View,
     content: str = None,
+    splice: Splice = None,
     errors_from_active_view: list[LintError] = [],
     nearby_lines: int | list[int] | None = None
 ) -> None:
     if content is not None:
         update_panel_content(panel, content)
+    elif splice is not None:
+        splice_panel_content(panel, splice)
 
     if nearby_lines is None:
         mark_lines(panel, None)
@@ -424,12 +489,30 @@ def format_header(f_path):
 
 
 def format_error(error: LintError, widths: tuple[tuple[str, int], ...]) -> list[str]:
-    error_as_tuple = tuple(
+    # Only the position differs for an error that moved, so we format and
+    # cache the rest without it.
+    rv = _format_error(
+        tuple((k, error[k]) for k in ("error_type", "linter", "msg", "code")),  # type: ignore[literal-required]
+        widths
+    )
+    widths_ = dict(widths)
+    position = " {LINE:>{line}}:{START:<{col}}  ".format(
+        LINE=error["line"] + 1, START=error["start"] + 1,
+        line=widths_["line"], col=widths_["col"]
+    )
+    return [position + rv[0][position_width(widths_):]] + rv[1:]
+
+
+def position_width(widths: dict[str, int]) -> int:
+    return widths["line"] + widths["col"] + 4
+
+
+def error_as_tuple(error: LintError) -> tuple[tuple[str, object], ...]:
+    return tuple(
         (k, v)
         for k, v in error.items()
         if k in ("line", "start", "error_type", "linter", "msg", "code", )
     )
-    return _format_error(error_as_tuple, widths)
 
 
 @lru_cache(maxsize=512)
@@ -440,14 +523,12 @@ def _format_error(
     error: LintError = dict(error_as_tuple)  # type: ignore
     widths: dict[str, int] = dict(widths_as_tuple)
     info_tmpl = (
-        " {{LINE:>{line}}}:{{START:<{col}}}  {{error_type:{error_type}}}  "
-        "{{linter:<{linter_name}}}  "
+        "{{error_type:{error_type}}}  {{linter:<{linter_name}}}  "
         .format(**widths)
     )
 
-    line = error["line"] + 1
-    start = error["start"] + 1
-    info = info_tmpl.format(LINE=line, START=start, **error)
+    # The position gets filled in by `format_error`
+    info = " " * position_width(widths) + info_tmpl.format(**error)
     code = " \u200B{}".format(error['code']) if error['code'] else ""
     rv = list(flatten(
         textwrap.wrap(
@@ -497,25 +578,6 @@ def fill_panel(window: sublime.Window) -> None:
     settings = panel.settings()
     settings.set("result_base_dir", base_dir)
 
-    widths: tuple[tuple[str, int], ...] = tuple(
-        zip(
-            ('line', 'col', 'error_type', 'linter_name'),
-            map(
-                max,
-                zip(*[
-                    (
-                        len(str(error['line'] + 1)),
-                        len(str(error['start'] + 1)),
-                        len(error['error_type']),
-                        len(error['linter']),
-                    )
-                    for error in flatten(errors_by_file.values())
-                ])
-            )
-        )
-    )
-    widths += (('viewport', int(vx // panel.em_width()) - 1), )
-
     def sorted_by_path(active_filename, items):
         active_filename_parts = len(fpath_by_file[active_filename].split(os.sep))
 
@@ -525,7 +587,6 @@ def fill_panel(window: sublime.Window) -> None:
             return (abs(len(parts) - active_filename_parts), len(parts), parts)
         return sorted(items, key=by_path)
 
-    to_render = []
     if active_filename:
         affected_filenames = set(flatten(
             persist.affected_filenames_per_filename.get(active_filename, {}).values()
@@ -570,34 +631,96 @@ def fill_panel(window: sublime.Window) -> None:
             for filename, errors in errors_by_file.items()
         )
 
-    for fpath, filename, errors in sorted_errors:
-        to_render.append(format_header(fpath))
-
-        if errors:
-            for error in errors:
-                lines = format_error(error, widths)
-                to_render.extend(lines)
-                error["panel_line"] = (len(to_render) - len(lines), len(to_render) - 1)
-        else:
-            actual_linter_names = ', '.join(sorted(
-                persist.actual_linters.get(filename, set())
-            ))
-            if actual_linter_names:
-                to_render.append(
-                    NO_RESULTS_MESSAGE
-                    + " Running {}.".format(actual_linter_names)
-                )
-            else:
-                to_render.append(NO_RESULTS_MESSAGE)
+    virtual = (
+        sum(map(len, errors_by_file.values()))
+        > persist.settings.get('panel.virtualize_above', 20000)
+    )
+    # Bind `sublime_linter_panel_expand` only if there is something to expand
+    settings.set("sublime_linter_virtual_panel", virtual)
+    pages: dict[FileName, Page]
+    if virtual:
+        virtual_state = VIRTUAL_STATE[window.id()]
+        cursor = State['cursor']
+        cursor_row = (
+            active_view.rowcol(cursor)[0]
+            if active_view and cursor != -1
+            else None
+        )
+        pages = {
+            filename: compute_page(
+                virtual_state,
+                filename,
+                errors,
+                cursor_row if filename == active_filename else None,
+                collapsible=filename != active_filename
+            )
+            for filename, errors in errors_by_file.items()
+        }
+    else:
+        pages = {
+            filename: (0, len(errors))
+            for filename, errors in errors_by_file.items()
+        }
 
-        # Insert empty line between files
-        to_render.append("")
+    widths: tuple[tuple[str, int], ...] = tuple(
+        zip(
+            ('line', 'col', 'error_type', 'linter_name'),
+            map(
+                max,
+                zip(*[
+                    (
+                        len(str(error['line'] + 1)),
+                        len(str(error['start'] + 1)),
+                        len(error['error_type']),
+                        len(error['linter']),
+                    )
+                    for error in flatten(
+                        errors[page[0]:page[1]]
+                        for filename, errors in errors_by_file.items()
+                        for page in [pages[filename]]
+                        if page
+                    )
+                ])
+            )
+        )
+    )
+    widths += (('viewport', int(vx // panel.em_width()) - 1), )
 
-    content = '\n'.join(to_render)
-    draw_info: DrawInfo = {
-        'panel': panel,
-        'content': content
+    previous_sections = {
+        section.filename: section
+        for section in PANEL_MODELS.get(panel.id(), [])
     }
+    sections = []
+    for fpath, filename, errors in sorted_errors:
+        page = pages[filename]
+        collapsible = virtual and filename != active_filename
+        key = section_key(fpath, filename, errors, widths, page, collapsible)
+        section = previous_sections.get(filename)
+        if section is None or section.key != key:
+            section = render_section(
+                fpath, filename, errors, widths, key, page, collapsible)
+        sections.append(section)
+
+    offset = 0
+    for section in sections:
+        errors = errors_by_file.get(section.filename, [])
+        if virtual:
+            for error in errors:
+                error.pop("panel_line", None)
+        rendered_errors = errors[section.first_error:]
+        for error, (start, end) in zip(rendered_errors, section.panel_lines):
+            error["panel_line"] = (offset + start, offset + end)
+        offset += len(section.lines)
+
+    draw_info: DrawInfo = {'panel': panel}
+    previous = PANEL_MODELS.get(panel.id())
+    if not previous or not sections:
+        draw_info['content'] = '\n'.join(flatten(s.lines for s in sections))
+    else:
+        splice = compute_splice(previous, sections)
+        if splice is not None:
+            draw_info['splice'] = splice
+    PANEL_MODELS[panel.id()] = sections
 
     if active_view:
         update_panel_selection(draw_info=draw_info, **State)  # type: ignore[arg-type]
@@ -605,6 +728,156 @@ def fill_panel(window: sublime.Window) -> None:
         draw(draw_info)
 
 
+def compute_page(
+    virtual_state: VirtualState,
+    filename: FileName,
+    errors: list[LintError],
+    cursor_row: Optional[int],
+    collapsible: bool
+) -> Page:
+    """Return the slice of `errors` to render, `None` if collapsed.
+
+    Pages stick until the cursor moves to a line the current page
+    does not cover.  Then we center the page around that line.
+    """
+    if collapsible and filename not in virtual_state['expanded']:
+        return None
+
+    def clamp(start):
+        return max(0, min(start, len(errors) - PAGE_SIZE))
+
+    start = clamp(virtual_state['pages'].get(filename, 0))
+    stop = min(len(errors), start + PAGE_SIZE)
+    if (
+        cursor_row is not None
+        and virtual_state['anchors'].get(filename) != cursor_row
+    ):
+        virtual_state['anchors'][filename] = cursor_row
+        if not page_covers_row(
+            errors[start:stop], start == 0, stop == len(errors), cursor_row
+        ):
+            idx = bisect_left([error['line'] for error in errors], cursor_row)
+            start = clamp(idx - PAGE_SIZE // 2)
+            stop = min(len(errors), start + PAGE_SIZE)
+
+    virtual_state['pages'][filename] = start
+    return (start, stop)
+
+
+def page_covers_row(
+    errors_on_page: list[LintError], at_start: bool, at_end: bool, row: int
+) -> bool:
+    if not errors_on_page:
+        return True
+    return (
+        (at_start or errors_on_page[0]['line'] <= row)
+        and (at_end or row <= errors_on_page[-1]['line'])
+    )
+
+
+def section_key(
+    fpath: str,
+    filename: FileName,
+    errors: list[LintError],
+    widths: tuple[tuple[str, int], ...],
+    page: Page,
+    collapsible: bool
+) -> Hashable:
+    """Return a key which changes whenever the rendered block would change."""
+    if page is None:
+        return (fpath, summarize_errors(errors))
+    if errors:
+        start, stop = page
+        return (
+            fpath, widths, page, len(errors), collapsible,
+            tuple(map(error_as_tuple, errors[start:stop]))
+        )
+    return (fpath, tuple(sorted(persist.actual_linters.get(filename, set()))))
+
+
+def summarize_errors(errors: list[LintError]) -> str:
+    counts = Counter(error['error_type'] for error in errors)
+    return ', '.join(
+        '{}: {}'.format(error_type, count)
+        for error_type, count in sorted(counts.items())
+    )
+
+
+def render_section(
+    fpath: str,
+    filename: FileName,
+    errors: list[LintError],
+    widths: tuple[tuple[str, int], ...],
+    key: Hashable,
+    page: Page = None,
+    collapsible: bool = False
+) -> PanelSection:
+    lines = [format_header(fpath)]
+    panel_lines = []
+    actions = {0: 'toggle'} if collapsible else {}
+    if page is None:
+        lines.append(COLLAPSED_MESSAGE.format(len(errors), summarize_errors(errors)))
+        actions[1] = 'toggle'
+        page = (0, 0)
+    elif errors:
+        start, stop = page
+        if start > 0:
+            actions[len(lines)] = 'previous'
+            lines.append(MORE_ABOVE_MESSAGE.format(start))
+        for error in errors[start:stop]:
+            formatted = format_error(error, widths)
+            panel_lines.append((len(lines), len(lines) + len(formatted) - 1))
+            lines.extend(formatted)
+        if stop < len(errors):
+            actions[len(lines)] = 'next'
+            lines.append(MORE_BELOW_MESSAGE.format(len(errors) - stop))
+    else:
+        actual_linter_names = ', '.join(sorted(
+            persist.actual_linters.get(filename, set())
+        ))
+        if actual_linter_names:
+            lines.append(
+                NO_RESULTS_MESSAGE
+                + " Running {}.".format(actual_linter_names)
+            )
+        else:
+            lines.append(NO_RESULTS_MESSAGE)
+
+    # Insert empty line between files
+    lines.append("")
+    return PanelSection(filename, key, lines, panel_lines, page[0], actions)
+
+
+def compute_splice(
+    previous: list[PanelSection],
+    sections: list[PanelSection]
+) -> Optional[Splice]:
+    """Compute the lines to replace to get from `previous` to `sections`.
+
+    Unchanged sections at the start and at the end are kept, everything
+    in between is replaced.  Return `None` if nothing changed at all.
+    """
+    n = min(len(previous), len(sections))
+    head = 0
+    while head < n and previous[head] is sections[head]:
+        head += 1
+    if head == len(previous) == len(sections):
+        return None
+
+    tail = 0
+    while (
+        tail < n - head
+        and previous[-1 - tail] is sections[-1 - tail]
+    ):
+        tail += 1
+
+    start = sum(len(s.lines) for s in previous[:head])
+    expected_rows = sum(len(s.lines) for s in previous)
+    stop = expected_rows - sum(len(s.lines) for s in previous[len(previous) - tail:])
+    lines = list(flatten(s.lines for s in sections[head:len(sections) - tail]))
+    return Splice(start, stop, lines, expected_rows, sections)
+
+
 def update_panel_selection(
     active_view: sublime.View,
     cursor: int,
@@ -625,21 +898,35 @@ def update_panel_selection(
         return
 
     filename = util.canonical_filename(active_view)
+    row, _ = active_view.rowcol(cursor)
 
-    try:
-        # Rarely, and if so only on hot-reload, `update_panel_selection` runs
-        # before `fill_panel`, thus 'panel_line' has not been set.
-        all_errors = sorted(persist.file_errors[filename],
-                            key=lambda e: e['panel_line'])
-    except KeyError:
-        all_errors = []
+    # Rarely, and if so only on hot-reload, `update_panel_selection` runs
+    # before `fill_panel`, thus 'panel_line' has not been set.  For the
+    # virtual panel, only the errors of the current page have one.
+    file_errors = persist.file_errors.get(filename, [])
+    all_errors = sorted(
+        (error for error in file_errors if 'panel_line' in error),
+        key=lambda e: e['panel_line']
+    )
+    virtual_state = VIRTUAL_STATE[window.id()]
+    start = virtual_state['pages'].get(filename, 0)
+    if (
+        'panel' not in draw_info  # t.i. we're not called by `fill_panel`
+        and len(all_errors) < len(file_errors)
+        and virtual_state['anchors'].get(filename) != row
+        and not page_covers_row(
+            all_errors, start == 0, start + len(all_errors) >= len(file_errors), row
+        )
+    ):
+        # The cursor left the current page, render the next one
+        fill_panel(window)
+        return
 
     draw_info.update({
         'panel': panel,
         'errors_from_active_view': all_errors
     })
 
-    row, _ = active_view.rowcol(cursor)
     errors_with_position: Iterable[tuple[LintError, tuple[int, int, int, int]]] = (
         (
             error,
@@ -705,6 +992,77 @@ def update_panel_content(panel, text):
     panel.run_command('sublime_linter_replace_panel_content', {'text': text})
 
 
+class sublime_linter_panel_expand(sublime_plugin.TextCommand):
+    """Toggle a file or load the next page of the virtual panel."""
+    def run(self, edit):
+        panel = self.view
+        window = panel.window()
+        if not window:
+            return
+
+        row, _ = panel.rowcol(next((s.begin() for s in panel.sel()), 0))
+        offset = 0
+        for section in PANEL_MODELS.get(panel.id(), []):
+            if offset <= row < offset + len(section.lines):
+                break
+            offset += len(section.lines)
+        else:
+            return
+
+        action = section.actions.get(row - offset)
+        if action is None:
+            return
+
+        virtual_state = VIRTUAL_STATE[window.id()]
+        filename = section.filename
+        if action == 'toggle':
+            virtual_state['expanded'] ^= {filename}
+        else:
+            delta = PAGE_SIZE if action == 'next' else -PAGE_SIZE
+            virtual_state['pages'][filename] = section.first_error + delta
+        sublime.set_timeout_async(lambda: fill_panel(window))
+
+
+def splice_panel_content(panel: sublime.View, splice: Splice) -> None:
+    rows = panel.rowcol(panel.size())[0] + 1
+    if rows != splice.expected_rows:
+        # Someone else touched the panel, just redraw everything.
+        update_panel_content(
+            panel, '\n'.join(flatten(s.lines for s in splice.sections)))
+        return
+
+    panel.run_command('sublime_linter_splice_panel_content', {
+        'start': splice.start,
+        'stop': splice.stop,
+        'rows': rows,
+        'lines': splice.lines
+    })
+
+
+class sublime_linter_splice_panel_content(sublime_plugin.TextCommand):
+    def run(self, edit, start, stop, rows, lines):
+        view = self.view
+        _, y = view.viewport_position()
+        if stop < rows:
+            region = sublime.Region(
+                view.text_point(start, 0), view.text_point(stop, 0))
+            text = ''.join(line + '\n' for line in lines)
+        elif start > 0:
+            # The last line has no trailing newline, so we take over the
+            # newline of the line before.
+            region = sublime.Region(
+                view.line(view.text_point(start - 1, 0)).end(), view.size())
+            text = ''.join('\n' + line for line in lines)
+        else:
+            region = sublime.Region(0, view.size())
+            text = '\n'.join(lines)
+        view.set_read_only(False)
+        view.replace(edit, region, text)
+        view.set_read_only(True)
+        view.set_viewport_position((0, 0), False)
+        view.set_viewport_position((0, y), False)
+
+
 class sublime_linter_replace_panel_content(sublime_plugin.TextCommand):
     def run(self, edit, text):
         view = self.view
@@ -907,20 +1265,17 @@ def render_visible_viewport(panel: sublime.View, view: sublime.View) -> None:
 
     ... indicating the current viewport into that file or error(s) list.
     """
-    errors = persist.file_errors.get(util.canonical_filename(view), [])
-    if len(errors) > CONFUSION_THRESHOLD:
-        viewport = view.visible_region()
+    index = error_index.for_file(util.canonical_filename(view))
+    if len(index) > CONFUSION_THRESHOLD:
         visible_errors = [
             error
-            for error in errors
-            if viewport.contains(error['region'])
+            for error in index.within(view.visible_region())
+            # The virtual panel only shows a page of all errors
+            if 'panel_line' in error
         ]
-        if visible_errors and len(visible_errors) != len(errors):
-            try:
-                visible_errors = sorted(
-                    visible_errors, key=lambda error: error['panel_line'])
-            except KeyError:
-                return
+        if visible_errors and len(visible_errors) != len(index):
+            visible_errors = sorted(
+                visible_errors, key=lambda error: error['panel_line'])
             head, end = visible_errors[0], visible_errors[-1]
             head_line = panel.text_point(head['panel_line'][0] - 1, 0)
             end_line = panel.text_point(end['panel_line'][1], 0)
@@ -2,12 +2,13 @@ from __future__ import annotations
 import sublime
 import sublime_plugin
 
+from .lint import error_index
 from .lint import persist
 from .lint import quick_fix
 from .lint import util
 
 
-from typing import Callable, Optional, TypedDict
+from typing import Optional, TypedDict
 
 LintError = persist.LintError
 QuickAction = quick_fix.QuickAction
@@ -84,26 +85,13 @@ class sublime_linter_quick_actions(sublime_plugin.TextCommand):
         else:
             sel = view.sel()[0]
 
-        filename = util.canonical_filename(view)
+        index = error_index.for_file(util.canonical_filename(view))
         if sel.empty():
             char_selection = sublime.Region(sel.a, sel.a + 1)
-            errors = get_errors_where(
-                filename,
-                lambda region: region.intersects(char_selection)
-            )
+            errors = index.intersecting(char_selection)
             if errors:
                 return errors
 
             sel = view.full_line(sel.a)
 
-        return get_errors_where(
-            filename,
-            lambda region: region.intersects(sel)
-        )
-
-
-def get_errors_where(filename: str, fn: Callable[[sublime.Region], bool]) -> list[LintError]:
-    return [
-        error for error in persist.file_errors[filename]
-        if fn(error['region'])
-    ]
+        return index.intersecting(sel)
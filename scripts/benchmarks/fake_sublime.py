@@ -0,0 +1,493 @@
+"""In-memory stand-ins for the `sublime` and `sublime_plugin` modules.
+
+Only the parts of the API the benchmarked code paths touch are
+implemented, modelled after `stubs/sublime.pyi`.  Callbacks scheduled via
+`set_timeout` are collected in `scheduled` but never run; the benchmarks
+measure our Python side, not drawing.
+"""
+import json
+import re
+import sys
+import types
+from itertools import count
+
+
+DRAW_EMPTY = 1
+HIDE_ON_MINIMAP = 2
+DRAW_EMPTY_AS_OVERWRITE = 4
+PERSISTENT = 16
+DRAW_NO_FILL = 32
+DRAW_OUTLINED = DRAW_NO_FILL
+HIDDEN = 128
+DRAW_NO_OUTLINE = 256
+DRAW_SOLID_UNDERLINE = 512
+DRAW_STIPPLED_UNDERLINE = 1024
+DRAW_SQUIGGLY_UNDERLINE = 2048
+NO_UNDO = 8192
+
+LITERAL = 1
+IGNORECASE = 2
+
+HOVER_TEXT = 1
+HOVER_GUTTER = 2
+HOVER_MARGIN = 3
+
+HIDE_ON_MOUSE_MOVE = 4
+HIDE_ON_MOUSE_MOVE_AWAY = 8
+HIDE_ON_CHARACTER_EVENT = 32
+
+LAYOUT_INLINE = 0
+LAYOUT_BELOW = 1
+LAYOUT_BLOCK = 2
+
+ENCODED_POSITION = 1
+TRANSIENT = 4
+
+
+class Region:
+    __slots__ = ('a', 'b', 'xpos')
+
+    def __init__(self, a, b=None, xpos=-1):
+        self.a = a
+        self.b = a if b is None else b
+        self.xpos = xpos
+
+    def __iter__(self):
+        return iter((self.a, self.b))
+
+    def __len__(self):
+        return self.size()
+
+    def __eq__(self, other):
+        return isinstance(other, Region) and (self.a, self.b) == (other.a, other.b)
+
+    def __hash__(self):
+        return hash((self.a, self.b))
+
+    def __lt__(self, other):
+        return (self.begin(), self.end()) < (other.begin(), other.end())
+
+    def __contains__(self, value):
+        return self.contains(value)
+
+    def __repr__(self):
+        return 'Region({!r}, {!r})'.format(self.a, self.b)
+
+    def to_tuple(self):
+        return (self.a, self.b)
+
+    def empty(self):
+        return self.a == self.b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return abs(self.b - self.a)
+
+    def contains(self, value):
+        if isinstance(value, Region):
+            return self.begin() <= value.begin() and value.end() <= self.end()
+        return self.begin() <= value <= self.end()
+
+    def cover(self, other):
+        return Region(min(self.begin(), other.begin()), max(self.end(), other.end()))
+
+    def intersects(self, other):
+        return self.begin() < other.end() and other.begin() < self.end()
+
+    def intersection(self, other):
+        if not self.intersects(other):
+            return Region(0)
+        return Region(max(self.begin(), other.begin()), min(self.end(), other.end()))
+
+
+class Settings:
+    def __init__(self, values=None):
+        self._values = dict(values or {})
+        self._callbacks = {}
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def has(self, key):
+        return key in self._values
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def erase(self, key):
+        self._values.pop(key, None)
+
+    def to_dict(self):
+        return dict(self._values)
+
+    def add_on_change(self, tag, callback):
+        self._callbacks[tag] = callback
+
+    def clear_on_change(self, tag):
+        self._callbacks.pop(tag, None)
+
+
+_ids = count(1)
+
+
+class Selection(list):
+    def __init__(self):
+        super().__init__([Region(0)])
+
+    def add(self, region):
+        self.append(region)
+
+    def add_all(self, regions):
+        self.extend(regions)
+
+
+class View:
+    def __init__(self, window=None, text='', file_name=None):
+        self._id = next(_ids)
+        self._buffer_id = next(_ids)
+        self._window = window
+        self._text = text
+        self._file_name = file_name
+        self._settings = Settings({'tab_size': 4})
+        self._regions = {}
+        self._read_only = False
+        self._selection = Selection()
+
+    def id(self):
+        return self._id
+
+    def buffer_id(self):
+        return self._buffer_id
+
+    def is_valid(self):
+        return True
+
+    def window(self):
+        return self._window
+
+    def file_name(self):
+        return self._file_name
+
+    def name(self):
+        return ''
+
+    def settings(self):
+        return self._settings
+
+    def size(self):
+        return len(self._text)
+
+    def substr(self, x):
+        if isinstance(x, Region):
+            return self._text[x.begin():x.end()]
+        return self._text[x:x + 1]
+
+    def rowcol(self, point):
+        row = self._text.count('\n', 0, point)
+        return row, point - (self._text.rfind('\n', 0, point) + 1)
+
+    def text_point(self, row, col):
+        lines = self._text.split('\n')
+        return sum(len(line) + 1 for line in lines[:row]) + col
+
+    def is_read_only(self):
+        return self._read_only
+
+    def set_read_only(self, flag):
+        self._read_only = flag
+
+    def is_scratch(self):
+        return False
+
+    def is_loading(self):
+        return False
+
+    def change_count(self):
+        return 0
+
+    def viewport_extent(self):
+        return (800.0, 600.0)
+
+    def viewport_position(self):
+        return (0.0, 0.0)
+
+    def em_width(self):
+        return 8.0
+
+    def line_height(self):
+        return 16.0
+
+    def visible_region(self):
+        return Region(0, len(self._text))
+
+    def sel(self):
+        return self._selection
+
+    def find(self, pattern, start_pt, flags=0):
+        if flags & LITERAL:
+            index = self._text.find(pattern, start_pt)
+            return Region(index, index + len(pattern)) if index != -1 else None
+        match = re.compile(pattern, re.I if flags & IGNORECASE else 0).search(self._text, start_pt)
+        return Region(match.start(), match.end()) if match else None
+
+    def line(self, x):
+        pt = x.begin() if isinstance(x, Region) else x
+        start = self._text.rfind('\n', 0, pt) + 1
+        end = self._text.find('\n', pt)
+        return Region(start, len(self._text) if end == -1 else end)
+
+    def text_to_layout(self, point):
+        row, col = self.rowcol(point)
+        return (col * self.em_width(), row * self.line_height())
+
+    def layout_to_text(self, vector):
+        _, y = vector
+        return self.text_point(int(y // self.line_height()), 0)
+
+    def set_viewport_position(self, xy, animate=True):
+        pass
+
+    def add_regions(self, key, regions, scope='', icon='', flags=0, annotations=(), annotation_color=''):
+        self._regions[key] = list(regions)
+
+    def get_regions(self, key):
+        return self._regions.get(key, [])
+
+    def erase_regions(self, key):
+        self._regions.pop(key, None)
+
+    def assign_syntax(self, syntax):
+        pass
+
+    def run_command(self, cmd, args=None):
+        pass
+
+
+class Window:
+    def __init__(self):
+        self._id = next(_ids)
+        self._views = []
+        self._panels = {}
+
+    def id(self):
+        return self._id
+
+    def is_valid(self):
+        return True
+
+    def new_file(self, text='', file_name=None):
+        view = View(self, text, file_name)
+        self._views.append(view)
+        return view
+
+    def views(self):
+        return list(self._views)
+
+    def active_view(self):
+        return self._views[-1] if self._views else None
+
+    def find_output_panel(self, name):
+        return self._panels.get(name)
+
+    def create_output_panel(self, name, unlisted=False):
+        panel = self._panels.get(name)
+        if panel is None:
+            panel = self._panels[name] = View(self)
+        return panel
+
+    def active_panel(self):
+        return None
+
+    def extract_variables(self):
+        return {}
+
+    def folders(self):
+        return []
+
+    def project_file_name(self):
+        return None
+
+    def project_data(self):
+        return None
+
+    def run_command(self, cmd, args=None):
+        pass
+
+    def status_message(self, msg):
+        pass
+
+
+class Phantom:
+    def __init__(self, region, content, layout, on_navigate=None):
+        self.region = region
+        self.content = content
+        self.layout = layout
+        self.on_navigate = on_navigate
+
+
+class PhantomSet:
+    def __init__(self, view, key=''):
+        self.view = view
+        self.key = key
+        self.phantoms = []
+
+    def update(self, phantoms):
+        self.phantoms = list(phantoms)
+
+
+_settings = {}
+_windows = []
+scheduled = []
+
+
+def load_settings(base_name):
+    try:
+        return _settings[base_name]
+    except KeyError:
+        s = _settings[base_name] = Settings()
+        return s
+
+
+def save_settings(base_name):
+    pass
+
+
+def set_timeout(callback, delay=0):
+    scheduled.append(callback)
+
+
+def set_timeout_async(callback, delay=0):
+    scheduled.append(callback)
+
+
+def active_window():
+    if not _windows:
+        _windows.append(Window())
+    return _windows[0]
+
+
+def windows():
+    return list(_windows)
+
+
+def version():
+    return '4180'
+
+
+def platform():
+    return 'linux' if sys.platform.startswith('linux') else 'osx' if sys.platform == 'darwin' else 'windows'
+
+
+def arch():
+    return 'x64'
+
+
+def cache_path():
+    return ''
+
+
+def packages_path():
+    return ''
+
+
+def installed_packages_path():
+    return ''
+
+
+def load_resource(name):
+    return ''
+
+
+def find_resources(pattern):
+    return []
+
+
+def expand_variables(value, variables):
+    return value
+
+
+def status_message(msg):
+    pass
+
+
+def run_command(cmd, args=None):
+    pass
+
+
+def score_selector(scope_name, selector):
+    return 1
+
+
+_COMMENTS_OR_STRINGS = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.S)
+_TRAILING_COMMAS = re.compile(r',(\s*[}\]])')
+
+
+def decode_value(data):
+    """Parse Sublime's JSON flavor which allows comments and trailing commas."""
+    data = _COMMENTS_OR_STRINGS.sub(lambda m: m.group(1) or '', data)
+    return json.loads(_TRAILING_COMMAS.sub(r'\1', data))
+
+
+class EventListener:
+    pass
+
+
+class ViewEventListener:
+    def __init__(self, view):
+        self.view = view
+
+
+class TextChangeListener:
+    pass
+
+
+class TextCommand:
+    def __init__(self, view):
+        self.view = view
+
+
+class WindowCommand:
+    def __init__(self, window):
+        self.window = window
+
+
+class ApplicationCommand:
+    pass
+
+
+class ListInputHandler:
+    pass
+
+
+class TextInputHandler:
+    pass
+
+
+class CommandInputHandler:
+    pass
+
+
+def install():
+    """Register the fakes as `sublime` and `sublime_plugin` in `sys.modules`."""
+    this = sys.modules[__name__]
+    sublime = types.ModuleType('sublime')
+    sublime_plugin = types.ModuleType('sublime_plugin')
+    plugin_names = {
+        'EventListener', 'ViewEventListener', 'TextChangeListener',
+        'TextCommand', 'WindowCommand', 'ApplicationCommand',
+        'ListInputHandler', 'TextInputHandler', 'CommandInputHandler',
+    }
+    for name, value in vars(this).items():
+        if name.startswith('__') or name == 'install':
+            continue
+        setattr(sublime_plugin if name in plugin_names else sublime, name, value)
+    sublime_plugin.reload_plugin = lambda name: None
+    sublime_plugin.unload_module = lambda module: None
+    sys.modules['sublime'] = sublime
+    sys.modules['sublime_plugin'] = sublime_plugin
+    return sublime
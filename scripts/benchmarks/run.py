@@ -0,0 +1,223 @@
+"""Benchmark the parse, finalize and highlight hot paths outside of Sublime.
+
+Runs against the in-memory fakes in `fake_sublime.py` with synthetic
+linter output of 10, 1k, 10k and 100k errors.  Results are written to
+`results/<label>.json`, by default labelled with the current version from
+`messages.json`.  Compare two runs to spot regressions between releases:
+
+    python scripts/benchmarks/run.py
+    python scripts/benchmarks/run.py --label wip --compare scripts/benchmarks/results/4.26.0.json
+
+"""
+import argparse
+from collections import OrderedDict
+import copy
+from datetime import datetime, timezone
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+RESULTS_DIR = os.path.join(HERE, 'results')
+DEFAULT_SIZES = (10, 1000, 10000, 100000)
+TIME_BUDGET = 0.5  # [s] per benchmark and size
+MAX_RUNS = 1000
+REGRESSION_THRESHOLD = 1.2
+
+sys.path.insert(0, HERE)
+import fake_sublime  # noqa: E402
+
+sublime = fake_sublime.install()
+
+
+def import_sublime_linter():
+    """Import the checkout as the `SublimeLinter` package, whatever its folder is called."""
+    spec = importlib.util.spec_from_file_location(
+        'SublimeLinter', os.path.join(ROOT, '__init__.py'),
+        submodule_search_locations=[ROOT])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['SublimeLinter'] = package
+    spec.loader.exec_module(package)
+
+    with open(os.path.join(ROOT, 'SublimeLinter.sublime-settings'), encoding='utf-8') as f:
+        defaults = sublime.decode_value(f.read())
+    settings = sublime.load_settings('SublimeLinter.sublime-settings')
+    for key, value in defaults.items():
+        settings.set(key, value)
+
+
+import_sublime_linter()
+from SublimeLinter import highlight_view, panel_view  # noqa: E402
+from SublimeLinter.lint import Linter, backend, linter as linter_module, persist  # noqa: E402
+
+
+class BenchLinter(Linter):
+    defaults = {'selector': 'NONE'}
+    cmd = 'bench'
+    regex = (
+        r'^stdin:(?P<line>\d+):(?P<col>\d+): '
+        r'(?:(?P<error>E)|(?P<warning>W))(?P<code>\d+) (?P<message>.*)$'
+    )
+
+
+CODE_LINE = '    result = compute(value, other_value)  # comment\n'
+
+
+def make_fixture(size):
+    """Return code and linter output with `size` errors.
+
+    Every other line gets two errors at the same position, so that
+    `filter_errors` has something to group.
+    """
+    lines = max(1, (size + 1) // 2)
+    code = CODE_LINE * lines
+    output = '\n'.join(
+        'stdin:{}:{}: {}{} message number {}'.format(
+            i // 2 + 1, 5 + (i % 4 == 1) * 4, 'E' if i % 3 else 'W', 100 + i % 50, i)
+        for i in range(size)
+    ) + '\n'
+    return code, output
+
+
+def bench(fn, setup=lambda: None):
+    """Run `fn(setup())` repeatedly within the time budget, return timings."""
+    timings = []
+    spent = 0.0
+    while spent < TIME_BUDGET and len(timings) < MAX_RUNS:
+        arg = setup()
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+        spent += timings[-1]
+    return {
+        'runs': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+    }
+
+
+def run_size(size):
+    window = sublime.active_window()
+    filename = os.path.join(ROOT, 'bench_{}.py'.format(size))
+    code, output = make_fixture(size)
+    view = window.new_file(code, filename)
+    linter = BenchLinter(view, linter_module.get_linter_settings(BenchLinter, view))
+
+    vv = linter_module.VirtualView(code)
+    matches = list(linter.find_errors(output))
+    raw_errors = [linter.process_match(m, vv) for m in matches]
+    errors = copy.deepcopy(raw_errors)
+    backend.finalize_errors(linter, errors, (0, 0, 0))
+    demote_predicate = highlight_view.get_demote_predicate()
+    demote_scope = highlight_view.get_demote_scope()
+    squiggles = highlight_view.prepare_highlights_data(
+        errors, demote_predicate, demote_scope, quiet=False, idle=True)
+
+    def fill_panel(_):
+        persist.file_errors[filename] = errors
+        panel_view.fill_panel(window)
+        del sublime.scheduled[:]
+
+    results = OrderedDict([
+        ('VirtualView', bench(lambda _: linter_module.VirtualView(code))),
+        ('find_errors', bench(lambda _: list(linter.find_errors(output)))),
+        ('process_match', bench(lambda _: [linter.process_match(m, vv) for m in matches])),
+        ('finalize_errors', bench(
+            lambda errs: backend.finalize_errors(linter, errs, (0, 0, 0)),
+            lambda: copy.deepcopy(raw_errors))),
+        ('make_error_uid', bench(lambda _: [backend.make_error_uid(e) for e in errors])),
+        ('filter_errors', bench(
+            lambda _: highlight_view.filter_errors(errors, highlight_view.by_position))),
+        ('prepare_highlights_data', bench(
+            lambda _: highlight_view.prepare_highlights_data(
+                errors, demote_predicate, demote_scope, quiet=False, idle=True))),
+        ('batch_squiggles', bench(
+            lambda _: highlight_view.batch_squiggles(squiggles))),
+        ('fill_panel', bench(fill_panel)),
+    ])
+    persist.file_errors.pop(filename, None)
+    window._views.remove(view)
+    return results
+
+
+def read_version():
+    with open(os.path.join(ROOT, 'messages.json'), encoding='utf-8') as f:
+        messages = json.load(f)
+    return list(messages)[-1]
+
+
+def compare(current, baseline):
+    """Print current vs baseline medians, return the names of regressions."""
+    regressions = []
+    print('\n{:<26}{:>8}{:>14}{:>14}{:>8}'.format('benchmark', 'size', 'baseline', 'current', 'ratio'))
+    for name, by_size in current['results'].items():
+        for size, timing in by_size.items():
+            try:
+                before = baseline['results'][name][size]['median']
+            except KeyError:
+                continue
+            ratio = timing['median'] / before if before else float('inf')
+            marker = ''
+            if ratio > REGRESSION_THRESHOLD:
+                marker = '  <- slower'
+                regressions.append('{}[{}]'.format(name, size))
+            print('{:<26}{:>8}{:>12.3f}ms{:>12.3f}ms{:>8.2f}{}'.format(
+                name, size, before * 1000, timing['median'] * 1000, ratio, marker))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+        help='comma separated numbers of errors (default: %(default)s)')
+    parser.add_argument(
+        '--label', default=None,
+        help='name of the result file (default: the current version)')
+    parser.add_argument(
+        '--compare', metavar='RESULT_FILE',
+        help='earlier result file to compare against')
+    parser.add_argument(
+        '--no-save', action='store_true', help='do not write a result file')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    label = args.label or read_version()
+    current = {
+        'label': label,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': OrderedDict(),
+    }
+    for size in sizes:
+        for name, timing in run_size(size).items():
+            current['results'].setdefault(name, OrderedDict())[str(size)] = timing
+            print('{:<26}{:>8}{:>12.3f}ms  ({} runs)'.format(
+                name, size, timing['median'] * 1000, timing['runs']))
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, '{}.json'.format(label))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print('\nWrote {}'.format(os.path.relpath(path)))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline)
+        if regressions:
+            print('\nSlower than {}: {}'.format(baseline.get('label'), ', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
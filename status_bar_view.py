@@ -2,7 +2,7 @@ from __future__ import annotations
 import sublime
 import sublime_plugin
 
-from .lint import persist, events, util
+from .lint import error_index, persist, events, util
 
 from typing import Iterable, Optional, TypedDict
 
@@ -37,6 +37,7 @@ def plugin_loaded():
 
 def plugin_unloaded():
     events.off(on_lint_result)
+    events.off(on_partial_lint_result)
     for window in sublime.windows():
         for view in window.views():
             view.erase_status(STATUS_COUNTER_KEY)
@@ -49,6 +50,11 @@ def on_lint_result(filename, **kwargs):
         draw(**State)
 
 
+@events.on(events.LINT_PARTIAL_RESULT)
+def on_partial_lint_result(filename, **kwargs):
+    on_lint_result(filename=filename, **kwargs)
+
+
 class UpdateState(sublime_plugin.EventListener):
     # Fires once per view with the actual view, not necessary the primary
     def on_activated_async(self, active_view):
@@ -104,10 +110,7 @@ def messages_under_cursor(filename: FileName, current_pos: int) -> str:
 
 
 def get_errors_under_cursor(filename: FileName, cursor: int) -> Iterable[LintError]:
-    return (
-        error for error in persist.file_errors.get(filename, [])
-        if error['region'].contains(cursor)
-    )
+    return error_index.for_file(filename).containing(cursor)
 
 
 def get_current_pos(view: sublime.View) -> int:
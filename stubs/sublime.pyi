@@ -864,9 +864,23 @@ class Sheet:
     def view(self) -> Optional[View]: ...
     def is_semi_transient(self) -> bool: ...
 
+class HistoricPosition:
+    pt: Point
+    row: int
+    col: int
+    col_utf16: int
+    col_utf8: int
+
+class TextChange:
+    a: HistoricPosition
+    b: HistoricPosition
+    len_utf16: int
+    len_utf8: int
+    str: str
+
 class Buffer:
     def __init__(self, id: BufferId) -> None: ...
-    def id(self) -> int: ...
+    def id(self) -> BufferId: ...
     def file_name(self) -> str | None: ...
     def views(self) -> list[View]: ...
     def primary_view(self) -> View | None: ...
@@ -114,6 +114,21 @@ class ViewEventListener:
     def applies_to_primary_view_only(cls) -> bool: ...
     def __init__(self, view: sublime.View) -> None: ...
 
+class TextChangeListener:
+    buffer = ...  # type: sublime.Buffer
+    @classmethod
+    def is_applicable(cls, buffer: sublime.Buffer) -> bool: ...
+    def __init__(self) -> None: ...
+    def attach(self, buffer: sublime.Buffer) -> None: ...
+    def detach(self) -> None: ...
+    def is_attached(self) -> bool: ...
+    def on_text_changed(self, changes: list[sublime.TextChange]) -> None: ...
+    def on_text_changed_async(self, changes: list[sublime.TextChange]) -> None: ...
+    def on_revert(self) -> None: ...
+    def on_revert_async(self) -> None: ...
+    def on_reload(self) -> None: ...
+    def on_reload_async(self) -> None: ...
+
 class MultizipImporter:
     loaders = ...  # type: Any
     file_loaders = ...  # type: Any
@@ -5,6 +5,7 @@ from collections import defaultdict
 from functools import partial
 from itertools import chain
 import logging
+import os
 import threading
 
 import sublime
@@ -12,14 +13,21 @@ import sublime_plugin
 
 from . import log_handler
 from .lint import backend
+from .lint import cancellation
+from .lint import config_watcher
+from .lint import daemon
+from .lint import disk_cache
 from .lint import elect
+from .lint import error_index
 from .lint import events
 from .lint import linter as linter_module
 from .lint import persist
+from .lint import profiler
 from .lint import queue
 from .lint import reloader
 from .lint import settings
 from .lint import util
+from .lint import warm_pool
 from .lint.const import IS_ENABLED_SWITCH
 from .lint.util import flash
 
@@ -72,8 +80,14 @@ def plugin_loaded():
     logger.info("version: " + util.get_sl_version())
 
     # Lint the visible views from the active window on startup
+    views = list(other_visible_views())
+    if disk_cache.enabled():
+        # Paint what we remember *before* the first lint results come in,
+        # t.i. schedule before `on_activated_async` schedules the linting.
+        sublime.set_timeout_async(partial(restore_results_from_disk, views))
+
     bc = BackendController()
-    for view in other_visible_views():
+    for view in views:
         bc.on_activated_async(view)
 
 
@@ -92,10 +106,18 @@ def plugin_unloaded():
     except ImportError:
         pass
 
+    disk_cache.flush()
     queue.unload()
+    backend.shutdown()
+    daemon.kill_all()
+    warm_pool.kill_all()
+    config_watcher.stop()
+    elect.unload()
     persist.settings.unobserve()
     util.close_all_error_panels()
     events.off(on_settings_changed)
+    events.off(on_config_files_changed)
+    events.off(on_lint_end)
 
 
 @events.on('settings_changed')
@@ -134,6 +156,29 @@ class sublime_linter_reload(sublime_plugin.ApplicationCommand):
             log_handler.install()
 
 
+class sublime_linter_show_timings(sublime_plugin.WindowCommand):
+    """Show the recorded timings of the lint stages, or export them.
+
+    With `output_format: "table"` open a percentile table per linter, with
+    `output_format: "jsonl"` write all samples as JSON lines to Sublime's
+    cache directory and open that file.
+    """
+    def run(self, output_format="table"):
+        if output_format == "jsonl":
+            path = os.path.join(sublime.cache_path(), 'SublimeLinter', 'timings.jsonl')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            count = profiler.export_jsonl(path)
+            self.window.open_file(path)
+            self.window.status_message("Exported {} timings to {}".format(count, path))
+            return
+
+        view = self.window.new_file()
+        view.set_name("SublimeLinter Timings")
+        view.set_scratch(True)
+        view.run_command('append', {'characters': profiler.format_table()})
+        view.set_read_only(True)
+
+
 def reload_sublime_linter():
     sublime.run_command("sublime_linter_reload")
 
@@ -155,6 +200,9 @@ def other_visible_views():
 guard_check_linters_for_view: defaultdict[Bid, threading.Lock] = defaultdict(threading.Lock)
 buffer_filenames: dict[Bid, FileName] = {}
 buffer_base_scopes: dict[Bid, str] = {}
+# While partial results are in the store, the errors they replaced, per
+# file.  Keyed by the linted file and the linter, see `on_lint_end`.
+last_complete_results: dict[tuple[FileName, LinterName], dict[FileName, list[LintError]]] = {}
 
 
 class BackendController(sublime_plugin.EventListener):
@@ -163,6 +211,7 @@ class BackendController(sublime_plugin.EventListener):
         if not util.is_lintable(view):
             return
 
+        cancellation.cancel(view.buffer_id())
         hit(view, 'on_modified')
 
     def on_activated_async(self, view):
@@ -206,6 +255,7 @@ class BackendController(sublime_plugin.EventListener):
         hit(view, 'on_save')
 
     def on_close(self, view: sublime.View) -> None:
+        elect.forget_view(view.id())
         bid = view.buffer_id()
         filename = util.canonical_filename(view)
 
@@ -218,6 +268,9 @@ class BackendController(sublime_plugin.EventListener):
 
                 open_filenames.add(util.canonical_filename(v))
 
+        cancellation.cancel(bid)
+        config_watcher.unwatch(bid)
+
         # We want to discard this file and its dependencies but never a
         # file that is currently open or still referenced by another
         dependencies_per_file = {
@@ -231,12 +284,15 @@ class BackendController(sublime_plugin.EventListener):
         for fn in to_discard:
             persist.affected_filenames_per_filename.pop(fn, None)
             persist.file_errors.pop(fn, None)
+            error_index.forget(fn)
 
         persist.assigned_linters.pop(bid, None)
+        warm_pool.trim()
         guard_check_linters_for_view.pop(bid, None)
         buffer_filenames.pop(bid, None)
         buffer_base_scopes.pop(bid, None)
         queue.cleanup(bid)
+        queue.cleanup_group(bid)
 
 
 def detect_rename(view: sublime.View) -> tuple[FileName, FileName] | None:
@@ -321,6 +377,14 @@ def relint_views(wid=None):
                 hit(view, 'relint_views')
 
 
+@events.on(events.CONFIG_FILES_CHANGED)
+def on_config_files_changed(buffer_ids, **kwargs):
+    for window in sublime.windows():
+        for view in window.views():
+            if view.buffer_id() in buffer_ids and view.is_primary():
+                hit(view, 'on_config_change')
+
+
 def hit(view: sublime.View, reason: Reason) -> None:
     """Record an activity that could trigger a lint and enqueue a desire to lint."""
     bid = view.buffer_id()
@@ -349,12 +413,14 @@ def lint(view: sublime.View, view_has_changed: ViewChangedFn, lock: threading.Lo
         _assign_linters_to_view(view, {linter.name for linter in linters})
 
     runnable_linters = list(elect.filter_runnable_linters(linters))
+    config_watcher.unwatch(view.buffer_id(), keep={linter.name for linter in runnable_linters})
     if not runnable_linters:
         return
 
     window = view.window()
     bid = view.buffer_id()
     filename = util.canonical_filename(view)
+    token = cancellation.token_for(bid)
 
     # Very, very unlikely that `view_has_changed` is already True at this
     # point, but it also implements the kill_switch, so we ask here
@@ -366,9 +432,94 @@ def lint(view: sublime.View, view_has_changed: ViewChangedFn, lock: threading.Lo
     if persist.settings.get('kill_old_processes'):
         kill_active_popen_calls(bid)
 
-    sink = partial(
+    sink: Callable[[LinterName, list[LintError]], None] = partial(
         group_by_filename_and_update, window, filename, view_has_changed, reason)
-    backend.lint_view(runnable_linters, view, view_has_changed, sink)
+    if disk_cache.enabled():
+        sink = disk_cache.recording_sink(
+            sink, view, filename, view_has_changed, runnable_linters)
+
+    partial_sink: Callable[[LinterName, list[LintError]], None] = partial(
+        group_by_filename_and_update, window, filename, view_has_changed, reason,
+        partial_result=True)
+
+    if reason == 'on_modified':
+        runnable_linters = defer_slow_linters(
+            view, view_has_changed, runnable_linters, sink, partial_sink, token)
+    else:
+        # Any other reason supersedes pending, deferred lints.
+        queue.cleanup_group(bid)
+
+    if runnable_linters:
+        backend.lint_view(
+            runnable_linters, view, view_has_changed, sink,
+            partial_sink=partial_sink, token=token)
+
+
+def defer_slow_linters(
+    view: sublime.View,
+    view_has_changed: ViewChangedFn,
+    linters: list[elect.LinterInfo],
+    sink: Callable[[LinterName, list[LintError]], None],
+    partial_sink: Callable[[LinterName, list[LintError]], None],
+    token: cancellation.CancellationToken
+) -> list[elect.LinterInfo]:
+    """Schedule slow linters individually; return the ones to run now.
+
+    `hit` already waited the minimal delay.  Slower linters wait for a
+    longer pause in typing, based on their recent runtimes.
+    """
+    bid = view.buffer_id()
+    base_delay = backend.get_delay()
+    run_now = []
+    for linter in linters:
+        delay = backend.get_delay_for(linter.name, backend.project_of(linter.context))
+        remaining = delay - base_delay
+        if remaining <= backend.MIN_DEBOUNCE_DELAY:
+            run_now.append(linter)
+            continue
+
+        logger.info(
+            "Delay {} for '{}' for another {:.2}s"
+            .format(linter.name, util.short_canonical_filename(view), remaining)
+        )
+        queue.debounce(
+            partial(lint_deferred, view, view_has_changed, linter, sink, partial_sink, token),
+            delay=remaining,
+            key=(bid, linter.name)
+        )
+    return run_now
+
+
+def lint_deferred(
+    view: sublime.View,
+    view_has_changed: ViewChangedFn,
+    linter: elect.LinterInfo,
+    sink: Callable[[LinterName, list[LintError]], None],
+    partial_sink: Callable[[LinterName, list[LintError]], None],
+    token: cancellation.CancellationToken
+) -> None:
+    if view_has_changed() or token.cancelled:
+        return
+    backend.lint_view(
+        [linter], view, view_has_changed, sink, partial_sink=partial_sink, token=token)
+
+
+def restore_results_from_disk(views: list[sublime.View]) -> None:
+    for view in views:
+        if not view.is_valid() or view.settings().get(IS_ENABLED_SWITCH) is False:
+            continue
+
+        filename = util.canonical_filename(view)
+        linters = list(elect.assignable_linters_for_view(view, 'on_load'))
+        for linter_name, errors in disk_cache.restore(view, linters):
+            # Never overwrite a result from an actual lint.
+            if any(error['linter'] == linter_name for error in persist.file_errors.get(filename, [])):
+                continue
+            logger.info(
+                "Restored {} stored error(s) for '{}' from {}."
+                .format(len(errors), util.short_canonical_filename(view), linter_name)
+            )
+            update_file_errors(filename, linter_name, errors, 'on_load')
 
 
 def kill_active_popen_calls(bid):
@@ -380,8 +531,7 @@ def kill_active_popen_calls(bid):
             ', '.join('<pid {}>'.format(proc.pid) for proc in procs)
         ))
     for proc in procs:
-        proc.terminate()
-        setattr(proc, 'friendly_terminated', True)
+        linter_module.friendly_terminate(proc)
 
 
 def group_by_filename_and_update(
@@ -390,9 +540,14 @@ def group_by_filename_and_update(
     view_has_changed: ViewChangedFn,
     reason: Reason,
     linter: LinterName,
-    errors: list[LintError]
+    errors: list[LintError],
+    partial_result: bool = False
 ) -> None:
-    """Group lint errors by filename and update them."""
+    """Group lint errors by filename and update them.
+
+    A partial result only holds the errors found so far by a still running
+    linter.  It only updates the files it mentions.
+    """
     if view_has_changed():  # abort early
         return
 
@@ -400,6 +555,35 @@ def group_by_filename_and_update(
     for error in errors:
         grouped[error['filename']].append(error)
 
+    if partial_result:
+        # Remember the mentioned files so that the final result of this
+        # lint will clean them up if necessary.
+        persist.affected_filenames_per_filename[main_filename][linter] |= (
+            set(grouped.keys()) - {main_filename}
+        )
+        complete_results = last_complete_results.setdefault((main_filename, linter), {})
+        for filename, errors in grouped.items():
+            if filename != main_filename:
+                view = window.find_open_file(filename)
+                if view and view.is_dirty():
+                    continue
+
+            if filename not in complete_results:
+                complete_results[filename] = [
+                    error
+                    for error in persist.file_errors.get(filename, [])
+                    if error['linter'] == linter
+                ]
+            update_errors_store(filename, linter, errors)
+            events.broadcast(events.LINT_PARTIAL_RESULT, {
+                'filename': filename,
+                'linter_name': linter,
+                'errors': errors
+            })
+        return
+
+    last_complete_results.pop((main_filename, linter), None)
+
     # The contract for a simple linter is that it reports `[errors]` or an
     # empty list `[]` if the buffer is clean. For linters that report errors
     # for multiple files we collect information about which files are actually
@@ -431,6 +615,23 @@ def group_by_filename_and_update(
         update_file_errors(filename, linter, errors, reason)
 
 
+@events.on(events.LINT_END)
+def on_lint_end(filename: FileName, linter_name: LinterName, **kwargs) -> None:
+    # The backend schedules the final result before it broadcasts
+    # `lint_end`, so this runs after the result, if there is one.
+    sublime.set_timeout_async(lambda: restore_complete_result(filename, linter_name))
+
+
+def restore_complete_result(main_filename: FileName, linter: LinterName) -> None:
+    """Replace the partial results of an aborted lint with the last complete one."""
+    complete_results = last_complete_results.pop((main_filename, linter), None)
+    if complete_results is None:
+        return
+
+    for filename, errors in complete_results.items():
+        update_file_errors(filename, linter, errors)
+
+
 def update_file_errors(
     filename: FileName,
     linter: LinterName,
@@ -507,6 +708,8 @@ def _assign_linters_to_view(view: sublime.View, next_linters: set[LinterName]) -
     current_linters = persist.assigned_linters.get(bid, set())
 
     persist.assigned_linters[bid] = next_linters
+    if current_linters - next_linters:
+        warm_pool.trim()
     window.run_command('sublime_linter_assigned', {
         'filename': filename,
         'linter_names': list(next_linters)
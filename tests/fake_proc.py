@@ -0,0 +1,28 @@
+import io
+import json
+
+
+class FakeProc:
+    """Stand in for the `Popen` of a daemon which answers in json lines.
+
+    Each of `answers` becomes one line on its stdout; whatever we send to
+    the process is collected in `stdin`.
+    """
+    def __init__(self, *answers):
+        self.stdin = io.BytesIO()
+        self.stdout = io.BytesIO(b''.join(
+            (json.dumps(answer) + '\n').encode('utf-8')
+            for answer in answers
+        ))
+        self.stderr = io.BytesIO()
+        self.returncode = None
+        self.pid = 42
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        return self.returncode
@@ -1,8 +1,16 @@
+import dataclasses
+import threading
+
+import sublime
 from unittesting import DeferrableTestCase
 
 from SublimeLinter.lint import (
+    backend,
+    cancellation,
     linter as linter_module,
+    persist,
 )
+from SublimeLinter.tests.mockito import unstub, when
 
 
 class TestCloningSettings(DeferrableTestCase):
@@ -54,3 +62,309 @@ class TestCloningSettings(DeferrableTestCase):
         cloneB['a'] = 'bar'
         self.assertEqual('foo', cloneA['a'])
         self.assertEqual('bar', cloneB['a'])
+
+
+def make_error(msg='foo'):
+    return {
+        'filename': 'a.py', 'line': 0, 'start': 0, 'region': sublime.Region(0, 1),
+        'error_type': 'error', 'code': '', 'msg': msg, 'offending_text': 'a',
+    }
+
+
+class FakeLinterA:
+    pass
+
+
+class FakeLinterB:
+    pass
+
+
+class TestLintResultCache(DeferrableTestCase):
+    def test_counts_hits_and_misses(self):
+        cache = backend.LintResultCache(max_entries=10, max_bytes=10000)
+        self.assertIsNone(cache.get('key', FakeLinterA))
+        cache.put('key', FakeLinterA, [make_error()])
+        self.assertEqual([make_error()], cache.get('key', FakeLinterA))
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+
+    def test_entries_are_bound_to_the_linter_class(self):
+        cache = backend.LintResultCache(max_entries=10, max_bytes=10000)
+        cache.put('key', FakeLinterA, [make_error()])
+        self.assertIsNone(cache.get('key', FakeLinterB))
+
+    def test_returns_independent_copies(self):
+        cache = backend.LintResultCache(max_entries=10, max_bytes=10000)
+        errors = [make_error()]
+        cache.put('key', FakeLinterA, errors)
+        errors[0]['region'].a = 10
+
+        first = cache.get('key', FakeLinterA)
+        first[0]['msg'] = 'mutated'
+        first[0]['region'].b = 20
+
+        self.assertEqual([make_error()], cache.get('key', FakeLinterA))
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = backend.LintResultCache(max_entries=2, max_bytes=10000)
+        cache.put('a', FakeLinterA, [])
+        cache.put('b', FakeLinterA, [])
+        cache.get('a', FakeLinterA)
+        cache.put('c', FakeLinterA, [])
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNotNone(cache.get('a', FakeLinterA))
+        self.assertIsNone(cache.get('b', FakeLinterA))
+
+    def test_evicts_by_size(self):
+        one_error = backend.estimate_size([make_error()])
+        cache = backend.LintResultCache(max_entries=10, max_bytes=one_error * 2)
+        cache.put('a', FakeLinterA, [make_error()])
+        cache.put('b', FakeLinterA, [make_error()])
+        cache.put('c', FakeLinterA, [make_error()])
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(one_error * 2, cache.size)
+        self.assertIsNone(cache.get('a', FakeLinterA))
+
+    def test_does_not_store_oversized_results(self):
+        cache = backend.LintResultCache(max_entries=10, max_bytes=10)
+        cache.put('a', FakeLinterA, [make_error()])
+        self.assertEqual(0, len(cache))
+
+
+def make_job(name, key=None, priority=backend.PRIORITY_BACKGROUND,
+             max_concurrency=None, view_has_changed=lambda: False, token=None):
+    return backend.LintJob(
+        name,
+        {'short_canonical_filename': '<untitled>'},
+        [],
+        key=key or name,
+        view_has_changed=view_has_changed,
+        priority=priority,
+        max_concurrency=max_concurrency,
+        token=token,
+    )
+
+
+class TestScheduler(DeferrableTestCase):
+    def setUp(self):
+        self.scheduler = backend.Scheduler(max_workers=1)
+        self.addCleanup(self.scheduler.shutdown)
+        self.ran = []
+        self.done = threading.Event()
+
+    def block_worker(self):
+        # Occupy the only worker so that subsequent jobs queue up.
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait(2)
+
+        self.scheduler.submit(make_job('blocker'), blocker)
+        started.wait(2)
+        return release
+
+    def submit(self, job):
+        self.scheduler.submit(job, lambda: self.ran.append(job.linter_name))
+
+    def run_queue(self, release):
+        self.scheduler.submit(
+            make_job('sentinel', priority=99), self.done.set)
+        release.set()
+        self.assertTrue(self.done.wait(2))
+
+    def test_urgent_jobs_run_first(self):
+        release = self.block_worker()
+        self.submit(make_job('a'))
+        self.submit(make_job('b', priority=backend.PRIORITY_VISIBLE_VIEW))
+        self.submit(make_job('c', priority=backend.PRIORITY_ACTIVE_VIEW))
+        self.submit(make_job('d'))
+        self.run_queue(release)
+
+        self.assertEqual(['c', 'b', 'a', 'd'], self.ran)
+
+    def test_drop_superseded_jobs(self):
+        release = self.block_worker()
+        self.scheduler.submit(make_job('a', key=1), lambda: self.ran.append('first'))
+        self.scheduler.submit(make_job('a', key=1), lambda: self.ran.append('second'))
+        self.run_queue(release)
+
+        self.assertEqual(['second'], self.ran)
+
+    def test_drop_jobs_for_changed_views(self):
+        release = self.block_worker()
+        self.submit(make_job('a', view_has_changed=lambda: True))
+        self.submit(make_job('b'))
+        self.run_queue(release)
+
+        self.assertEqual(['b'], self.ran)
+
+    def test_drop_cancelled_jobs(self):
+        token = cancellation.CancellationToken()
+        release = self.block_worker()
+        self.submit(make_job('a', token=token))
+        self.submit(make_job('b'))
+        token.cancel()
+        self.run_queue(release)
+
+        self.assertEqual(['b'], self.ran)
+
+    def test_respect_max_concurrency(self):
+        scheduler = backend.Scheduler(max_workers=3)
+        self.addCleanup(scheduler.shutdown)
+        lock = threading.Lock()
+        running, max_running, finished = [0], [0], []
+
+        def fn():
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            threading.Event().wait(0.05)
+            with lock:
+                running[0] -= 1
+                finished.append(1)
+                if len(finished) == 4:
+                    self.done.set()
+
+        for key in range(4):
+            scheduler.submit(make_job('mypy', key=key, max_concurrency=2), fn)
+
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(2, max_running[0])
+
+
+class TestRuntimeStats(DeferrableTestCase):
+    def test_estimate_follows_recent_runtimes(self):
+        stats = backend.RuntimeStats(initial=0.6)
+        for _ in range(20):
+            stats.add(0.1)
+
+        self.assertAlmostEqual(0.1, stats.estimate(), places=2)
+
+    def test_single_outlier_is_capped(self):
+        stats = backend.RuntimeStats(initial=0.1)
+        for _ in range(20):
+            stats.add(0.1)
+        stats.add(10.0)
+
+        self.assertEqual(0.1, stats.estimate())
+
+
+class TestDelayPerLinter(DeferrableTestCase):
+    def setUp(self):
+        when(persist.settings).get('delay').thenReturn(0.1)
+        backend.runtime_stats.clear()
+
+    def tearDown(self):
+        unstub()
+        backend.runtime_stats.clear()
+
+    def add_runtimes(self, linter_name, project, runtime):
+        stats = backend.runtime_stats[(linter_name, project)] = backend.RuntimeStats()
+        for _ in range(20):
+            stats.add(runtime)
+
+    def test_fast_linters_use_the_minimal_delay(self):
+        self.add_runtimes('flake8', '/p', 0.05)
+        self.add_runtimes('mypy', '/p', 5.0)
+
+        self.assertEqual(0.1, backend.get_delay_for('flake8', '/p'))
+
+    def test_slow_linters_wait_longer(self):
+        self.add_runtimes('flake8', '/p', 0.05)
+        self.add_runtimes('mypy', '/p', 5.0)
+
+        self.assertEqual(backend.MAX_AUTOMATIC_DELAY, backend.get_delay_for('mypy', '/p'))
+
+    def test_runtimes_are_tracked_per_project(self):
+        self.add_runtimes('mypy', '/small', 0.4)
+        self.add_runtimes('mypy', '/huge', 3.0)
+
+        self.assertAlmostEqual(0.2, backend.get_delay_for('mypy', '/small'), places=2)
+
+
+class TestRememberRuntime(DeferrableTestCase):
+    def setUp(self):
+        backend.runtime_stats.clear()
+
+    def tearDown(self):
+        backend.runtime_stats.clear()
+
+    def run_job(self, task):
+        job = dataclasses.replace(
+            make_job('mypy'),
+            ctx={'canonical_filename': '<untitled>', 'short_canonical_filename': '<untitled>'},
+            tasks=[task],
+        )
+        backend.run_job(job, lambda linter_name, errors: None)
+
+    def test_remember_runtimes_of_finished_runs(self):
+        self.run_job(lambda: [])
+
+        self.assertIn(('mypy', ''), backend.runtime_stats)
+
+    def test_ignore_cancelled_runs(self):
+        def task():
+            raise linter_module.TransientError('cancelled')
+
+        self.run_job(task)
+
+        self.assertEqual({}, backend.runtime_stats)
+
+    def test_ignore_cache_hits(self):
+        self.run_job(lambda: backend.ReusedResult())
+
+        self.assertEqual({}, backend.runtime_stats)
+
+
+class TestErrorUid(DeferrableTestCase):
+    def uid(self, anchor=None, **kwargs):
+        error = dict(make_error(), linter='flake8', **kwargs)
+        return backend.make_error_uid(error, anchor)
+
+    def test_moved_errors_keep_their_uid(self):
+        self.assertEqual(
+            self.uid('import os\0o', line=0, start=0),
+            self.uid('import os\0o', line=10, start=4),
+        )
+
+    def test_uid_depends_on_the_anchor_and_the_message(self):
+        self.assertNotEqual(self.uid('import os\0o'), self.uid('import re\0o'))
+        self.assertNotEqual(self.uid('import os\0o'), self.uid('import os\0o', msg='bar'))
+
+    def test_without_anchor_fall_back_to_the_position(self):
+        self.assertNotEqual(self.uid(line=0), self.uid(line=1))
+
+    def test_line_text_at(self):
+        text = 'foo\nbar\nbaz'
+        self.assertEqual('foo', backend.line_text_at(text, 0))
+        self.assertEqual('foo', backend.line_text_at(text, 3))
+        self.assertEqual('bar', backend.line_text_at(text, 5))
+        self.assertEqual('baz', backend.line_text_at(text, 11))
+
+    def test_identical_errors_get_unique_uids(self):
+        errors = [{'uid': uid} for uid in ('a', 'a', 'a:1', 'b', 'a')]
+        backend.make_uids_unique(errors)
+
+        self.assertEqual(
+            ['a', 'a:2', 'a:1', 'b', 'a:3'],
+            [error['uid'] for error in errors]
+        )
+
+    def test_identical_errors_in_separate_tasks_get_unique_uids(self):
+        job = dataclasses.replace(
+            make_job('flake8'),
+            ctx={'canonical_filename': '<untitled>', 'short_canonical_filename': '<untitled>'},
+            tasks=[lambda: [{'uid': 'a'}], lambda: [{'uid': 'a'}]],
+        )
+        results = []
+        when(sublime).set_timeout_async(...).thenAnswer(lambda fn, delay=0: fn())
+        self.addCleanup(unstub)
+
+        backend.run_job(job, lambda linter_name, errors: results.extend(errors))
+
+        self.assertEqual(['a', 'a:1'], sorted(error['uid'] for error in results))
@@ -0,0 +1,107 @@
+import sublime
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import Linter, backend, cancellation, linter as linter_module, persist
+from SublimeLinter.tests.mockito import unstub, when
+
+
+class FakeLinter(Linter):
+    defaults = {'selector': 'NONE'}
+    cmd = 'fake_linter_1'
+    regex = r'^stdin:(?P<line>\d+):(?P<col>\d+) (?P<message>.*)$'
+
+
+class FakeProc:
+    pid = 42
+
+    def __init__(self):
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+
+
+class TestCancellationToken(DeferrableTestCase):
+    def test_call_back_while_in_context(self):
+        token = cancellation.CancellationToken()
+        calls = []
+        with token.on_cancel(lambda: calls.append('cancelled')):
+            token.cancel()
+            token.cancel()
+
+        self.assertEqual(['cancelled'], calls)
+
+    def test_do_not_call_back_after_leaving_the_context(self):
+        token = cancellation.CancellationToken()
+        calls = []
+        with token.on_cancel(lambda: calls.append('cancelled')):
+            pass
+        token.cancel()
+
+        self.assertEqual([], calls)
+
+    def test_call_back_immediately_if_already_cancelled(self):
+        token = cancellation.CancellationToken()
+        token.cancel()
+        calls = []
+        with token.on_cancel(lambda: calls.append('cancelled')):
+            self.assertEqual(['cancelled'], calls)
+
+
+class TestTokensPerBuffer(DeferrableTestCase):
+    def tearDown(self):
+        cancellation.tokens.clear()
+
+    def test_share_the_token_until_cancelled(self):
+        token = cancellation.token_for(1)
+        self.assertIs(token, cancellation.token_for(1))
+        self.assertIsNot(token, cancellation.token_for(2))
+
+        cancellation.cancel(1)
+        self.assertTrue(token.cancelled)
+        self.assertIsNot(token, cancellation.token_for(1))
+
+    def test_cancel_unknown_buffer(self):
+        cancellation.cancel(1)
+        self.assertEqual({}, cancellation.tokens)
+
+
+class TestCancelLints(DeferrableTestCase):
+    def setUp(self):
+        self.view = sublime.active_window().new_file()
+        self.linter = FakeLinter(self.view, {})
+        self.token = cancellation.CancellationToken()
+
+    def tearDown(self):
+        unstub()
+        if self.view:
+            self.view.set_scratch(True)
+            self.view.close()
+
+    def test_skip_cancelled_tasks(self):
+        when(self.linter).lint(...).thenReturn([])
+        self.token.cancel()
+
+        with self.assertRaises(linter_module.TransientError):
+            backend.execute_lint_task(self.linter, '', (0, 0, 0), lambda: False, self.token)
+
+    def test_terminate_process_on_cancel(self):
+        when(persist.settings).get('kill_old_processes').thenReturn(True)
+        self.linter.cancellation_token = self.token
+        proc = FakeProc()
+
+        with self.linter._terminate_on_cancel(proc):
+            self.token.cancel()
+
+        self.assertTrue(proc.terminated)
+        self.assertTrue(proc.friendly_terminated)
+
+    def test_keep_process_if_user_does_not_want_to_kill(self):
+        when(persist.settings).get('kill_old_processes').thenReturn(False)
+        self.linter.cancellation_token = self.token
+        proc = FakeProc()
+
+        with self.linter._terminate_on_cancel(proc):
+            self.token.cancel()
+
+        self.assertFalse(proc.terminated)
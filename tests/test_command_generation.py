@@ -3,6 +3,7 @@ from unittest import skip, expectedFailure  # noqa: F401
 import sublime
 from SublimeLinter.lint import (
     Linter,
+    executable_cache,
     linter as linter_module,
     util,
 )
@@ -45,6 +46,7 @@ class _BaseTestCase(DeferrableTestCase):
 
     def tearDown(self):
         unstub()
+        executable_cache.clear()
 
 
 class TestArgsSetting(_BaseTestCase):
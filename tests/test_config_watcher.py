@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import config_watcher, events, executable_cache
+from SublimeLinter.lint.base_linter import python_linter
+from SublimeLinter.tests.mockito import unstub, verify, when
+
+
+class FakeView:
+    def __init__(self, bid):
+        self.bid = bid
+
+    def buffer_id(self):
+        return self.bid
+
+
+class FakeLinter:
+    name = 'fakelinter'
+
+    def __init__(self, bid, file_path, working_dir=None):
+        self.view = FakeView(bid)
+        self.context = {'file_path': file_path}
+        self.working_dir = working_dir
+
+    def get_working_dir(self):
+        return self.working_dir
+
+    @classmethod
+    def get_config_files(cls):
+        return ('setup.cfg', 'node_modules/.bin')
+
+
+class TestConfigWatcher(DeferrableTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.root, 'src')
+        os.mkdir(self.file_path)
+        self.config_file = os.path.join(self.root, 'setup.cfg')
+        self.received = []
+        events.subscribe(events.CONFIG_FILES_CHANGED, self.on_changed)
+        when(config_watcher).ensure_polling().thenReturn(None)
+
+    def tearDown(self):
+        events.unsubscribe(events.CONFIG_FILES_CHANGED, self.on_changed)
+        config_watcher.stop()
+        shutil.rmtree(self.root)
+        unstub()
+
+    def on_changed(self, **payload):
+        self.received.append(payload)
+
+    def touch(self, path, mtime):
+        with open(path, 'w') as f:
+            f.write('')
+        os.utime(path, (mtime, mtime))
+
+    def test_watch_config_files_up_to_the_working_dir(self):
+        paths = config_watcher.watched_paths(FakeLinter(1, self.file_path, self.root))
+
+        self.assertIn(os.path.join(self.file_path, 'setup.cfg'), paths)
+        self.assertIn(self.config_file, paths)
+        self.assertIn(os.path.join(self.root, 'node_modules/.bin'), paths)
+        self.assertNotIn(
+            os.path.join(os.path.dirname(self.root), 'setup.cfg'), paths)
+
+    def test_without_a_working_dir_watch_only_the_files_directory(self):
+        paths = config_watcher.watched_paths(FakeLinter(1, self.file_path))
+
+        self.assertEqual(paths, {
+            os.path.join(self.file_path, 'setup.cfg'),
+            os.path.join(self.file_path, 'node_modules/.bin'),
+        })
+
+    def test_directories_between(self):
+        self.assertEqual(
+            config_watcher.directories_between(self.file_path, self.root),
+            [self.file_path, self.root]
+        )
+        self.assertEqual(
+            config_watcher.directories_between(self.root, self.root),
+            [self.root]
+        )
+        elsewhere = os.path.join(self.root, 'elsewhere')
+        self.assertEqual(
+            config_watcher.directories_between(self.file_path, elsewhere),
+            [self.file_path, elsewhere]
+        )
+
+    def test_creating_a_config_file_reports_the_watching_buffers(self):
+        config_watcher.watch(FakeLinter(1, self.file_path, self.root))
+        config_watcher.watch(FakeLinter(2, self.root, self.root))
+        config_watcher.watch(FakeLinter(3, self.file_path))
+
+        self.touch(self.config_file, 1000)
+        config_watcher.check()
+
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0]['filenames'], {self.config_file})
+        self.assertEqual(self.received[0]['buffer_ids'], {1, 2})
+
+    def test_report_only_actual_changes(self):
+        self.touch(self.config_file, 1000)
+        config_watcher.watch(FakeLinter(1, self.file_path, self.root))
+
+        config_watcher.check()
+        self.assertEqual(self.received, [])
+
+        self.touch(self.config_file, 2000)
+        config_watcher.check()
+        config_watcher.check()
+        self.assertEqual(len(self.received), 1)
+
+        os.remove(self.config_file)
+        config_watcher.check()
+        self.assertEqual(len(self.received), 2)
+
+    def test_unwatched_buffers_are_not_reported(self):
+        config_watcher.watch(FakeLinter(1, self.file_path, self.root))
+        config_watcher.unwatch(1)
+
+        self.touch(self.config_file, 1000)
+        config_watcher.check()
+
+        self.assertEqual(self.received, [])
+        self.assertEqual(config_watcher.mtimes, {})
+
+    def test_unwatch_keeps_the_given_linters(self):
+        config_watcher.watch(FakeLinter(1, self.file_path, self.root))
+        config_watcher.unwatch(1, keep={'fakelinter'})
+
+        self.touch(self.config_file, 1000)
+        config_watcher.check()
+
+        self.assertEqual(len(self.received), 1)
+
+    def test_a_change_forgets_only_the_caches_below_it(self):
+        when(executable_cache).forget(...).thenReturn(None)
+        other_dir = os.path.dirname(self.root)
+        python_linter.venv_cache[(self.file_path, ('pipenv', '--venv'))] = 'a'
+        python_linter.venv_cache[(other_dir, ('pipenv', '--venv'))] = 'b'
+        self.addCleanup(python_linter.venv_cache.clear)
+        config_watcher.watch(FakeLinter(1, self.file_path, self.root))
+
+        self.touch(self.config_file, 1000)
+        config_watcher.check()
+
+        verify(executable_cache).forget(...)
+        self.assertEqual(
+            python_linter.venv_cache,
+            {(other_dir, ('pipenv', '--venv')): 'b'}
+        )
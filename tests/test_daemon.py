@@ -0,0 +1,109 @@
+from collections import ChainMap
+import json
+
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import daemon, queue
+from SublimeLinter.tests.fake_proc import FakeProc
+from SublimeLinter.tests.mockito import unstub, when
+
+
+class FakeLinter:
+    filename = 'a.py'
+    daemon_codec = daemon.JsonLinesCodec()
+    daemon_idle_timeout = 300.0
+    daemon_request_timeout = 5.0
+
+    def get_working_dir(self):
+        return '/project'
+
+
+ENV = ChainMap({}, {'FOO': 'bar'}, {'PATH': '/bin'})
+
+
+def request(cmd=['my-linter', '--server'], key=('fake', '/project'), code='x = 1'):
+    return daemon.request(FakeLinter(), key, cmd, '/project', ENV, code)
+
+
+class TestDaemon(DeferrableTestCase):
+    def setUp(self):
+        when(queue).debounce(...).thenReturn(None)
+
+    def tearDown(self):
+        daemon.kill_all()
+        unstub()
+
+    def test_reuse_the_daemon_for_subsequent_lints(self):
+        proc = FakeProc({'output': 'first'}, {'output': 'second'})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+
+        self.assertEqual('first', request())
+        self.assertEqual('second', request())
+        self.assertEqual(
+            [
+                {'filename': 'a.py', 'cwd': '/project', 'code': 'x = 1'},
+                {'filename': 'a.py', 'cwd': '/project', 'code': 'x = 1'},
+            ],
+            [json.loads(line) for line in proc.stdin.getvalue().splitlines()]
+        )
+
+    def test_restart_a_crashed_daemon(self):
+        crashed, fresh = FakeProc(), FakeProc({'output': 'output'})
+        when(daemon.subprocess).Popen(...).thenReturn(crashed).thenReturn(fresh)
+
+        self.assertEqual('output', request())
+        self.assertEqual(-9, crashed.returncode)
+
+    def test_raise_if_the_daemon_keeps_crashing(self):
+        when(daemon.subprocess).Popen(...).thenReturn(FakeProc()).thenReturn(FakeProc())
+
+        with self.assertRaises(daemon.DaemonError):
+            request()
+
+    def test_one_daemon_per_key(self):
+        when(daemon.subprocess).Popen(...) \
+            .thenReturn(FakeProc({'output': 'a'})).thenReturn(FakeProc({'output': 'b'}))
+
+        request(key=('fake', '/project'))
+        request(key=('fake', '/other_project'))
+        self.assertEqual(
+            {('fake', '/project'), ('fake', '/other_project')},
+            set(daemon.daemons)
+        )
+
+    def test_replace_the_daemon_if_the_command_changes(self):
+        old, new = FakeProc({'output': 'a'}), FakeProc({'output': 'b'})
+        when(daemon.subprocess).Popen(...).thenReturn(old).thenReturn(new)
+
+        request(cmd=['my-linter', '--server'])
+        self.assertEqual('b', request(cmd=['my-linter', '--server', '--strict']))
+        self.assertEqual(-9, old.returncode)
+
+    def test_stop_idle_daemons(self):
+        proc = FakeProc({'output': 'a'})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+        request()
+
+        daemon.stop_if_idle(('fake', '/project'), idle_timeout=300.0)
+        self.assertIsNone(proc.returncode)
+
+        daemon.stop_if_idle(('fake', '/project'), idle_timeout=0)
+        self.assertEqual(-9, proc.returncode)
+        self.assertEqual({}, daemon.daemons)
+
+    def test_kill_all(self):
+        proc = FakeProc({'output': 'a'})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+        request()
+
+        daemon.kill_all()
+        self.assertEqual(-9, proc.returncode)
+        self.assertEqual({}, daemon.daemons)
+
+    def test_codecs_must_implement_the_protocol(self):
+        class HalfCodec(daemon.DaemonCodec):
+            def encode_request(self, linter, code):
+                return code.encode('utf-8')
+
+        with self.assertRaises(TypeError):
+            HalfCodec()
@@ -0,0 +1,98 @@
+import sublime
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import disk_cache, queue
+from SublimeLinter.lint.elect import LinterInfo
+from SublimeLinter.tests.mockito import unstub, when
+
+
+class FakeLinter:
+    pass
+
+
+def make_linter_info(name='fake', settings=None):
+    return LinterInfo(
+        name=name,
+        klass=FakeLinter,
+        settings=settings or {},
+        context={},
+        regions=[],
+        runnable=True
+    )
+
+
+def make_error(filename='a.py', linter='fake'):
+    return {
+        'filename': filename, 'linter': linter, 'line': 0, 'start': 0,
+        'region': sublime.Region(0, 1), 'error_type': 'error', 'code': 'E1',
+        'msg': 'foo', 'offending_text': 'a', 'uid': 'uid', 'priority': 0,
+    }
+
+
+class TestDiskCache(DeferrableTestCase):
+    def setUp(self):
+        self.view = sublime.active_window().new_file()
+        when(disk_cache.util).canonical_filename(self.view).thenReturn('a.py')
+        when(disk_cache).content_hash(self.view).thenReturn('hash')
+        when(queue).debounce(...).thenReturn(None)
+        disk_cache.store.clear()
+        disk_cache.loaded = True
+
+    def tearDown(self):
+        unstub()
+        disk_cache.store.clear()
+        disk_cache.loaded = False
+        if self.view:
+            self.view.set_scratch(True)
+            self.view.close()
+
+    def record(self, linter, errors, hash_='hash', filename='a.py'):
+        disk_cache.record(
+            filename, hash_, linter.name, disk_cache.linter_version(linter), errors)
+
+    def test_errors_survive_a_roundtrip(self):
+        error = make_error()
+        self.assertEqual(
+            error,
+            disk_cache.deserialize_error(disk_cache.serialize_error(error))
+        )
+
+    def test_restore_stored_results(self):
+        linter = make_linter_info()
+        self.record(linter, [make_error()])
+
+        actual = list(disk_cache.restore(self.view, [linter]))
+        self.assertEqual([('fake', [make_error()])], actual)
+
+    def test_ignore_results_for_other_content(self):
+        linter = make_linter_info()
+        self.record(linter, [make_error()], hash_='other_hash')
+
+        actual = list(disk_cache.restore(self.view, [linter]))
+        self.assertEqual([], actual)
+
+    def test_ignore_results_from_other_linter_versions(self):
+        self.record(make_linter_info(settings={'args': '--foo'}), [make_error()])
+
+        linter = make_linter_info(settings={'args': '--bar'})
+        actual = list(disk_cache.restore(self.view, [linter]))
+        self.assertEqual([], actual)
+
+    def test_do_not_store_errors_for_other_files(self):
+        linter = make_linter_info()
+        self.record(linter, [make_error(), make_error(filename='b.py')])
+
+        actual = list(disk_cache.restore(self.view, [linter]))
+        self.assertEqual([('fake', [make_error()])], actual)
+
+    def test_evict_least_recently_linted_files(self):
+        original = disk_cache.MAX_FILES
+        disk_cache.MAX_FILES = 2
+        try:
+            linter = make_linter_info()
+            for filename in ('a.py', 'b.py', 'c.py'):
+                self.record(linter, [], filename=filename)
+        finally:
+            disk_cache.MAX_FILES = original
+
+        self.assertEqual(['b.py', 'c.py'], list(disk_cache.store))
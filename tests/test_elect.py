@@ -0,0 +1,143 @@
+from unittesting import DeferrableTestCase
+
+import sublime
+from SublimeLinter.lint import Linter, elect, events, persist
+from SublimeLinter.lint.linter import compile_excludes
+
+
+class ElectTestCase(DeferrableTestCase):
+    @classmethod
+    def setUpClass(cls):
+        s = sublime.load_settings("Preferences.sublime-settings")
+        s.set("close_windows_when_empty", False)
+        # make sure we have a window to work with
+        sublime.run_command("new_window")
+        cls.window = window = sublime.active_window()
+        cls.addClassCleanup(lambda: window.run_command('close_window'))
+
+    def setUp(self):
+        persist.linter_classes.clear()
+
+    def tearDown(self):
+        persist.linter_classes.clear()
+
+    def create_view(self, window):
+        view = window.new_file()
+        self.addCleanup(self.close_view, view)
+        return view
+
+    def close_view(self, view):
+        elect.forget_view(view.id())
+        view.set_scratch(True)
+        view.close()
+
+
+class TestViewSnapshots(ElectTestCase):
+    def test_reuse_snapshot_per_view_and_reason(self):
+        view = self.create_view(self.window)
+
+        snapshot = elect.get_snapshot(view, 'on_save')
+        self.assertIs(snapshot, elect.get_snapshot(view, 'on_save'))
+        self.assertIsNot(snapshot, elect.get_snapshot(view, 'on_modified'))
+        self.assertEqual('on_save', snapshot.context['reason'])
+
+    def test_view_settings_change_invalidates_the_snapshot(self):
+        class FakeLinter(Linter):
+            defaults = {'selector': '', 'args': 'foo'}
+            cmd = 'fake_linter_1'
+
+        view = self.create_view(self.window)
+        snapshot = elect.get_snapshot(view, 'on_save')
+        self.assertEqual('foo', snapshot.linter_settings(FakeLinter, view).get('args'))
+
+        view.settings().set('SublimeLinter.linters.fakelinter.args', 'bar')
+        yield lambda: elect.get_snapshot(view, 'on_save') is not snapshot
+
+        snapshot = elect.get_snapshot(view, 'on_save')
+        self.assertEqual('bar', snapshot.linter_settings(FakeLinter, view).get('args'))
+
+    def test_global_settings_change_drops_all_snapshots(self):
+        view = self.create_view(self.window)
+        snapshot = elect.get_snapshot(view, 'on_save')
+
+        events.broadcast(events.SETTINGS_CHANGED, {'settings': persist.settings})
+
+        self.assertIsNot(snapshot, elect.get_snapshot(view, 'on_save'))
+
+    def test_assignable_linters_share_the_snapshot(self):
+        class FakeLinter(Linter):
+            defaults = {'selector': ''}
+            cmd = 'fake_linter_1'
+
+        view = self.create_view(self.window)
+        first = list(elect.assignable_linters_for_view(view, 'on_user_request'))
+        second = list(elect.assignable_linters_for_view(view, 'on_user_request'))
+
+        self.assertEqual(['fakelinter'], [info.name for info in first])
+        self.assertIs(first[0].settings.raw_settings, second[0].settings.raw_settings)
+
+    def test_every_election_gets_its_own_context(self):
+        class FakeLinter(Linter):
+            defaults = {'selector': ''}
+            cmd = 'fake_linter_1'
+
+        view = self.create_view(self.window)
+        first, = elect.assignable_linters_for_view(view, 'on_user_request')
+        first.settings.context['temp_file'] = '/tmp/a.py'
+        second, = elect.assignable_linters_for_view(view, 'on_user_request')
+
+        self.assertNotIn('temp_file', second.settings.context)
+
+
+class TestDispatchIndex(ElectTestCase):
+    def test_only_linters_matching_the_scope_are_candidates(self):
+        class PlainLinter(Linter):
+            defaults = {'selector': 'text.plain'}
+            cmd = 'fake_linter_1'
+
+        class FakePythonLinter(Linter):
+            defaults = {'selector': 'source.python'}
+            cmd = 'fake_linter_2'
+
+        class CellsLinter(Linter):
+            defaults = {'selector': 'source.python', 'enable_cells': True}
+            cmd = 'fake_linter_3'
+
+        view = self.create_view(self.window)
+        view.assign_syntax('Packages/Text/Plain text.tmLanguage')
+        snapshot = elect.get_snapshot(view, 'on_save')
+
+        self.assertEqual(
+            ['plainlinter', 'cellslinter'],
+            [name for name, _ in elect.candidate_linters(view, snapshot)]
+        )
+
+    def test_view_settings_can_add_candidates(self):
+        class FakePythonLinter(Linter):
+            defaults = {'selector': 'source.python'}
+            cmd = 'fake_linter_2'
+
+        view = self.create_view(self.window)
+        view.assign_syntax('Packages/Text/Plain text.tmLanguage')
+        view.settings().set('SublimeLinter.linters.fakepythonlinter.selector', 'text.plain')
+        snapshot = elect.get_snapshot(view, 'on_save')
+
+        self.assertEqual(
+            ['fakepythonlinter'],
+            [name for name, _ in elect.candidate_linters(view, snapshot)]
+        )
+
+
+class TestCompileExcludes(DeferrableTestCase):
+    def test_report_the_first_excluding_pattern(self):
+        excluded_by = compile_excludes(('*.min.js', '*/vendor/*'))
+
+        self.assertEqual('*.min.js', excluded_by('/a/b.min.js'))
+        self.assertEqual('*/vendor/*', excluded_by('/a/vendor/b.js'))
+        self.assertIsNone(excluded_by('/a/b.js'))
+
+    def test_negated_patterns_exclude_everything_else(self):
+        excluded_by = compile_excludes(('!*.py',))
+
+        self.assertEqual('!*.py', excluded_by('/a/b.js'))
+        self.assertIsNone(excluded_by('/a/b.py'))
@@ -0,0 +1,85 @@
+import random
+
+import sublime
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import error_index, persist
+
+
+def make_errors(n, size=1000, seed=42):
+    rnd = random.Random(seed)
+    errors = []
+    for _ in range(n):
+        a = rnd.randrange(size)
+        b = a + rnd.choice([0, 0, 1, 3, 10, 200])
+        if rnd.random() < 0.2:
+            a, b = b, a  # Regions can be reversed
+        errors.append({'region': sublime.Region(a, b), 'msg': str(len(errors))})
+    return errors
+
+
+class TestErrorIndex(DeferrableTestCase):
+    def setUp(self):
+        self.errors = make_errors(500)
+        self.index = error_index.ErrorIndex(self.errors)
+
+    def test_containing(self):
+        for point in range(0, 1300, 7):
+            self.assertEqual(
+                [e for e in self.errors if e['region'].contains(point)],
+                self.index.containing(point)
+            )
+
+    def test_intersecting(self):
+        for a in range(0, 1300, 13):
+            for length in (0, 1, 25):
+                region = sublime.Region(a, a + length)
+                self.assertEqual(
+                    [e for e in self.errors if e['region'].intersects(region)],
+                    self.index.intersecting(region)
+                )
+
+    def test_within(self):
+        for a in range(0, 1300, 13):
+            region = sublime.Region(a, a + 80)
+            self.assertEqual(
+                [e for e in self.errors if region.contains(e['region'])],
+                self.index.within(region)
+            )
+
+    def test_regions_spanning_the_whole_file(self):
+        errors = [{'region': sublime.Region(0, 1000), 'msg': 'file'}] + self.errors
+        index = error_index.ErrorIndex(errors)
+        for point in range(0, 1300, 7):
+            self.assertEqual(
+                [e for e in errors if e['region'].contains(point)],
+                index.containing(point)
+            )
+
+    def test_positions(self):
+        self.assertEqual(
+            sorted({e['region'].begin() for e in self.errors}),
+            self.index.positions
+        )
+
+
+class TestIndexPerFile(DeferrableTestCase):
+    def tearDown(self):
+        persist.file_errors.pop('a.py', None)
+        error_index.forget('a.py')
+
+    def test_reuse_index_while_errors_do_not_change(self):
+        persist.file_errors['a.py'] = make_errors(3)
+        self.assertIs(error_index.for_file('a.py'), error_index.for_file('a.py'))
+
+    def test_rebuild_index_if_errors_change(self):
+        persist.file_errors['a.py'] = make_errors(3)
+        index = error_index.for_file('a.py')
+        persist.file_errors['a.py'] = make_errors(3)
+
+        self.assertIsNot(index, error_index.for_file('a.py'))
+        self.assertIs(persist.file_errors['a.py'], error_index.for_file('a.py').errors)
+
+    def test_unknown_files_have_no_errors(self):
+        self.assertEqual(0, len(error_index.for_file('a.py')))
+        self.assertNotIn('a.py', persist.file_errors)
@@ -0,0 +1,75 @@
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint.error_record import ErrorRecord, compact
+
+
+def make_error(**kwargs):
+    rv = {
+        'filename': 'a.py', 'linter': 'flake8', 'line': 0, 'start': 1,
+        'error_type': 'error', 'code': 'E303', 'msg': 'too many blank lines',
+        'offending_text': 'a',
+    }
+    rv.update(kwargs)
+    return rv
+
+
+class TestErrorRecord(DeferrableTestCase):
+    def test_behaves_like_the_dict(self):
+        error = make_error()
+        record = ErrorRecord(error)
+
+        self.assertEqual(record, error)
+        self.assertEqual(error, record)
+        self.assertEqual(dict(record), error)
+        self.assertEqual(len(record), len(error))
+        self.assertEqual(record['msg'], 'too many blank lines')
+        self.assertEqual(
+            "{linter}: {code} {msg}".format(**record),
+            "flake8: E303 too many blank lines"
+        )
+
+    def test_missing_keys(self):
+        record = ErrorRecord(make_error())
+
+        self.assertNotIn('panel_line', record)
+        self.assertIsNone(record.get('panel_line'))
+        self.assertEqual(record.get('foo', 'default'), 'default')
+        with self.assertRaises(KeyError):
+            record['panel_line']
+        with self.assertRaises(KeyError):
+            record['foo']
+
+    def test_set_and_delete_known_and_unknown_keys(self):
+        record = ErrorRecord(make_error())
+
+        record['panel_line'] = (1, 2)
+        record['revalidate'] = True
+        self.assertEqual(record['panel_line'], (1, 2))
+        self.assertTrue(record['revalidate'])
+        self.assertIn('revalidate', list(record))
+
+        self.assertEqual(record.pop('panel_line'), (1, 2))
+        del record['revalidate']
+        self.assertEqual(record, make_error())
+
+    def test_copy_is_independent(self):
+        record = ErrorRecord(make_error(foo='bar'))
+        clone = record.copy()
+        clone['msg'] = 'other'
+        clone['foo'] = 'baz'
+
+        self.assertIsInstance(clone, ErrorRecord)
+        self.assertEqual(record['msg'], 'too many blank lines')
+        self.assertEqual(record['foo'], 'bar')
+
+    def test_repeating_strings_are_shared(self):
+        a = ErrorRecord(make_error(code=''.join(['E', '303'])))
+        b = ErrorRecord(make_error(code=''.join(['E3', '03'])))
+
+        self.assertIs(a['code'], b['code'])
+
+    def test_compact_keeps_records(self):
+        record = ErrorRecord(make_error())
+
+        self.assertIs(compact(record), record)
+        self.assertIsInstance(compact(make_error()), ErrorRecord)
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import executable_cache
+
+
+class FakeLinter:
+    name = 'fake'
+    executable_markers = ('node_modules/.bin',)
+
+    def __init__(self, file_path):
+        self.context = {'file_path': file_path}
+        self.env = {}
+        self.calls = 0
+
+    def get_working_dir(self):
+        return None
+
+    def context_sensitive_executable_path(self, cmd):
+        self.calls += 1
+        self.context['project_root'] = os.path.dirname(self.context['file_path'])
+        self.env['FOO'] = 'bar'
+        return True, ['/usr/bin/node', cmd[0]]
+
+
+class TestExecutableCache(DeferrableTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.root, 'src')
+        os.mkdir(self.file_path)
+
+    def tearDown(self):
+        executable_cache.clear()
+        shutil.rmtree(self.root)
+
+    def resolve(self, linter, fingerprint='{}'):
+        return executable_cache.resolve(linter, ['eslint'], fingerprint)
+
+    def test_resolve_once_and_replay_side_effects(self):
+        first, second = FakeLinter(self.file_path), FakeLinter(self.file_path)
+
+        self.assertEqual((True, ['/usr/bin/node', 'eslint']), self.resolve(first))
+        self.assertEqual((True, ['/usr/bin/node', 'eslint']), self.resolve(second))
+
+        self.assertEqual(0, second.calls)
+        self.assertEqual(self.root, second.context['project_root'])
+        self.assertEqual({'FOO': 'bar'}, second.env)
+
+    def test_settings_are_part_of_the_key(self):
+        self.resolve(FakeLinter(self.file_path))
+        linter = FakeLinter(self.file_path)
+        self.resolve(linter, fingerprint='{"executable": "foo"}')
+
+        self.assertEqual(1, linter.calls)
+
+    def test_invalidate_if_a_marker_appears(self):
+        self.resolve(FakeLinter(self.file_path))
+        os.makedirs(os.path.join(self.file_path, 'node_modules', '.bin'))
+        # Some file systems have a coarse mtime resolution
+        os.utime(self.file_path, (0, 0))
+
+        linter = FakeLinter(self.file_path)
+        self.resolve(linter)
+
+        self.assertEqual(1, linter.calls)
@@ -155,3 +155,39 @@ class TestPostFilterResults(_BaseTestCase):
         when(linter.logger).error(message)
         execute_lint_task(linter, INPUT)
         verify(linter.logger, times=1).error(message)
+
+
+class TestCompileErrorFilter(DeferrableTestCase):
+    def test_report_the_pattern_which_matched(self):
+        error_filter = linter_module.compile_error_filter(('mess', 'W3:', r'(m)\1'))
+
+        self.assertEqual('W3:', error_filter.match('warning: W3: The note'))
+        self.assertEqual('mess', error_filter.match('error: : The message'))
+        self.assertEqual(r'(m)\1', error_filter.match('error: : hmm'))
+        self.assertIsNone(error_filter.match('error: : The swan'))
+
+    def test_combine_patterns_without_groups(self):
+        error_filter = linter_module.compile_error_filter(('mess', 'W3:', r'(m)\1'))
+
+        self.assertEqual(['mess', 'W3:'], error_filter.combined_patterns)
+        self.assertEqual([r'(m)\1'], [pattern for pattern, _ in error_filter.separate])
+
+    def test_cache_by_patterns(self):
+        self.assertIs(
+            linter_module.compile_error_filter(('mess',)),
+            linter_module.compile_error_filter(('mess',))
+        )
+
+    def test_patterns_with_inline_flags_run_alone(self):
+        error_filter = linter_module.compile_error_filter(('W: 1: a b', '(?x)c d', 'e(?s)f'))
+
+        self.assertEqual(['W: 1: a b'], error_filter.combined_patterns)
+        self.assertEqual('W: 1: a b', error_filter.match('W: 1: a b'))
+        self.assertEqual('(?x)c d', error_filter.match('error: : cd'))
+        self.assertIsNone(error_filter.match('error: : c d'))
+
+    def test_combine_patterns_starting_with_a_group(self):
+        error_filter = linter_module.compile_error_filter(('(?:W|E)1', '(?=W2)W', '(?i)c'))
+
+        self.assertEqual(['(?:W|E)1', '(?=W2)W'], error_filter.combined_patterns)
+        self.assertEqual(['(?i)c'], [pattern for pattern, _ in error_filter.separate])
@@ -0,0 +1,373 @@
+from unittesting import DeferrableTestCase
+from SublimeLinter.tests.parameterized import parameterized as p
+
+import sublime
+from SublimeLinter import highlight_view
+from SublimeLinter.highlight_view import Squiggle, TextEdit
+from SublimeLinter.lint import persist, util
+from SublimeLinter.tests.mockito import unstub, when
+
+
+def error_at(a, b, line):
+    return {'region': sublime.Region(a, b), 'line': line, 'start': 0}
+
+
+# The buffer used in the following tests, t.i. three lines of 10 chars:
+#   0123456789
+#   0123456789
+#   0123456789
+
+
+class TestShiftByEdits(DeferrableTestCase):
+    @p.expand([
+        ("edit after the error", (0, 2, 0), TextEdit(25, 25, 2, 2, 'x'), (0, 2, 0)),
+        ("insert on a previous line", (22, 24, 2), TextEdit(3, 3, 0, 0, 'xx'), (24, 26, 2)),
+        ("insert a new line", (22, 24, 2), TextEdit(3, 3, 0, 0, 'x\n'), (24, 26, 3)),
+        ("delete a line", (22, 24, 2), TextEdit(0, 11, 0, 1, ''), (11, 13, 1)),
+    ])
+    def test_shift(self, _, error, edit, expected):
+        region, line = highlight_view.shift_by_edits(error_at(*error), [edit])
+        self.assertEqual(expected, (region.a, region.b, line))
+
+    @p.expand([
+        ("insert at the start", TextEdit(22, 22, 2, 2, 'x')),
+        ("insert at the end", TextEdit(24, 24, 2, 2, 'x')),
+        ("insert before, same line", TextEdit(21, 21, 2, 2, 'x')),
+        ("delete the error", TextEdit(20, 30, 2, 2, '')),
+        ("delete into the error", TextEdit(15, 23, 1, 2, '')),
+    ])
+    def test_need_lookup_if_the_edit_touches_the_error(self, _, edit):
+        error = error_at(22, 24, 2)
+        self.assertIsNone(highlight_view.shift_by_edits(error, [edit]))
+
+    def test_apply_multiple_edits_in_order(self):
+        error = error_at(22, 24, 2)
+        edits = [
+            TextEdit(0, 0, 0, 0, 'abc\n'),
+            TextEdit(4, 14, 1, 1, ''),
+        ]
+        region, line = highlight_view.shift_by_edits(error, edits)
+        self.assertEqual((16, 18, 3), (region.a, region.b, line))
+
+
+class TestRecordedEdits(DeferrableTestCase):
+    def setUp(self):
+        highlight_view.TEXT_CHANGES.clear()
+
+    def tearDown(self):
+        highlight_view.TEXT_CHANGES.clear()
+
+    def record(self, bid, previous, change_count, edits):
+        highlight_view.TEXT_CHANGES[bid].append((previous, change_count, edits))
+
+    def test_collect_edits_between_change_counts(self):
+        first, second = TextEdit(0, 0, 0, 0, 'a'), TextEdit(1, 1, 0, 0, 'b')
+        self.record(1, 1, 2, [first])
+        self.record(1, 2, 3, [second])
+
+        self.assertEqual([first, second], highlight_view.recorded_edits_since(1, 1, 3))
+        self.assertEqual([second], highlight_view.recorded_edits_since(1, 2, 3))
+        self.assertEqual([], highlight_view.recorded_edits_since(1, 3, 3))
+
+    def test_unknown_if_the_chain_is_broken(self):
+        self.record(1, 1, 2, [TextEdit(0, 0, 0, 0, 'a')])
+        self.record(1, None, 4, [TextEdit(1, 1, 0, 0, 'b')])
+
+        self.assertIsNone(highlight_view.recorded_edits_since(1, 1, 4))
+
+    def test_unknown_if_changes_are_missing(self):
+        self.record(1, 1, 2, [TextEdit(0, 0, 0, 0, 'a')])
+
+        self.assertIsNone(highlight_view.recorded_edits_since(1, 1, 3))
+        self.assertIsNone(highlight_view.recorded_edits_since(1, None, 2))
+
+
+class FakeView:
+    def __init__(self):
+        self.regions = {}
+        self.add_regions_calls = 0
+        self.visible = sublime.Region(0, 100)
+        self.changes = 1
+
+    def id(self):
+        return -1
+
+    def buffer_id(self):
+        return -1
+
+    def file_name(self):
+        return None
+
+    def change_count(self):
+        return self.changes
+
+    def size(self):
+        return 100000
+
+    def visible_region(self):
+        return self.visible
+
+    def style_for_scope(self, scope):
+        return {'foreground': '#f00'}
+
+    def add_regions(self, key, regions, scope='', icon='', flags=0, **kwargs):
+        self.add_regions_calls += 1
+        self.regions[key] = sorted(regions, key=lambda r: (r.begin(), r.end()))
+
+    def get_regions(self, key):
+        return self.regions.get(key, [])
+
+    def erase_regions(self, key):
+        self.regions.pop(key, None)
+
+
+def squiggle(uid, scope='region.redish', linter_name='flake8'):
+    return Squiggle(linter_name, uid, scope, 0)
+
+
+class TestBatchedSquiggles(DeferrableTestCase):
+    def setUp(self):
+        when(util).it_runs_on_ui().thenReturn(True)
+        self.view = FakeView()
+
+    def tearDown(self):
+        unstub()
+        highlight_view.CURRENTSTORE.pop(-1, None)
+        highlight_view.EVERSTORE.pop(-1, None)
+        highlight_view.DRAWN.pop(-1, None)
+
+    def test_group_squiggles_of_the_same_style(self):
+        batches = highlight_view.batch_squiggles({
+            squiggle('b'): [sublime.Region(20, 22)],
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('c', scope='region.yellowish'): [sublime.Region(0, 2)],
+        })
+
+        self.assertEqual(
+            [
+                (('a', 'b'), [sublime.Region(10, 12), sublime.Region(20, 22)]),
+                (('c',), [sublime.Region(0, 2)]),
+            ],
+            sorted((key.uids, regions) for key, regions in batches.items())
+        )
+
+    def test_draw_a_batch_at_once(self):
+        batches = highlight_view.batch_squiggles({
+            squiggle(str(n)): [sublime.Region(n, n + 1)]
+            for n in range(100)
+        })
+        highlight_view.draw(self.view, 'flake8', batches, {})
+
+        # One call for the batch, the (empty) gutter is left alone
+        self.assertEqual(1, self.view.add_regions_calls)
+
+    def test_remove_single_errors_from_a_batch(self):
+        batches = highlight_view.batch_squiggles({
+            squiggle(uid): [sublime.Region(n, n + 1)]
+            for n, uid in enumerate('abc')
+        })
+        highlight_view.draw(self.view, 'flake8', batches, {})
+        key, = batches
+
+        highlight_view._erase_squiggles(self.view, [(key, 'b')])
+
+        key, = highlight_view.get_regions_keys(self.view)
+        self.assertEqual(
+            [('a', sublime.Region(0, 1)), ('c', sublime.Region(2, 3))],
+            highlight_view.batched_regions(self.view, key)
+        )
+
+    def test_stored_regions_if_a_batch_does_not_match(self):
+        persist.file_errors['<untitled -1>'] = [
+            {'uid': 'a', 'region': sublime.Region(0, 1)},
+            {'uid': 'b', 'region': sublime.Region(5, 6)},
+        ]
+        self.addCleanup(persist.file_errors.pop, '<untitled -1>', None)
+        key = squiggle('batch')._replace(uids=('a', 'b', 'gone'))
+        self.view.regions[key] = [sublime.Region(0, 1)]
+
+        self.assertEqual(
+            [('a', sublime.Region(0, 1)), ('b', sublime.Region(5, 6))],
+            highlight_view.batched_regions(self.view, key)
+        )
+
+    def test_keep_the_rest_of_a_batch_that_does_not_match(self):
+        persist.file_errors['<untitled -1>'] = [
+            {'uid': 'a', 'region': sublime.Region(0, 1)},
+            {'uid': 'b', 'region': sublime.Region(5, 6)},
+        ]
+        self.addCleanup(persist.file_errors.pop, '<untitled -1>', None)
+        key = squiggle('batch')._replace(uids=('a', 'b'))
+        self.view.regions[key] = [sublime.Region(0, 1)]
+
+        highlight_view._erase_squiggles(self.view, [(key, 'a')])
+
+        key, = highlight_view.get_regions_keys(self.view)
+        self.assertEqual(('b',), key.uids)
+        self.assertEqual([sublime.Region(5, 6)], self.view.get_regions(key))
+
+
+def fake_prepare_highlights_data(errors, demote_predicate, demote_scope, quiet, idle):
+    return {
+        Squiggle(error['linter'], error['uid'], 'region.redish', 0, annotation='!'): [error['region']]
+        for error in errors
+    }
+
+
+class TestLazyRendering(DeferrableTestCase):
+    def setUp(self):
+        when(util).it_runs_on_ui().thenReturn(True)
+        settings = {
+            'highlights.lazy_render_above': 0,
+            'highlights.batch_squiggles_above': 1000,
+            'highlights.demote_while_editing': 'none',
+        }
+        when(persist.settings).get(...).thenAnswer(
+            lambda key, default=None: settings.get(key, default))
+        when(highlight_view).prepare_highlights_data(...).thenAnswer(fake_prepare_highlights_data)
+        when(highlight_view).update_error_priorities_inline(...)
+        when(highlight_view).prepare_gutter_data(...).thenReturn({})
+        when(highlight_view).draw_phantoms(...)
+        when(highlight_view).start_lazy_render_poller()
+        self.view = FakeView()
+        persist.file_errors['lazy.py'] = [
+            {
+                'linter': 'flake8', 'uid': str(n), 'region': sublime.Region(n * 500, n * 500 + 1),
+                'line': n, 'start': 0, 'priority': 0, 'error_type': 'error',
+            }
+            for n in range(100)
+        ]
+
+    def tearDown(self):
+        unstub()
+        persist.file_errors.pop('lazy.py', None)
+        highlight_view.LAZY_VIEWS.pop(-1, None)
+        highlight_view.CURRENTSTORE.pop(-1, None)
+        highlight_view.EVERSTORE.pop(-1, None)
+        highlight_view.DRAWN.pop(-1, None)
+        highlight_view.State['views'].discard(-1)
+
+    def rendered_fully(self):
+        return sorted(
+            int(key.uid)
+            for key in highlight_view.get_regions_keys(self.view)
+            if isinstance(key, Squiggle) and not key.uids
+        )
+
+    def marked(self):
+        return sorted(
+            int(uid)
+            for key in highlight_view.get_regions_keys(self.view)
+            if isinstance(key, Squiggle) and key.uid.startswith(highlight_view.MARKS)
+            for uid in key.uids
+        )
+
+    def test_render_only_around_the_viewport(self):
+        highlight_view.highlight_linter_errors([self.view], 'lazy.py', 'flake8')
+
+        # The visible region plus a margin of (at least) 1000 characters
+        self.assertEqual([0, 1, 2], self.rendered_fully())
+        self.assertEqual(list(range(3, 100)), self.marked())
+
+    def test_fill_in_while_scrolling(self):
+        highlight_view.highlight_linter_errors([self.view], 'lazy.py', 'flake8')
+        self.view.visible = sublime.Region(10000, 10100)
+        highlight_view.fill_in_viewport(self.view)
+
+        self.assertEqual([0, 1, 2, 18, 19, 20, 21, 22], self.rendered_fully())
+        self.assertEqual(
+            [n for n in range(3, 100) if n not in {18, 19, 20, 21, 22}],
+            self.marked()
+        )
+
+    def test_fill_in_touches_only_the_marks_nearby(self):
+        original = highlight_view.MARKS_LINES_PER_BATCH
+        highlight_view.MARKS_LINES_PER_BATCH = 10
+        self.addCleanup(setattr, highlight_view, 'MARKS_LINES_PER_BATCH', original)
+        highlight_view.highlight_linter_errors([self.view], 'lazy.py', 'flake8')
+
+        self.view.add_regions_calls = 0
+        self.view.visible = sublime.Region(10000, 10100)
+        highlight_view.fill_in_viewport(self.view)
+
+        # Five errors rendered fully, and the marks of lines 10-19 and 20-29
+        self.assertEqual(5 + 2, self.view.add_regions_calls)
+        self.assertEqual(
+            [n for n in range(3, 100) if n not in {18, 19, 20, 21, 22}],
+            self.marked()
+        )
+
+    def test_marks_use_cheap_underlines(self):
+        self.assertEqual(
+            sublime.DRAW_SOLID_UNDERLINE | sublime.DRAW_NO_FILL,
+            highlight_view.mark_flags(sublime.DRAW_SQUIGGLY_UNDERLINE | sublime.DRAW_NO_FILL)
+        )
+        self.assertEqual(sublime.HIDDEN, highlight_view.mark_flags(sublime.HIDDEN))
+
+
+class TestDiffRedraw(DeferrableTestCase):
+    def setUp(self):
+        when(util).it_runs_on_ui().thenReturn(True)
+        self.view = FakeView()
+
+    def tearDown(self):
+        unstub()
+        highlight_view.CURRENTSTORE.pop(-1, None)
+        highlight_view.EVERSTORE.pop(-1, None)
+        highlight_view.DRAWN.pop(-1, None)
+        highlight_view.TEXT_CHANGES.pop(-1, None)
+
+    def draw(self, squiggles, gutter_regions={}):
+        self.view.add_regions_calls = 0
+        highlight_view.draw(self.view, 'flake8', squiggles, gutter_regions)
+        return self.view.add_regions_calls
+
+    def test_skip_unchanged_regions(self):
+        squiggles = {
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('b'): [sublime.Region(20, 22)],
+        }
+        self.draw(squiggles)
+
+        self.assertEqual(0, self.draw(dict(squiggles)))
+
+    def test_draw_only_what_changed(self):
+        self.draw({
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('b'): [sublime.Region(20, 22)],
+        })
+
+        calls = self.draw({
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('c'): [sublime.Region(30, 32)],
+        })
+
+        self.assertEqual(1, calls)
+        self.assertEqual(
+            {squiggle('a'), squiggle('c')}, highlight_view.get_regions_keys(self.view))
+        self.assertNotIn(squiggle('b'), self.view.regions)
+
+    def test_follow_recorded_edits(self):
+        self.draw({
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('b'): [sublime.Region(20, 22)],
+            squiggle('c'): [sublime.Region(30, 32)],
+        })
+        highlight_view.TEXT_CHANGES[-1].append((1, 2, [TextEdit(21, 21, 2, 2, 'xx')]))
+        self.view.changes = 2
+
+        # 'a' is untouched, 'c' has been moved by Sublime, but 'b' has been
+        # edited and Sublime might have grown its region.
+        calls = self.draw({
+            squiggle('a'): [sublime.Region(10, 12)],
+            squiggle('b'): [sublime.Region(20, 24)],
+            squiggle('c'): [sublime.Region(32, 34)],
+        })
+        self.assertEqual(1, calls)
+
+    def test_redraw_if_the_edits_are_unknown(self):
+        squiggles = {squiggle('a'): [sublime.Region(10, 12)]}
+        self.draw(squiggles)
+        self.view.changes = 2
+
+        self.assertEqual(1, self.draw(squiggles))
@@ -16,6 +16,7 @@ from SublimeLinter import lint
 from SublimeLinter.lint import (
     elect,
     backend,
+    executable_cache,
     linter as linter_module,
     util
 )
@@ -53,6 +54,7 @@ class TestNodeLinters(DeferrableTestCase):
 
     def tearDown(self):
         unstub()
+        executable_cache.clear()
 
     def create_view(self, window):
         view = window.new_file()
@@ -141,3 +141,125 @@ class TestResultRegexes(DeferrableTestCase):
         # The interface updates async.
         match = yield lambda: panel.find('a.py:\n  No lint results', 0, sublime.LITERAL)
         self.assertTrue(match)
+
+    def test_only_changed_files_are_rerendered(self):
+        window = self.window
+        errors = {'/a.py': [std_error()], '/b.py': [std_error()]}
+        when(panel_view).get_window_errors(...).thenReturn(errors)
+
+        panel_view.fill_panel(window)
+        panel = panel_view.get_panel(window)
+        yield lambda: panel.find(CODE, 0, sublime.LITERAL)
+        sections = panel_view.PANEL_MODELS[panel.id()]
+
+        errors['/b.py'] = [std_error(msg='Another error.')]
+        panel_view.fill_panel(window)
+        yield lambda: panel.find('Another error.', 0, sublime.LITERAL)
+
+        next_sections = panel_view.PANEL_MODELS[panel.id()]
+        self.assertIs(sections[0], next_sections[0])
+        self.assertIsNot(sections[1], next_sections[1])
+        self.assertEqual(
+            panel.substr(sublime.Region(0, panel.size())),
+            '\n'.join(line for s in next_sections for line in s.lines)
+        )
+        self.assertEqual((4, 4), errors['/b.py'][0]['panel_line'])
+
+
+def section(filename, *lines):
+    return panel_view.PanelSection(filename, lines, [filename + ':', *lines, ''], [])
+
+
+class TestComputeSplice(DeferrableTestCase):
+    def test_unchanged_sections_need_no_splice(self):
+        a, b = section('/a.py', 'e1'), section('/b.py', 'e2')
+        self.assertIsNone(panel_view.compute_splice([a, b], [a, b]))
+
+    def test_replace_section_in_the_middle(self):
+        a, b, c = section('/a.py', 'e1'), section('/b.py', 'e2'), section('/c.py', 'e3')
+        b_ = section('/b.py', 'e2', 'e4')
+        splice = panel_view.compute_splice([a, b, c], [a, b_, c])
+        self.assertEqual((3, 6, b_.lines, 9), splice[:4])
+
+    def test_append_section(self):
+        a, b = section('/a.py', 'e1'), section('/b.py', 'e2')
+        splice = panel_view.compute_splice([a], [a, b])
+        self.assertEqual((3, 3, b.lines, 3), splice[:4])
+
+
+class TestPanelSection(DeferrableTestCase):
+    def test_sections_do_not_share_their_actions(self):
+        a, b = section('/a.py', 'e1'), section('/b.py', 'e2')
+        a.actions[0] = 'toggle'
+        self.assertEqual({}, b.actions)
+
+
+class TestVirtualPanel(DeferrableTestCase):
+    def setUp(self):
+        self.state = {'expanded': set(), 'pages': {}, 'anchors': {}}
+        self.errors = [std_error(line=n) for n in range(1000)]
+
+    def test_other_files_start_collapsed(self):
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, None, collapsible=True)
+        self.assertIsNone(page)
+
+        self.state['expanded'].add('/a.py')
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, None, collapsible=True)
+        self.assertEqual((0, panel_view.PAGE_SIZE), page)
+
+    def test_page_follows_the_cursor(self):
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, 10, collapsible=False)
+        self.assertEqual((0, 200), page)
+
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, 500, collapsible=False)
+        self.assertEqual((400, 600), page)
+
+        # Moving within the page keeps it
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, 550, collapsible=False)
+        self.assertEqual((400, 600), page)
+
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, 990, collapsible=False)
+        self.assertEqual((800, 1000), page)
+
+    def test_manual_page_sticks_until_the_cursor_moves(self):
+        panel_view.compute_page(
+            self.state, '/a.py', self.errors, 10, collapsible=False)
+        self.state['pages']['/a.py'] = 200
+
+        page = panel_view.compute_page(
+            self.state, '/a.py', self.errors, 10, collapsible=False)
+        self.assertEqual((200, 400), page)
+
+    def test_render_page_with_more_lines(self):
+        section = panel_view.render_section(
+            'a.py', '/a.py', self.errors, WIDTHS, None, (200, 400), True)
+
+        self.assertEqual('  + 200 more above.', section.lines[1])
+        self.assertEqual('  + 600 more below.', section.lines[-2])
+        self.assertEqual(200, section.first_error)
+        self.assertEqual(200, len(section.panel_lines))
+        self.assertEqual(
+            {0: 'toggle', 1: 'previous', len(section.lines) - 2: 'next'},
+            section.actions
+        )
+
+    def test_render_collapsed_file(self):
+        section = panel_view.render_section(
+            'a.py', '/a.py', self.errors, WIDTHS, None, None, True)
+
+        self.assertEqual(
+            ['a.py:', '  + 1000 problems (error: 1000), collapsed.', ''],
+            section.lines
+        )
+        self.assertEqual([], section.panel_lines)
+
+
+WIDTHS = (
+    ('line', 4), ('col', 1), ('error_type', 5), ('linter_name', 7), ('viewport', 80)
+)
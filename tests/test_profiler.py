@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import profiler
+
+
+class TestProfiler(DeferrableTestCase):
+    def setUp(self):
+        profiler.reset()
+
+    def tearDown(self):
+        profiler.reset()
+
+    def test_measure_records_even_on_failure(self):
+        with self.assertRaises(ValueError):
+            with profiler.measure('parse', 'flake8'):
+                raise ValueError
+
+        self.assertEqual(1, profiler.stats()['flake8']['parse']['count'])
+
+    def test_percentiles_per_linter_and_stage(self):
+        for i in range(1, 101):
+            profiler.record('run', 'flake8', i / 1000)
+        profiler.record('run', 'mypy', 2.0)
+
+        stats = profiler.stats()
+        self.assertEqual(
+            {'count': 100, 'p50': 0.051, 'p90': 0.091, 'p99': 0.1, 'max': 0.1},
+            stats['flake8']['run']
+        )
+        self.assertEqual(2.0, stats['mypy']['run']['max'])
+
+    def test_table_lists_stages_in_pipeline_order(self):
+        profiler.record('redraw', 'flake8', 0.001)
+        profiler.record('spawn', 'flake8', 0.002)
+        profiler.record('parse', 'flake8', 0.003)
+
+        table = profiler.format_table()
+        stages = [line.split()[0] for line in table.splitlines()[3:]]
+        self.assertEqual(['spawn', 'parse', 'redraw'], stages)
+
+    def test_export_jsonl(self):
+        profiler.record('spawn', 'flake8', 0.002)
+        profiler.record('run', 'flake8', 0.2)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'timings.jsonl')
+            self.assertEqual(2, profiler.export_jsonl(path))
+            with open(path, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(
+            [('flake8', 'spawn', 0.002), ('flake8', 'run', 0.2)],
+            [(r['linter'], r['stage'], r['duration']) for r in records]
+        )
@@ -13,7 +13,7 @@ from SublimeLinter.tests.mockito import (
 
 import sublime
 from SublimeLinter import lint
-from SublimeLinter.lint import elect, backend, linter as linter_module, util
+from SublimeLinter.lint import elect, backend, executable_cache, linter as linter_module, util
 
 
 def make_fake_linter(view):
@@ -46,6 +46,7 @@ class TestPythonLinters(DeferrableTestCase):
 
     def tearDown(self):
         unstub()
+        executable_cache.clear()
 
     def create_view(self, window):
         view = window.new_file()
@@ -0,0 +1,159 @@
+import io
+
+import sublime
+from unittesting import DeferrableTestCase
+
+from SublimeLinter import sublime_linter
+from SublimeLinter.lint import Linter, linter as linter_module, persist
+from SublimeLinter.tests.mockito import unstub, when
+
+
+class FakeLinter(Linter):
+    defaults = {'selector': 'NONE'}
+    cmd = 'fake_linter_1'
+    regex = r'^stdin:(?P<line>\d+):(?P<col>\d+) (?P<error>ERROR): (?P<message>.*)$'
+
+
+class FakeProc:
+    def __init__(self, *lines):
+        self.stdin = io.BytesIO()
+        self.stdout = io.BytesIO(b''.join(lines))
+        self.stderr = io.BytesIO(b'')
+        self.returncode = 0
+
+    def wait(self):
+        return self.returncode
+
+
+OUTPUT = (
+    b'stdin:1:1 ERROR: first\n',
+    b'some noise\n',
+    b'stdin:2:1 ERROR: second\n',
+)
+
+
+class TestStreamOutput(DeferrableTestCase):
+    def setUp(self):
+        self.view = sublime.active_window().new_file()
+        self.view.run_command('append', {'characters': 'foo\nbar\n'})
+        self.partial_results = []
+        self.linter = FakeLinter(self.view, {})
+        self.linter.on_partial_result = self.partial_results.append
+
+    def tearDown(self):
+        unstub()
+        if self.view:
+            self.view.set_scratch(True)
+            self.view.close()
+
+    def stream(self, proc):
+        vv = linter_module.VirtualView('foo\nbar\n')
+        return self.linter._stream_output(proc, b'foo\nbar\n', vv)
+
+    def test_publish_errors_found_so_far(self):
+        original = linter_module.PARTIAL_RESULT_INTERVAL
+        linter_module.PARTIAL_RESULT_INTERVAL = 0
+        self.addCleanup(setattr, linter_module, 'PARTIAL_RESULT_INTERVAL', original)
+
+        proc = FakeProc(*OUTPUT)
+        out, err = self.stream(proc)
+
+        self.assertEqual(
+            [['first'], ['first', 'second']],
+            [[error['msg'] for error in errors] for errors in self.partial_results]
+        )
+        self.assertEqual((b''.join(OUTPUT), b''), (out, err))
+
+    def test_partial_results_are_filtered(self):
+        original = linter_module.PARTIAL_RESULT_INTERVAL
+        linter_module.PARTIAL_RESULT_INTERVAL = 0
+        self.addCleanup(setattr, linter_module, 'PARTIAL_RESULT_INTERVAL', original)
+        self.linter = FakeLinter(self.view, {'filter_errors': ['first']})
+        self.linter.on_partial_result = self.partial_results.append
+
+        self.stream(FakeProc(*OUTPUT))
+
+        self.assertEqual(
+            [['second']],
+            [[error['msg'] for error in errors] for errors in self.partial_results]
+        )
+
+    def test_fast_linters_do_not_publish_partially(self):
+        self.stream(FakeProc(*OUTPUT))
+
+        self.assertEqual([], self.partial_results)
+
+    def test_can_only_stream_line_based_output(self):
+        class JsonLinter(FakeLinter):
+            def find_errors(self, output):
+                return []
+
+        class MultilineLinter(FakeLinter):
+            multiline = True
+
+        self.assertTrue(FakeLinter(self.view, {}).can_stream())
+        self.assertFalse(JsonLinter(self.view, {}).can_stream())
+        self.assertFalse(MultilineLinter(self.view, {}).can_stream())
+
+
+class FakeWindow:
+    def find_open_file(self, filename):
+        return None
+
+
+def make_error(filename, msg='foo', linter='fake'):
+    return {'filename': filename, 'linter': linter, 'msg': msg}
+
+
+class TestPartialResults(DeferrableTestCase):
+    def setUp(self):
+        for filename in ('a.py', 'b.py', 'c.py'):
+            persist.file_errors[filename] = [make_error(filename, 'old')]
+        persist.affected_filenames_per_filename['a.py']['fake'] = {'c.py'}
+        self.events = []
+        when(sublime_linter.events).broadcast(...).thenAnswer(
+            lambda topic, payload: self.events.append((topic, payload['filename'])))
+
+    def tearDown(self):
+        unstub()
+        for filename in ('a.py', 'b.py', 'c.py'):
+            persist.file_errors.pop(filename, None)
+        persist.affected_filenames_per_filename.pop('a.py', None)
+        sublime_linter.last_complete_results.pop(('a.py', 'fake'), None)
+
+    def update(self, errors, partial_result):
+        sublime_linter.group_by_filename_and_update(
+            FakeWindow(), 'a.py', lambda: False, 'on_modified', 'fake', errors,
+            partial_result=partial_result)
+
+    def test_only_update_mentioned_files(self):
+        self.update([make_error('b.py')], partial_result=True)
+
+        self.assertEqual([make_error('a.py', 'old')], persist.file_errors['a.py'])
+        self.assertEqual([make_error('b.py')], persist.file_errors['b.py'])
+        self.assertEqual([('lint_partial_result', 'b.py')], self.events)
+
+    def test_final_result_cleans_files_of_partial_results(self):
+        self.update([make_error('b.py')], partial_result=True)
+        self.update([make_error('a.py')], partial_result=False)
+
+        self.assertEqual([make_error('a.py')], persist.file_errors['a.py'])
+        self.assertEqual([], persist.file_errors['b.py'])
+        self.assertEqual([], persist.file_errors['c.py'])
+
+    def test_aborted_lint_restores_the_complete_result(self):
+        self.update([make_error('a.py'), make_error('b.py')], partial_result=True)
+        self.update([make_error('a.py', 'more')], partial_result=True)
+
+        sublime_linter.restore_complete_result('a.py', 'fake')
+
+        self.assertEqual([make_error('a.py', 'old')], persist.file_errors['a.py'])
+        self.assertEqual([make_error('b.py', 'old')], persist.file_errors['b.py'])
+
+    def test_keep_the_final_result(self):
+        self.update([make_error('a.py')], partial_result=True)
+        self.update([make_error('a.py', 'final')], partial_result=False)
+
+        sublime_linter.restore_complete_result('a.py', 'fake')
+
+        self.assertEqual([make_error('a.py', 'final')], persist.file_errors['a.py'])
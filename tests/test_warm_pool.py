@@ -0,0 +1,107 @@
+from collections import ChainMap, deque
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from unittesting import DeferrableTestCase
+from SublimeLinter.tests.parameterized import parameterized as p
+
+from SublimeLinter.lint import persist, warm_pool
+
+
+class FakeProc:
+    returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.returncode = -9
+
+    def communicate(self):
+        return b'', b''
+
+
+class TestParseCmd(DeferrableTestCase):
+    def test_python_module(self):
+        self.assertEqual(
+            ('/venv/bin/python', {'module': 'flake8', 'argv': ['flake8', '-']}),
+            warm_pool.parse_cmd(['/venv/bin/python', '-m', 'flake8', '-'])
+        )
+
+    @p.expand([
+        (['/usr/bin/node', '-m', 'eslint'],),
+        (['/venv/bin/python', '-X', 'utf8', '-m', 'flake8'],),
+        (['/does/not/exist/flake8', '-'],),
+    ])
+    def test_unsupported_commands(self, cmd):
+        self.assertIsNone(warm_pool.parse_cmd(cmd))
+
+    @p.expand([
+        (b'#!/venv/bin/python\nimport sys\n', '/venv/bin/python'),
+        (b'#!/venv/bin/python3.8\n', '/venv/bin/python3.8'),
+        (b'#!/usr/bin/env python\n', None),
+        (b'#!/bin/sh\n', None),
+        (b'MZ\x90\x00', None),
+    ])
+    def test_python_scripts(self, first_line, interpreter):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(first_line)
+        try:
+            self.assertEqual(interpreter, warm_pool.read_shebang(f.name))
+            if interpreter:
+                self.assertEqual(
+                    (interpreter, {'path': f.name, 'argv': [f.name, '-']}),
+                    warm_pool.parse_cmd([f.name, '-'])
+                )
+        finally:
+            os.remove(f.name)
+
+
+class TestBootstrap(DeferrableTestCase):
+    def test_leave_the_code_in_the_pipe(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.py', delete=False) as f:
+            f.write('import os, sys\nsys.stdout.write(os.read(0, 1024).decode())\n')
+        self.addCleanup(os.remove, f.name)
+        header = {'path': f.name, 'argv': [f.name, '-']}
+
+        output = subprocess.check_output(
+            [sys.executable, '-c', warm_pool.BOOTSTRAP],
+            input=(json.dumps(header) + '\n').encode('utf-8') + b'x = 1\n'
+        )
+
+        self.assertEqual(b'x = 1\n', output)
+
+
+class TestPools(DeferrableTestCase):
+    def setUp(self):
+        persist.assigned_linters[1] = {'flake8'}
+
+    def tearDown(self):
+        persist.assigned_linters.pop(1, None)
+        warm_pool.pools.clear()
+
+    def take(self, linter_name='flake8', size=2):
+        return warm_pool.take(
+            linter_name, size, ['/venv/bin/python', '-m', 'flake8'], None, ChainMap({}, {}))
+
+    @p.expand([
+        ("pool disabled", 'flake8', 0),
+        ("not a valid size", 'flake8', '2'),
+        ("linter not assigned", 'mypy', 2),
+    ])
+    def test_no_pool(self, _, linter_name, size):
+        self.assertIsNone(self.take(linter_name, size))
+        self.assertEqual({}, warm_pool.pools)
+
+    def test_trim_pools_of_unassigned_linters(self):
+        flake8, mypy = FakeProc(), FakeProc()
+        warm_pool.pools[('flake8', 'python', None, ())] = deque([flake8])
+        warm_pool.pools[('mypy', 'python', None, ())] = deque([mypy])
+
+        warm_pool.trim()
+        self.assertEqual([('flake8', 'python', None, ())], list(warm_pool.pools))
+        self.assertIsNone(flake8.returncode)
+        self.assertEqual(-9, mypy.returncode)
@@ -0,0 +1,77 @@
+from collections import ChainMap
+import json
+
+from unittesting import DeferrableTestCase
+
+from SublimeLinter.lint import daemon, queue, worker
+from SublimeLinter.tests.fake_proc import FakeProc
+from SublimeLinter.tests.mockito import unstub, when
+
+
+class FakeLinter:
+    name = 'fake'
+    filename = 'a.py'
+    worker_function = 'fake_worker:lint'
+    daemon_codec = None
+    daemon_idle_timeout = 300.0
+    daemon_request_timeout = 5.0
+    settings = {'python': '/usr/bin/python3', 'max_line_length': 79}
+    worker_context_keys = ('file', 'project_root')
+    context = ChainMap({'file': 'a.py', 'PATH': '/bin', 'folder': '/'})
+
+    def get_environment(self):
+        return ChainMap({}, {'PATH': '/bin'})
+
+
+class TestWorker(DeferrableTestCase):
+    def setUp(self):
+        when(queue).debounce(...).thenReturn(None)
+        when(worker).plugin_dir(...).thenReturn('/plugins/fake')
+
+    def tearDown(self):
+        daemon.kill_all()
+        unstub()
+
+    def test_send_plain_inputs_and_return_the_result(self):
+        proc = FakeProc({'result': [{'line': 1, 'message': 'foo'}]})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+
+        result = worker.run(FakeLinter(), 'x = 1')
+
+        self.assertEqual([{'line': 1, 'message': 'foo'}], result)
+        request = json.loads(proc.stdin.getvalue())
+        self.assertEqual('/plugins/fake', request['path'])
+        self.assertEqual('fake_worker', request['module'])
+        self.assertEqual('lint', request['function'])
+        self.assertEqual('x = 1', request['code'])
+        self.assertEqual({'file': 'a.py'}, request['context'])
+        self.assertEqual(79, request['settings']['max_line_length'])
+
+    def test_raise_if_the_function_raised(self):
+        proc = FakeProc({'error': 'Traceback: ...'})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+
+        with self.assertRaises(worker.WorkerFailed):
+            worker.run(FakeLinter(), 'x = 1')
+
+    def test_start_the_worker_with_the_python_of_the_linter(self):
+        proc = FakeProc({'result': ''})
+        when(daemon.subprocess).Popen(...).thenReturn(proc)
+
+        worker.run(FakeLinter(), 'x = 1')
+
+        (running,) = daemon.daemons.values()
+        self.assertEqual('/usr/bin/python3', running.cmd[0])
+
+    def test_restart_the_worker_if_the_plugin_changed(self):
+        when(daemon.subprocess).Popen(...).thenReturn(
+            FakeProc({'result': ''}), FakeProc({'result': ''}))
+        when(worker).plugin_version(...).thenReturn((1.0,), (2.0,))
+
+        worker.run(FakeLinter(), 'x = 1')
+        (first,) = daemon.daemons.values()
+        worker.run(FakeLinter(), 'x = 1')
+        (second,) = daemon.daemons.values()
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.stopped)